@@ -0,0 +1,128 @@
+"""
+Central registry for the game's sounds, music and fonts.
+
+Everything is loaded and decoded once, optionally on a background thread
+while the start menu is showing, and then shared by name for the rest of
+the session so starting a level never touches the disk.
+"""
+
+import io
+import threading
+
+import pygame
+
+SOUNDS = {
+    "paddle": "sounds/paddle.wav",
+    "brick": "sounds/brick.wav",
+    "wall": "sounds/wall.wav",
+    "lose_life": "sounds/lose_life.wav",
+}
+MUSIC = "sounds/bgmusic.wav"
+
+# Class for Assets
+class Assets:
+    """
+    Initialize an asset registry.
+
+    Parameters:
+    sounds (dict): Sound effect name -> file path.
+    music (str): Background music file path.
+    """
+    def __init__(self, sounds=SOUNDS, music=MUSIC):
+        self.sound_paths = dict(sounds)
+        self.music_path = music
+        self.sounds = {}
+        self.music = None
+        self.fonts = {}
+        self.loaded = False
+        self.thread = None
+        self.error = None
+
+    def font(self, name, size):
+        """
+        Get a font, loading it the first time it is asked for.
+
+        Parameters:
+        name (str): Font file, or None for pygame's default font.
+        size (int): Point size.
+
+        Returns:
+        pygame.font.Font: The font.
+        """
+        key = (name, size)
+        if key not in self.fonts:
+            self.fonts[key] = pygame.font.Font(name, size)
+        return self.fonts[key]
+
+    def load(self):
+        """
+        Load and decode every sound and read the music file into memory.
+        """
+        if self.loaded:
+            return
+        if not pygame.mixer.get_init():
+            pygame.mixer.init()
+        sounds = {name: pygame.mixer.Sound(path) for name, path in self.sound_paths.items()}
+        with open(self.music_path, 'rb') as file:
+            music = file.read()
+        self.sounds, self.music = sounds, music
+        self.loaded = True
+
+    def _load_in_background(self):
+        try:
+            self.load()
+        except Exception as error:  # Handed to the main thread by wait()
+            self.error = error
+
+    def load_async(self):
+        """
+        Start loading on a background thread. Call wait() before using the sounds.
+        """
+        if self.thread is None and not self.loaded:
+            self.thread = threading.Thread(target=self._load_in_background, name="asset-loader", daemon=True)
+            self.thread.start()
+
+    def ready(self):
+        """
+        Check without blocking whether wait() would return at once, because
+        loading has finished, successfully or not.
+
+        Returns:
+        bool: True if the sounds are loaded or the background load has ended.
+        """
+        return self.loaded or (self.thread is not None and not self.thread.is_alive())
+
+    def wait(self):
+        """
+        Block until loading has finished, loading now if it never started.
+        Errors from a background load are raised here.
+        """
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+        if self.error is not None:
+            error, self.error = self.error, None
+            raise error
+        self.load()
+
+    def sound(self, name):
+        """
+        Get a loaded sound effect.
+
+        Parameters:
+        name (str): Sound effect name.
+
+        Returns:
+        pygame.mixer.Sound: The sound.
+        """
+        return self.sounds[name]
+
+    def play_music(self, loops=-1):
+        """
+        Start the background music from the copy held in memory.
+
+        Parameters:
+        loops (int): Times to repeat, -1 to repeat forever.
+        """
+        pygame.mixer.music.load(io.BytesIO(self.music))
+        pygame.mixer.music.play(loops)
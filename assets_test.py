@@ -0,0 +1,89 @@
+import os
+import tempfile
+import unittest
+import wave
+
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import pygame
+
+from assets import Assets
+
+
+def write_wav(path):
+    """Write a short silent WAV file."""
+    with wave.open(path, 'wb') as file:
+        file.setnchannels(1)
+        file.setsampwidth(2)
+        file.setframerate(22050)
+        file.writeframes(b'\0\0' * 2205)
+
+
+class TestAssets(unittest.TestCase):
+    """Unit test case for the shared asset registry."""
+
+    def setUp(self):
+        """Create sound files to load."""
+        pygame.init()
+        self.directory = tempfile.TemporaryDirectory()
+        self.sounds = {}
+        for name in ("paddle", "wall"):
+            path = os.path.join(self.directory.name, name + ".wav")
+            write_wav(path)
+            self.sounds[name] = path
+        self.music = os.path.join(self.directory.name, "music.wav")
+        write_wav(self.music)
+
+    def test_background_load(self):
+        """Test that sounds loaded on a thread are shared by name."""
+        assets = Assets(self.sounds, self.music)
+        assets.load_async()
+        assets.wait()
+        self.assertTrue(assets.loaded)
+        self.assertIs(assets.sound("paddle"), assets.sound("paddle"))
+        self.assertIsInstance(assets.sound("wall"), pygame.mixer.Sound)
+        assets.play_music()
+
+    def test_load_only_once(self):
+        """Test that repeated loads keep the same decoded sounds."""
+        assets = Assets(self.sounds, self.music)
+        assets.load()
+        sound = assets.sound("wall")
+        assets.load()
+        assets.wait()
+        self.assertIs(assets.sound("wall"), sound)
+
+    def test_background_error_raised_on_wait(self):
+        """Test that a missing file is reported to the caller of wait()."""
+        assets = Assets({"missing": os.path.join(self.directory.name, "missing.wav")}, self.music)
+        assets.load_async()
+        with self.assertRaises(FileNotFoundError):
+            assets.wait()
+
+    def test_ready(self):
+        """Test that ready() says without blocking whether a background load has ended."""
+        assets = Assets(self.sounds, self.music)
+        self.assertFalse(assets.ready())
+        assets.load_async()
+        assets.thread.join()
+        self.assertTrue(assets.ready())
+
+        failing = Assets({"missing": os.path.join(self.directory.name, "missing.wav")}, self.music)
+        failing.load_async()
+        failing.thread.join()
+        self.assertTrue(failing.ready())
+
+    def test_font_cache(self):
+        """Test that each font is only loaded once."""
+        assets = Assets(self.sounds, self.music)
+        self.assertIs(assets.font(None, 15), assets.font(None, 15))
+        self.assertIsNot(assets.font(None, 15), assets.font(None, 20))
+
+    def tearDown(self):
+        """Quit Pygame and remove the files."""
+        pygame.quit()
+        self.directory.cleanup()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,200 @@
+"""
+Sound effect dispatch over a fixed pool of voices.
+
+Every collision used to play its sound straight away on whatever mixer
+channel pygame found, so a frame with dozens of brick hits or balls asked
+the mixer for dozens of sounds and it dropped whichever it could not fit.
+A SoundDispatcher instead collects the effects asked for during a frame,
+keeping one of each, and plays them when the frame ends on a small set of
+mixer channels reserved for it, most important first. When every voice is
+busy a new effect takes over the voice playing the least important,
+oldest effect, if that is no more important than itself. Importance
+belongs to what happened rather than to the sound, since several events
+share one effect: a brick break sounds like a paddle hit but matters more.
+However many collisions a frame has, the audio work for it is at most one
+play per voice.
+
+The mixer is reached through a backend: MixerBackend plays on pygame's
+reserved channels, and NullBackend plays nothing but keeps time the same
+way, for headless games and tests.
+"""
+
+import time
+
+import pygame
+
+VOICES = 6  # Mixer channels reserved for sound effects
+PRIORITIES = {  # Simulation event -> importance of its effect when voices run out; higher wins
+    "lose_life": 3,
+    "brick": 2,
+    "powerup": 2,
+    "paddle": 1,
+    "wall": 0,
+}
+NULL_LENGTH = 0.2  # Seconds a NullBackend voice stays busy for an effect with no length given
+
+# Class for MixerBackend
+class MixerBackend:
+    """
+    Initialize a backend that plays on reserved pygame mixer channels. The
+    mixer must already be initialized.
+
+    Parameters:
+    sounds (dict): Sound effect name -> pygame.mixer.Sound.
+    voices (int): Number of channels to reserve.
+    """
+    def __init__(self, sounds, voices=VOICES):
+        self.sounds = sounds
+        self.voices = voices
+        if pygame.mixer.get_num_channels() < voices:
+            pygame.mixer.set_num_channels(voices)
+        # Reserved channels are never handed out by Sound.play(), so nothing else can take them
+        pygame.mixer.set_reserved(voices)
+        self.channels = [pygame.mixer.Channel(index) for index in range(voices)]
+
+    def busy(self, voice):
+        """
+        Check whether a voice is still playing.
+        """
+        return self.channels[voice].get_busy()
+
+    def play(self, voice, name):
+        """
+        Play an effect on a voice, cutting off whatever it was playing.
+        """
+        self.channels[voice].play(self.sounds[name])
+
+    def stop(self):
+        """
+        Silence every voice.
+        """
+        for channel in self.channels:
+            channel.stop()
+
+# Class for NullBackend
+class NullBackend:
+    """
+    Initialize a backend that plays nothing. Voices stay busy for each
+    effect's length, so voice stealing works as it would with a mixer.
+
+    Parameters:
+    voices (int): Number of voices.
+    lengths (dict): Optional sound effect name -> seconds it plays for.
+    clock (callable): Returns the time in seconds.
+    """
+    def __init__(self, voices=VOICES, lengths=None, clock=time.perf_counter):
+        self.voices = voices
+        self.lengths = lengths or {}
+        self.clock = clock
+        self.ends = [0.0] * voices
+        self.plays = {}  # Sound effect name -> times played
+
+    def busy(self, voice):
+        return self.clock() < self.ends[voice]
+
+    def play(self, voice, name):
+        self.ends[voice] = self.clock() + self.lengths.get(name, NULL_LENGTH)
+        self.plays[name] = self.plays.get(name, 0) + 1
+
+    def stop(self):
+        self.ends = [0.0] * self.voices
+
+# Class for SoundDispatcher
+class SoundDispatcher:
+    """
+    Initialize a sound dispatcher.
+
+    Parameters:
+    backend (MixerBackend or NullBackend): What plays the effects; a NullBackend by default.
+    """
+    def __init__(self, backend=None):
+        self.backend = backend or NullBackend()
+        self.pending = {}  # Sound effect name -> priority; a dict so repeats within a frame collapse
+        self.voices = [None] * self.backend.voices  # (priority, start order) of each voice's effect
+        self.started = 0
+        self.played = self.coalesced = self.stolen = self.dropped = 0
+
+    def queue(self, name, priority=0):
+        """
+        Ask for an effect to be played at the end of the frame. Asking again
+        in the same frame only raises its priority, if the new one is higher.
+
+        Parameters:
+        name (str): Sound effect name.
+        priority (int): Importance of what the effect is played for, usually PRIORITIES[event].
+        """
+        if name in self.pending:
+            self.coalesced += 1
+            if priority > self.pending[name]:
+                self.pending[name] = priority
+        else:
+            self.pending[name] = priority
+
+    def _voice_for(self, priority, flushed):
+        """
+        Pick the voice to play an effect of the given priority on.
+
+        Parameters:
+        priority (int): The effect's priority.
+        flushed (int): Start order of the first effect played by this flush;
+        those are never cut off by the same flush.
+
+        Returns:
+        int: An idle voice if there is one, else the busy voice with the least
+        important and oldest effect if that is no more important, else None.
+        """
+        backend, voices = self.backend, self.voices
+        victim = None
+        for voice, playing in enumerate(voices):
+            if playing is None or not backend.busy(voice):
+                return voice
+            if playing[1] < flushed and (victim is None or playing < voices[victim]):
+                victim = voice
+        if victim is not None and voices[victim][0] <= priority:
+            self.stolen += 1
+            return victim
+        return None
+
+    def flush(self):
+        """
+        Play the effects asked for since the last flush, most important first,
+        and forget the rest. Call once per frame.
+
+        Returns:
+        int: Number of effects played.
+        """
+        if not self.pending:
+            return 0
+        wanted = sorted(self.pending.items(), key=lambda item: item[1], reverse=True)
+        self.pending.clear()
+        played, flushed = 0, self.started
+        for name, priority in wanted[:len(self.voices)]:
+            voice = self._voice_for(priority, flushed)
+            if voice is None:
+                continue
+            self.backend.play(voice, name)
+            self.voices[voice] = (priority, self.started)
+            self.started += 1
+            played += 1
+        self.played += played
+        self.dropped += len(wanted) - played
+        return played
+
+    def stop(self):
+        """
+        Silence every voice and forget anything queued.
+        """
+        self.pending.clear()
+        self.backend.stop()
+        self.voices = [None] * len(self.voices)
+
+    def stats(self):
+        """
+        Count what the dispatcher has done so far.
+
+        Returns:
+        dict: "played", "coalesced" (repeats merged within a frame),
+        "stolen" (voices cut off for a new effect) and "dropped" (effects
+        that found no voice).
+        """
+        return {"played": self.played, "coalesced": self.coalesced, "stolen": self.stolen, "dropped": self.dropped}
@@ -0,0 +1,116 @@
+import os
+import unittest
+
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import pygame
+
+from audio import PRIORITIES, MixerBackend, NullBackend, SoundDispatcher
+
+
+class FakeClock:
+    """A clock that only moves when told to."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestSoundDispatcher(unittest.TestCase):
+    """Unit test case for the voice pool and per-frame sound coalescing."""
+
+    def setUp(self):
+        """Create a dispatcher on a silent backend with a controlled clock."""
+        self.clock = FakeClock()
+        self.backend = NullBackend(voices=2, lengths={"lose_life": 1.0}, clock=self.clock)
+        self.audio = SoundDispatcher(self.backend)
+
+    def test_repeats_coalesce(self):
+        """Test that an effect asked for many times in a frame plays once."""
+        for _ in range(50):
+            self.audio.queue("paddle")
+        self.audio.queue("wall")
+        self.assertEqual(self.audio.flush(), 2)
+        self.assertEqual(self.backend.plays, {"paddle": 1, "wall": 1})
+        self.assertEqual(self.audio.stats()["coalesced"], 49)
+        self.assertEqual(self.audio.flush(), 0)
+
+    def test_work_is_bounded_by_voices(self):
+        """Test that a frame never plays more effects than there are voices, most important first."""
+        for name in ("wall", "paddle", "lose_life", "extra", "more"):
+            self.audio.queue(name, PRIORITIES.get(name, 0))
+        self.assertEqual(self.audio.flush(), 2)
+        self.assertEqual(self.backend.plays, {"lose_life": 1, "paddle": 1})
+        self.assertEqual(self.audio.stats()["dropped"], 3)
+
+    def test_voice_stealing(self):
+        """Test that busy voices are taken over by priority, oldest first, and never by less important effects."""
+        self.audio.queue("lose_life", 3)
+        self.audio.queue("brick", 2)
+        self.audio.flush()
+        self.clock.now = 0.1
+
+        self.audio.queue("paddle", 1)
+        self.assertEqual(self.audio.flush(), 0)  # Both voices are playing something more important
+
+        self.audio.queue("brick", 2)
+        self.assertEqual(self.audio.flush(), 1)
+        self.assertEqual(self.audio.voices[1][0], 2)  # The older brick gave way, not the lost life
+        self.assertEqual(self.audio.stats()["stolen"], 1)
+
+        self.clock.now = 0.5  # The brick has finished; the lost life is still playing
+        self.audio.queue("wall")
+        self.assertEqual(self.audio.flush(), 1)
+        self.assertEqual(self.audio.stats()["stolen"], 1)
+
+    def test_priority_follows_the_event(self):
+        """Test that a brick break beats a paddle hit for the last voice, though both play the same effect."""
+        audio = SoundDispatcher(NullBackend(voices=1, clock=self.clock))
+        audio.queue("brick", PRIORITIES["powerup"])  # A power-up caught; its effect is still playing
+        audio.flush()
+
+        audio.queue("paddle", PRIORITIES["paddle"])  # The paddle hit's effect
+        self.assertEqual(audio.flush(), 0)
+
+        audio.queue("paddle", PRIORITIES["paddle"])
+        audio.queue("paddle", PRIORITIES["brick"])  # A brick break in the same frame uses the same effect
+        self.assertEqual(audio.flush(), 1)
+        self.assertEqual(audio.voices[0][0], PRIORITIES["brick"])
+        self.assertEqual(audio.stats()["stolen"], 1)
+
+    def test_no_stealing_within_a_flush(self):
+        """Test that one flush never cuts off an effect it has just started."""
+        audio = SoundDispatcher(NullBackend(voices=1, clock=self.clock))
+        audio.queue("one")
+        audio.queue("two")
+        self.assertEqual(audio.flush(), 1)
+        self.assertEqual(audio.stats()["stolen"], 0)
+
+    def test_stop(self):
+        """Test that stopping frees every voice and drops queued effects."""
+        self.audio.queue("lose_life", 3)
+        self.audio.flush()
+        self.audio.queue("wall")
+        self.audio.stop()
+        self.assertEqual(self.audio.flush(), 0)
+        self.assertFalse(self.backend.busy(0))
+
+    def test_mixer_backend(self):
+        """Test playing through reserved mixer channels."""
+        pygame.mixer.init()
+        try:
+            sound = pygame.mixer.Sound(buffer=b'\0\0' * 4410)
+            backend = MixerBackend({"wall": sound}, voices=3)
+            self.assertGreaterEqual(pygame.mixer.get_num_channels(), 3)
+            audio = SoundDispatcher(backend)
+            audio.queue("wall")
+            self.assertEqual(audio.flush(), 1)
+            audio.stop()
+        finally:
+            pygame.mixer.quit()
+
+
+if __name__ == '__main__':
+    unittest.main()
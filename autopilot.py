@@ -0,0 +1,324 @@
+"""
+Computer player for attract mode and soak testing.
+
+Between collisions a ball only moves in a straight line and bounces off the
+side and top walls, so where it will reach the paddle can be worked out from
+its position and direction without stepping it frame by frame: each stretch
+between two walls is a single division, so a prediction costs one loop per
+bounce. The Autopilot keeps each ball's prediction until a collision (the
+paddle, a brick, a power-up or a lost ball) could have changed where it is
+heading, and moves the paddle to meet the ball that arrives first, off
+centre so it goes back up towards a brick picked at random.
+
+Run as a script it soak-tests the simulation, playing game after game with
+the autopilot and checking the game's invariants after every step:
+
+    python autopilot.py --frames 1000000 --workers 4 --save-dir soak
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+from replay import Recorder
+from runner import episode_seed
+from simulation import WIDTH, MAX_BALLS, START_LIVES, Game
+
+# Events after which a ball may be heading somewhere new, or be a different ball
+COLLISIONS = frozenset(("paddle", "brick", "hit", "powerup", "lost", "lose_life", "level"))
+MAX_AIM = 0.35  # Furthest from the paddle's centre to meet the ball, as a fraction of its width
+STALL_FRAMES = 20000  # Steps without breaking a brick before a game counts as stuck
+SOAK_FRAMES = 1000000
+
+def _unroll_x(posx, velocity, steps):
+    """
+    Follow a ball's x position through the side walls for a number of steps,
+    bouncing exactly as Ball.check_edges does.
+
+    Parameters:
+    posx (float): Starting x position.
+    velocity (float): Movement in x per step.
+    steps (int): Steps to follow it for.
+
+    Returns:
+    float: The x position after the steps.
+    """
+    while velocity:
+        # Steps until check_edges next sees the ball on or beyond a wall
+        if velocity > 0:
+            hit = 1 if posx + velocity <= 0 else math.ceil((WIDTH - posx) / velocity)
+        else:
+            hit = 1 if posx + velocity >= WIDTH else math.ceil(posx / -velocity)
+        hit = max(hit, 1)
+        if hit > steps:
+            break
+        posx += hit * velocity
+        steps -= hit
+        if posx <= 0:
+            posx += 2
+        elif posx >= WIDTH:
+            posx -= 2
+        velocity = -velocity
+    return posx + steps * velocity
+
+def predict_landing(ball, row):
+    """
+    Predict when and where a ball will come down to a row, bouncing off the
+    walls but ignoring bricks and the paddle.
+
+    Parameters:
+    ball (simulation.Ball): The ball.
+    row (float): The y position to reach, moving down.
+
+    Returns:
+    tuple: (steps from now, x position), or None if the ball is moving
+    level or already going down below the row.
+    """
+    posy = ball.posy
+    velocity = ball.y_fac * ball.speed
+    if velocity == 0 or (velocity > 0 and posy > row):
+        return None
+    steps = 0
+    if velocity < 0:
+        # Up to the top wall first, where check_edges turns it round in place
+        steps = max(math.ceil(posy / -velocity), 1)
+        posy += steps * velocity
+        velocity = -velocity
+    # Then down until it is past the row
+    down = max(math.floor((row - posy) / velocity) + 1, 1)
+    steps += down
+    return steps, _unroll_x(ball.posx, ball.x_fac * ball.speed, steps)
+
+# Class for Autopilot
+class Autopilot:
+    """
+    Initialize an autopilot. Call it with a game, like the policies in
+    runner, to get the paddle direction for the next step.
+
+    Parameters:
+    seed: Optional seed for picking which brick to aim at.
+    """
+    def __init__(self, seed=None):
+        self.rng = random.Random(seed)
+        self.game = None
+        self.frame = -1
+        self.predictions = {}  # Ball -> (frame it reaches the paddle, x position there)
+        self.goal = None  # Brick to send the ball towards
+        self.predicted = 0  # Predictions worked out, for checking the cache
+
+    def invalidate(self, game):
+        """
+        Forget every prediction and pick a new brick to aim at.
+
+        Parameters:
+        game (simulation.Game): The game being played.
+        """
+        self.predictions.clear()
+        blocks = list(game.blocks)
+        self.goal = self.rng.choice(blocks) if blocks else None
+
+    def aim(self, landing, row):
+        """
+        Work out where on the paddle to meet a ball so that it goes up
+        towards the goal brick, directly or off a side wall.
+
+        Parameters:
+        landing (float): x position where the ball reaches the paddle.
+        row (float): y position where it does.
+
+        Returns:
+        float: Offset of the ball from the paddle's centre, as a fraction of its width.
+        """
+        goal = self.goal
+        if goal is None:
+            return 0.0
+        goal_x, goal_y = goal.posx + goal.width / 2, goal.posy + goal.height / 2
+        across = min((x - landing for x in (goal_x, -goal_x, 2 * WIDTH - goal_x)), key=abs)
+        # Ball.hit_paddle turns the ball's offset into x_fac = 2 * offset, going up at y_fac = -1
+        offset = across / max(row - goal_y, 1) / 2
+        return min(max(offset, -MAX_AIM), MAX_AIM)
+
+    def target(self, game):
+        """
+        Find where the next ball to reach the paddle will be.
+
+        Parameters:
+        game (simulation.Game): The game being played.
+
+        Returns:
+        float: x position to put the paddle's centre, or None if no ball is on its way down.
+        """
+        if game is not self.game or game.frame < self.frame or not COLLISIONS.isdisjoint(game.events):
+            self.invalidate(game)
+        self.game, self.frame = game, game.frame
+
+        paddle, predictions = game.paddle, self.predictions
+        first = None
+        for ball in game.balls:
+            if ball not in predictions:
+                landing = predict_landing(ball, paddle.posy - ball.radius)
+                predictions[ball] = None if landing is None else (game.frame + landing[0], landing[1])
+                self.predicted += 1
+            prediction = predictions[ball]
+            if prediction is not None and prediction[0] >= game.frame and (first is None or prediction < first):
+                first = prediction
+        return None if first is None else first[1]
+
+    def __call__(self, game):
+        """
+        Choose the paddle direction for the next step.
+
+        Parameters:
+        game (simulation.Game): The game being played.
+
+        Returns:
+        int: Paddle direction (-1, 0 or 1).
+        """
+        paddle = game.paddle
+        x = self.target(game)
+        if x is None:
+            x = game.ball.posx  # Nothing coming down; stay under the ball
+        else:
+            x -= self.aim(x, paddle.posy) * paddle.width
+        x = min(max(x, paddle.width / 2), WIDTH - paddle.width / 2)
+        offset = x - (paddle.posx + paddle.width / 2)
+        if abs(offset) <= paddle.speed / 2:
+            return 0
+        return 1 if offset > 0 else -1
+
+def check_invariants(game, before):
+    """
+    Check a game against the rules every step must keep.
+
+    Parameters:
+    game (simulation.Game): The game after a step.
+    before (tuple): (score, block count, level) before the step.
+
+    Returns:
+    list: A description of each rule broken; empty if there were none.
+    """
+    problems = []
+    score, blocks, level = before
+    paddle = game.paddle
+    if not 0 <= paddle.posx <= WIDTH - paddle.width:
+        problems.append(f"paddle at x={paddle.posx} is off the screen")
+    if not 1 <= len(game.balls) <= MAX_BALLS:
+        problems.append(f"{len(game.balls)} balls in play")
+    for ball in game.balls:
+        reach = ball.speed * math.hypot(ball.x_fac, ball.y_fac) + 2
+        if not (math.isfinite(ball.posx) and math.isfinite(ball.posy)):
+            problems.append(f"ball at ({ball.posx}, {ball.posy})")
+        elif not -reach <= ball.posx <= WIDTH + reach or ball.posy < -reach:
+            problems.append(f"ball escaped to ({ball.posx:.1f}, {ball.posy:.1f})")
+    if game.score < score:
+        problems.append(f"score went down from {score} to {game.score}")
+    if not 0 <= game.lives <= START_LIVES:
+        problems.append(f"{game.lives} lives")
+    if not 1 <= game.level <= game.max_level:
+        problems.append(f"level {game.level}")
+    if game.level == level and len(game.blocks) > blocks:
+        problems.append(f"blocks went up from {blocks} to {len(game.blocks)}")
+    return problems
+
+def soak(frames=SOAK_FRAMES, base_seed=0, worker=0, workers=1, powerups=True, levels=None, save_dir=None,
+         stall_frames=STALL_FRAMES):
+    """
+    Play autopilot games back to back for a number of frames, checking the
+    invariants after every step.
+
+    Parameters:
+    frames (int): Steps to play in total.
+    base_seed (int): Seed of the whole run.
+    worker (int): Which share of the games to play, when split across processes.
+    workers (int): How many shares there are.
+    powerups (bool): Whether games have power-ups.
+    levels (levels.LevelSet): Optional level layouts.
+    save_dir (str): Optional directory to save a replay of every failed game in.
+    stall_frames (int): Steps without breaking a brick before a game fails as stuck.
+
+    Returns:
+    dict: "frames", "games", "levels" (levels cleared), "score" (total) and
+    "failures", a list of dicts with the game's "seed", the "frame" and the "problems".
+    """
+    totals = {"frames": 0, "games": 0, "levels": 0, "score": 0, "failures": []}
+    index = worker
+    while totals["frames"] < frames:
+        seed = random.Random(episode_seed(base_seed, index)).getrandbits(63)
+        index += workers
+        game = Game(seed, powerups=powerups, levels=levels)
+        recorder = Recorder(game)
+        pilot = Autopilot(seed)
+        last_brick = 0
+        problems = []
+        while not game.over and totals["frames"] < frames:
+            before = (game.score, len(game.blocks), game.level)
+            events = recorder.step(pilot(game))
+            totals["frames"] += 1
+            if "brick" in events:
+                last_brick = game.frame
+            if "level" in events:
+                totals["levels"] += 1
+            problems = check_invariants(game, before)
+            if game.frame - last_brick > stall_frames:
+                problems.append(f"no brick broken for {stall_frames} steps")
+            if problems:
+                break
+        totals["games"] += 1
+        totals["score"] += game.score
+        if problems:
+            totals["failures"].append({"seed": seed, "frame": game.frame, "problems": problems})
+            if save_dir:
+                os.makedirs(save_dir, exist_ok=True)
+                recorder.finish().save(os.path.join(save_dir, f"soak-{seed}.bkr"))
+    return totals
+
+def _soak_share(args):
+    """
+    Run one worker's share of a soak test.
+    """
+    return soak(*args)
+
+def soak_parallel(frames=SOAK_FRAMES, base_seed=0, workers=None, powerups=True, save_dir=None):
+    """
+    Split a soak test across a process pool.
+
+    Parameters:
+    frames (int): Steps to play in total.
+    base_seed (int): Seed of the whole run.
+    workers (int): Number of worker processes; all cores by default, 1 runs in-process.
+    powerups (bool): Whether games have power-ups.
+    save_dir (str): Optional directory to save a replay of every failed game in.
+
+    Returns:
+    dict: The totals of every worker, as for soak().
+    """
+    workers = workers or os.cpu_count() or 1
+    shares = [(frames // workers + (worker < frames % workers), base_seed, worker, workers, powerups, None, save_dir)
+              for worker in range(workers)]
+    if workers == 1:
+        return soak(*shares[0])
+    totals = {"frames": 0, "games": 0, "levels": 0, "score": 0, "failures": []}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for share in executor.map(_soak_share, shares):
+            for key in totals:
+                totals[key] += share[key]
+    return totals
+
+def main():
+    parser = argparse.ArgumentParser(description="Soak-test the simulation with the autopilot.")
+    parser.add_argument("--frames", type=int, default=SOAK_FRAMES)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--no-powerups", action="store_true")
+    parser.add_argument("--save-dir", help="Directory to save replays of failed games in")
+    args = parser.parse_args()
+
+    totals = soak_parallel(args.frames, args.seed, args.workers, not args.no_powerups, args.save_dir)
+    print(json.dumps(totals, indent=2))
+    raise SystemExit(1 if totals["failures"] else 0)
+
+if __name__ == "__main__":
+    main()
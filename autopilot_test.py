@@ -0,0 +1,102 @@
+import os
+import random
+import tempfile
+import unittest
+
+from autopilot import Autopilot, check_invariants, predict_landing, soak, soak_parallel
+from replay import Replay, verify
+from simulation import HEIGHT, START_LIVES, WIDTH, Game
+
+
+class TestAutopilot(unittest.TestCase):
+    """Unit test case for the trajectory-predicting autopilot and the soak test."""
+
+    def test_prediction_matches_stepping(self):
+        """Test that the analytic landing matches stepping the ball through its wall bounces."""
+        rng = random.Random(1)
+        for _ in range(200):
+            ball = Game(seed=0).ball
+            ball.posx, ball.posy = rng.uniform(1, WIDTH - 1), rng.uniform(1, 300)
+            ball.x_fac, ball.y_fac = rng.uniform(-1.75, 1.75), rng.choice((-1, 1))
+            row = 443
+            steps, x = predict_landing(ball, row)
+            for _ in range(steps):
+                self.assertLessEqual(ball.posy, row)
+                ball.update()
+            self.assertGreater(ball.posy, row)
+            self.assertAlmostEqual(ball.posx, x, places=6)
+
+    def test_no_prediction_for_a_ball_going_away(self):
+        """Test that a ball falling past the row, or moving level, has no landing."""
+        ball = Game(seed=0).ball
+        ball.posy, ball.y_fac = HEIGHT - 20, 1
+        self.assertIsNone(predict_landing(ball, HEIGHT - 50))
+        ball.y_fac = -1
+        self.assertIsNotNone(predict_landing(ball, HEIGHT - 50))
+        ball.y_fac = 0
+        self.assertIsNone(predict_landing(ball, HEIGHT - 50))
+
+    def test_predictions_are_cached(self):
+        """Test that predictions are only worked out again after a collision."""
+        game = Game(seed=2)
+        pilot = Autopilot(2)
+        for _ in range(10):
+            game.step(pilot(game))
+        self.assertEqual(pilot.predicted, 1)
+        game.events.append("wall")
+        pilot(game)
+        self.assertEqual(pilot.predicted, 1)  # Wall bounces are part of the prediction
+        game.events.append("paddle")
+        pilot(game)
+        self.assertEqual(pilot.predicted, 2)
+
+        for _ in range(3000):
+            game.step(pilot(game))
+        self.assertLess(pilot.predicted, 3000 / 10)
+
+    def test_plays_well(self):
+        """Test that the autopilot clears bricks without dropping the ball."""
+        game = Game(seed=3, powerups=True)
+        pilot = Autopilot(3)
+        start = len(game.blocks)
+        for _ in range(5000):
+            game.step(pilot(game))
+        self.assertEqual(game.lives, START_LIVES)
+        self.assertLess(len(game.blocks), start // 2)
+
+    def test_invariants(self):
+        """Test that a sound game passes and a broken one is caught."""
+        game = Game(seed=4)
+        game.step()
+        before = (game.score, len(game.blocks), game.level)
+        self.assertEqual(check_invariants(game, before), [])
+        game.ball.posx = WIDTH + 100
+        game.score -= 1
+        problems = check_invariants(game, before)
+        self.assertEqual(len(problems), 2)
+
+    def test_soak(self):
+        """Test that a soak test counts its frames and games the same way every time."""
+        totals = soak(20000, base_seed=1)
+        self.assertEqual(totals["frames"], 20000)
+        self.assertGreaterEqual(totals["games"], 1)
+        self.assertEqual(totals, soak(20000, base_seed=1))
+
+        pooled = soak_parallel(4000, base_seed=1, workers=2)
+        self.assertEqual(pooled["frames"], 4000)
+        self.assertEqual(pooled["games"], 2)
+
+    def test_failed_game_is_saved_as_a_replay(self):
+        """Test that a failure is reported with a replay that reproduces it."""
+        with tempfile.TemporaryDirectory() as directory:
+            totals = soak(500, save_dir=directory, stall_frames=50)
+            self.assertTrue(totals["failures"])
+            failure = totals["failures"][0]
+            self.assertIn("no brick broken for 50 steps", failure["problems"])
+            replay = Replay.load(os.path.join(directory, f"soak-{failure['seed']}.bkr"))
+            self.assertEqual(replay.frames, failure["frame"])
+            self.assertEqual(verify(replay), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,249 @@
+"""
+Batched Breakout simulator.
+
+Steps many independent games at once with all state held in NumPy arrays,
+one row per game. The rules mirror simulation.Game.step exactly: the same
+paddle clamping, wall bounces, Ball.hit_paddle and Ball.hit_block responses,
+lives, scoring and level progression. Games that end are reset in place.
+"""
+
+import numpy as np
+
+from block_array import BlockArray
+from simulation import (WIDTH, HEIGHT, BLOCK_COLORS, BLOCK_POINTS, BLOCK_WIDTH, BLOCK_HEIGHT,
+                        HORIZONTAL_GAP, VERTICAL_GAP, START_LIVES, MAX_LEVEL, BALL_RADIUS,
+                        BALL_SPEED, PADDLE_WIDTH, PADDLE_HEIGHT, PADDLE_SPEED)
+
+CELL_WIDTH = BLOCK_WIDTH + HORIZONTAL_GAP
+CELL_HEIGHT = BLOCK_HEIGHT + VERTICAL_GAP
+COLUMNS = len(range(0, WIDTH, CELL_WIDTH))
+ROWS = len(range(0, HEIGHT // 2, CELL_HEIGHT))
+BLOCK_COUNT = COLUMNS * ROWS
+PADDLE_Y = HEIGHT - 50
+OBSERVATION_SIZE = 5 + BLOCK_COUNT
+
+POINTS_TABLE = np.array(BLOCK_POINTS, dtype=np.int32)
+
+# Class for BatchEnv
+class BatchEnv:
+    """
+    Initialize a batch of independent games.
+
+    Blocks use the standard create_blocks layout, indexed column by column
+    like the list create_blocks returns, so block i of every game sits at the
+    same place and only colors, points and health differ between games.
+
+    Parameters:
+    num_games (int): Number of games to step together.
+    seed (int): Optional seed for the batch's random number generator.
+    """
+    def __init__(self, num_games, seed=None):
+        self.num_games = num_games
+        self.rng = np.random.default_rng(seed)
+        n = num_games
+        self.paddle_x = np.zeros(n)
+        self.ball_x = np.zeros(n)
+        self.ball_y = np.zeros(n)
+        self.x_fac = np.zeros(n)
+        self.y_fac = np.zeros(n)
+        self.lives = np.zeros(n, dtype=np.int32)
+        self.score = np.zeros(n, dtype=np.int64)
+        self.level = np.zeros(n, dtype=np.int32)
+        self.steps = np.zeros(n, dtype=np.int64)
+        self.health = np.zeros((n, BLOCK_COUNT), dtype=np.int16)
+        self.color_id = np.zeros((n, BLOCK_COUNT), dtype=np.uint8)
+        self.points = np.zeros((n, BLOCK_COUNT), dtype=np.int32)
+        self.remaining = np.zeros(n, dtype=np.int32)
+        self.rows = np.arange(n)
+        self.reset()
+
+    def reset(self, mask=None):
+        """
+        Start new games.
+
+        Parameters:
+        mask (array): Optional boolean mask of the games to reset; all games by default.
+
+        Returns:
+        numpy.ndarray: Observations for every game.
+        """
+        if mask is None:
+            mask = np.ones(self.num_games, dtype=bool)
+        self.lives[mask] = START_LIVES
+        self.score[mask] = 0
+        self.level[mask] = 1
+        self.steps[mask] = 0
+        self._start_level(mask)
+        return self.observe()
+
+    def _start_level(self, mask):
+        """
+        Lay out fresh blocks and serve a new ball for the masked games.
+        """
+        count = int(np.count_nonzero(mask))
+        if not count:
+            return
+        self.paddle_x[mask] = WIDTH // 2 - PADDLE_WIDTH // 2
+        self._serve(mask)
+        colors = self.rng.integers(0, len(BLOCK_COLORS), (count, BLOCK_COUNT)).astype(np.uint8)
+        self.color_id[mask] = colors
+        self.points[mask] = POINTS_TABLE[colors]
+        self.health[mask] = 1
+        self.remaining[mask] = BLOCK_COUNT
+
+    def _serve(self, mask):
+        """
+        Put the ball back at its serving position with a new launch angle, like Ball.reset.
+        """
+        count = int(np.count_nonzero(mask))
+        self.ball_x[mask] = WIDTH // 2
+        self.ball_y[mask] = HEIGHT - 150
+        self.x_fac[mask] = self.rng.uniform(-1, 1, count)
+        self.y_fac[mask] = 1
+
+    def load_game(self, index, game):
+        """
+        Copy the state of a simulation.Game into one slot of the batch.
+
+        Parameters:
+        index (int): The slot to overwrite.
+        game (simulation.Game): A game using the standard block layout.
+        """
+        self.paddle_x[index] = game.paddle.posx
+        self.ball_x[index], self.ball_y[index] = game.ball.posx, game.ball.posy
+        self.x_fac[index], self.y_fac[index] = game.ball.x_fac, game.ball.y_fac
+        self.lives[index], self.score[index], self.level[index] = game.lives, game.score, game.level
+        field = BlockArray.from_blocks(game.blocks)
+        slots = (field.x // CELL_WIDTH).astype(np.int64) * ROWS + (field.y // CELL_HEIGHT).astype(np.int64)
+        self.health[index] = 0
+        self.color_id[index, slots] = field.color_id
+        self.points[index, slots] = field.points
+        self.health[index, slots] = field.health
+        self.remaining[index] = np.count_nonzero(self.health[index] > 0)
+
+    def observe(self):
+        """
+        Build the vector observation of every game.
+
+        Returns:
+        numpy.ndarray: Float32 array of shape (games, OBSERVATION_SIZE) holding
+        ball x and y, ball direction, paddle x (positions scaled to 0..1) and
+        one alive flag per block.
+        """
+        obs = np.empty((self.num_games, OBSERVATION_SIZE), dtype=np.float32)
+        obs[:, 0] = self.ball_x / WIDTH
+        obs[:, 1] = self.ball_y / HEIGHT
+        obs[:, 2] = self.x_fac
+        obs[:, 3] = self.y_fac
+        obs[:, 4] = self.paddle_x / WIDTH
+        np.greater(self.health, 0, out=obs[:, 5:], casting='unsafe')
+        return obs
+
+    def step(self, actions):
+        """
+        Advance every game by one frame.
+
+        Parameters:
+        actions (array): Paddle direction (-1, 0 or 1) for each game.
+
+        Returns:
+        tuple: (observations, rewards, dones, info). Rewards are the points
+        scored this frame; dones flag games that ended and were reset; info
+        holds the final "score", "level" and "steps" of every game, which are
+        only meaningful where dones is set.
+        """
+        actions = np.asarray(actions)
+        self.steps += 1
+        rewards = np.zeros(self.num_games, dtype=np.int64)
+
+        # Paddle.update
+        px = self.paddle_x
+        px += PADDLE_SPEED * actions
+        np.clip(px, 0, WIDTH - PADDLE_WIDTH, out=px)
+
+        # Ball.update
+        bx, by, xf, yf = self.ball_x, self.ball_y, self.x_fac, self.y_fac
+        bx += xf * BALL_SPEED
+        by += yf * BALL_SPEED
+        left_wall = bx <= 0
+        right_wall = bx >= WIDTH
+        xf[left_wall | right_wall] *= -1
+        bx[left_wall] += 2
+        bx[right_wall] -= 2
+        yf[by <= 0] *= -1
+
+        lost = by >= HEIGHT
+        self.lives[lost] -= 1
+        dones = lost & (self.lives <= 0)
+        self._serve(lost & ~dones)
+        playing = ~dones
+
+        # Paddle collision, Ball.hit_paddle
+        r = BALL_RADIUS
+        ball_left, ball_top = bx - r, by - r
+        ball_right, ball_bottom = bx + r, by + r
+        on_paddle = (playing & (px < ball_right) & (ball_left < px + PADDLE_WIDTH)
+                     & (PADDLE_Y < ball_bottom) & (ball_top < PADDLE_Y + PADDLE_HEIGHT))
+        if on_paddle.any():
+            # A paddle end against a wall has no side to hit
+            before = on_paddle & (bx < px) & (px > 0)
+            after = on_paddle & (bx > px + PADDLE_WIDTH) & (px + PADDLE_WIDTH < WIDTH)
+            middle = on_paddle & ~before & ~after
+            xf[before] = -1
+            xf[after] = 1
+            collision_point = np.clip(bx[middle] - px[middle], 0, PADDLE_WIDTH)
+            xf[middle] = (collision_point / PADDLE_WIDTH - 0.5) * 2
+            yf[middle] = -1
+
+        # Block collisions: the ball rect can only touch the (at most) 2x2
+        # grid cells around it, tested in block order like BlockGrid.query
+        col0 = np.floor_divide(ball_left, CELL_WIDTH).astype(np.int64)
+        col1 = np.floor_divide(ball_right, CELL_WIDTH).astype(np.int64)
+        row0 = np.floor_divide(ball_top, CELL_HEIGHT).astype(np.int64)
+        row1 = np.floor_divide(ball_bottom, CELL_HEIGHT).astype(np.int64)
+        near = playing & (col1 >= 0) & (col0 < COLUMNS) & (row1 >= 0) & (row0 < ROWS)
+        if near.any():
+            candidates = ((col0, row0, near),
+                          (col0, row1, near & (row1 != row0)),
+                          (col1, row0, near & (col1 != col0)),
+                          (col1, row1, near & (col1 != col0) & (row1 != row0)))
+            hits = []
+            for col, row, valid in candidates:
+                valid = valid & (col >= 0) & (col < COLUMNS) & (row >= 0) & (row < ROWS)
+                slot = np.where(valid, col * ROWS + row, 0)
+                block_left = col * CELL_WIDTH
+                block_top = row * CELL_HEIGHT
+                valid &= ((self.health[self.rows, slot] > 0)
+                          & (block_left < ball_right) & (ball_left < block_left + BLOCK_WIDTH)
+                          & (block_top < ball_bottom) & (ball_top < block_top + BLOCK_HEIGHT))
+                hits.append((slot, block_left, valid))
+            for slot, block_left, valid in hits:
+                if not valid.any():
+                    continue
+                # Ball.hit_block
+                before = valid & (bx < block_left)
+                after = valid & ~before & (bx > block_left + BLOCK_WIDTH)
+                xf[before] = -1
+                xf[after] = 1
+                yf[valid & ~before & ~after] *= -1
+                games = self.rows[valid]
+                slots = slot[valid]
+                self.health[games, slots] -= 1
+                destroyed = self.health[games, slots] <= 0
+                rewards[games[destroyed]] += self.points[games[destroyed], slots[destroyed]]
+                np.subtract.at(self.remaining, games[destroyed], 1)
+            self.score += rewards
+
+        # Level progression
+        cleared = playing & (self.remaining == 0)
+        if cleared.any():
+            finished = cleared & (self.level >= MAX_LEVEL)
+            dones |= finished
+            advance = cleared & ~finished
+            self.level[advance] += 1
+            self._start_level(advance)
+
+        info = {"score": self.score.copy(), "level": self.level.copy(), "steps": self.steps.copy()}
+        if dones.any():
+            self.reset(dones)
+        return self.observe(), rewards, dones, info
@@ -0,0 +1,97 @@
+import random
+import unittest
+
+import numpy as np
+
+from simulation import WIDTH, Game, START_LIVES
+from batch_env import BatchEnv, BLOCK_COUNT, OBSERVATION_SIZE
+
+
+class TestBatchEnv(unittest.TestCase):
+    """Unit test case for the batched Breakout simulator."""
+
+    def setUp(self):
+        """Create a small seeded batch."""
+        self.env = BatchEnv(8, seed=0)
+
+    def test_matches_simulation(self):
+        """Test that a batch slot follows simulation.Game frame for frame."""
+        rng = random.Random(2)
+        bricks = 0
+        for seed in range(5):
+            game = Game(seed=seed)
+            self.env.load_game(0, game)
+            for _ in range(3000):
+                action = rng.choice((-1, 0, 1))
+                previous = game.score
+                events = game.step(action)
+                obs, rewards, dones, info = self.env.step([action] + [0] * 7)
+                if game.over:
+                    self.assertTrue(dones[0])
+                    break
+                self.assertAlmostEqual(self.env.ball_x[0], game.ball.posx)
+                self.assertAlmostEqual(self.env.ball_y[0], game.ball.posy)
+                self.assertEqual(self.env.score[0], game.score)
+                self.assertEqual(rewards[0], game.score - previous)
+                bricks += events.count("brick")
+                if "lose_life" in events or "level" in events:
+                    # Serves draw from different generators, so resync
+                    self.env.load_game(0, game)
+        self.assertGreater(bricks, 0)
+
+    def test_paddle_end_against_a_wall(self):
+        """Test that a ball coming down past a paddle flush with a wall bounces up, as in simulation.Game."""
+        for direction, edge, x_fac in ((-1, 0.8, -0.69), (1, WIDTH - 0.8, 0.69)):
+            game = Game(seed=0)
+            game.paddle.set_movement(direction)
+            for _ in range(100):
+                game.paddle.update()
+            game.ball.posx, game.ball.posy = edge, game.paddle.posy - 10
+            game.ball.x_fac, game.ball.y_fac = x_fac, 1
+            self.env.load_game(0, game)
+            for _ in range(10):
+                game.step(direction)
+                self.env.step([direction] + [0] * 7)
+                self.assertAlmostEqual(self.env.ball_x[0], game.ball.posx)
+                self.assertAlmostEqual(self.env.ball_y[0], game.ball.posy)
+            self.assertEqual(self.env.y_fac[0], -1)
+
+    def test_load_game_with_custom_colors(self):
+        """Test that a game whose blocks have level file colors loads into a slot."""
+        game = Game(seed=3)
+        for block in list(game.blocks)[:5]:
+            block.color, block.points = (128, 0, 128), 1000
+        self.env.load_game(0, game)
+        self.assertEqual(self.env.remaining[0], len(game.blocks))
+        self.assertEqual(self.env.points[0].sum(), sum(block.points for block in game.blocks))
+
+    def test_observation_shape(self):
+        """Test the layout of the vector observation."""
+        obs = self.env.reset()
+        self.assertEqual(obs.shape, (8, OBSERVATION_SIZE))
+        self.assertTrue((obs[:, 5:] == 1).all())
+        self.assertEqual(OBSERVATION_SIZE, 5 + BLOCK_COUNT)
+
+    def test_rewards_accumulate_into_score(self):
+        """Test that rewards add up to the running score."""
+        total = np.zeros(8, dtype=np.int64)
+        for _ in range(500):
+            obs, rewards, dones, info = self.env.step(np.zeros(8, dtype=np.int64))
+            total += rewards
+            total[dones] = 0
+        self.assertTrue((total == self.env.score).all())
+
+    def test_reset_when_out_of_lives(self):
+        """Test that a game with no lives left ends and starts over."""
+        self.env.lives[3] = 1
+        self.env.ball_y[3] = 499
+        self.env.y_fac[3] = 1
+        obs, rewards, dones, info = self.env.step(np.zeros(8, dtype=np.int64))
+        self.assertEqual(np.flatnonzero(dones).tolist(), [3])
+        self.assertEqual(self.env.lives[3], START_LIVES)
+        self.assertEqual(self.env.steps[3], 0)
+        self.assertEqual(self.env.remaining[3], BLOCK_COUNT)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,334 @@
+"""
+Benchmarks for the simulation and rendering hot paths.
+
+Each benchmark times one operation, such as a game step or a frame draw,
+and reports the median of several repeats as seconds per operation.
+Stateful operations replay the same stretch of game on every call, so every
+call does the same work. Results are compared with a stored baseline, and
+any benchmark that got slower by more than the threshold is reported as a
+regression.
+
+Timings also drift with whatever else the machine is doing, so every repeat
+of a benchmark is followed by a repeat of a fixed pure-Python reference
+loop, and regressions are judged on the median ratio of the two. A baseline
+is only saved if a second run straight after it passes against it.
+
+Rendering runs under SDL's dummy video driver, so no display is needed.
+
+    python benchmark.py                  # compare with benchmark_baseline.json
+    python benchmark.py --save           # record a new baseline
+    python benchmark.py --filter render  # run only matching benchmarks
+
+Baselines are only meaningful on the machine that recorded them.
+"""
+
+import argparse
+import gc
+import json
+import math
+import os
+import platform
+import statistics
+import sys
+import time
+
+from simulation import (WIDTH, HEIGHT, WHITE, RED, BLOCK_WIDTH, BLOCK_HEIGHT, HORIZONTAL_GAP, VERTICAL_GAP,
+                        Ball, Block, Game, create_blocks)
+from spatial import BlockGrid
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_baseline.json")
+THRESHOLD = 0.25  # Fractional slowdown allowed before a benchmark counts as a regression
+
+STEPS = 100  # Frames played per call by the game benchmarks
+
+BENCHMARKS = {}  # name -> (setup function returning the function to time, operations per call)
+
+def benchmark(name, per_call=1):
+    """
+    Register a benchmark. The decorated function does any setup and returns
+    a function of no arguments that performs per_call operations.
+    """
+    def register(setup):
+        BENCHMARKS[name] = (setup, per_call)
+        return setup
+    return register
+
+def block_field(count):
+    """
+    Fill the top half of the screen with about count blocks that never break.
+
+    Parameters:
+    count (int): Number of blocks wanted.
+
+    Returns:
+    BlockGrid: The indexed block field.
+    """
+    columns = max(1, round(math.sqrt(count * WIDTH / (HEIGHT / 2))))
+    rows = math.ceil(count / columns)
+    cell_width, cell_height = WIDTH / columns, HEIGHT / 2 / rows
+    blocks = [Block(column * cell_width, row * cell_height, cell_width * 0.75, cell_height * 0.75, RED, 10,
+                    health=10 ** 9)
+              for column in range(columns) for row in range(rows)][:count]
+    return BlockGrid(cell_width, cell_height, blocks)
+
+def _step_benchmark(count):
+    def setup():
+        game = Game(seed=0)
+        game.blocks = block_field(count)
+        game.lives = 10 ** 9
+        def play():
+            # Serve into the field so the ball spends its time among the blocks
+            game.ball.launch(WIDTH // 2, HEIGHT - 150, 0.6, -1)
+            for _ in range(STEPS):
+                game.step()
+        return play
+    return setup
+
+for _count in (50, 500, 5000):
+    benchmark(f"step.blocks_{_count}", STEPS)(_step_benchmark(_count))
+
+@benchmark("ball.update")
+def _ball_update():
+    ball = Ball(WIDTH // 2, HEIGHT // 2, 7, 5, WHITE)
+    return ball.update
+
+@benchmark("create_blocks")
+def _create_blocks():
+    return lambda: create_blocks(BLOCK_WIDTH, BLOCK_HEIGHT, HORIZONTAL_GAP, VERTICAL_GAP)
+
+def _pygame():
+    """
+    Import and initialise pygame with the dummy video driver.
+
+    Returns:
+    tuple: (pygame module, display surface, font).
+    """
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    import pygame
+    pygame.display.init()
+    pygame.font.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    return pygame, screen, pygame.font.Font('freesansbold.ttf', 15)
+
+@benchmark("render.hud")
+def _render_hud():
+    from renderer import Renderer
+    pygame, screen, font = _pygame()
+    renderer = Renderer(screen, font)
+    score = iter(range(10 ** 9))
+    return lambda: renderer.draw_hud(3, next(score))
+
+def _frames(renderer):
+    """
+    Make a function that plays and draws the first STEPS frames of a game.
+    """
+    game = Game(seed=0)
+    def play():
+        game.reset(0)
+        for _ in range(STEPS):
+            game.step()
+            renderer.draw(game)
+    return play
+
+@benchmark("render.full_frame", STEPS)
+def _render_full_frame():
+    from renderer import Renderer
+    pygame, screen, font = _pygame()
+    return _frames(Renderer(screen, font))
+
+@benchmark("render.dirty_frame", STEPS)
+def _render_dirty_frame():
+    from renderer import DirtyRenderer
+    pygame, screen, font = _pygame()
+    return _frames(DirtyRenderer(screen, font))
+
+def reference():
+    """
+    Fixed workload of plain interpreter operations used to normalise timings.
+    """
+    total = 0
+    for i in range(1000):
+        total += i * i % 7
+    return total
+
+def _loops_for(operation, seconds):
+    """
+    Find how many calls of an operation take at least the given time, doubling as timeit does.
+    """
+    timer = time.perf_counter
+    loops = 1
+    while True:
+        start = timer()
+        for _ in range(loops):
+            operation()
+        if timer() - start >= seconds:
+            return loops
+        loops *= 2
+
+def _time(operation, loops):
+    """
+    Time a number of calls of an operation.
+
+    Returns:
+    float: Seconds per call.
+    """
+    timer = time.perf_counter
+    start = timer()
+    for _ in range(loops):
+        operation()
+    return (timer() - start) / loops
+
+def measure(operation, min_time=0.5, repeat=7):
+    """
+    Time an operation the way timeit does, with the garbage collector off.
+
+    Parameters:
+    operation (callable): Function of no arguments to time.
+    min_time (float): Rough total seconds to spend timing.
+    repeat (int): Number of timed runs; the median is kept.
+
+    Returns:
+    float: Median seconds per call.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        loops = _loops_for(operation, min_time / repeat)
+        return statistics.median(_time(operation, loops) for _ in range(repeat))
+    finally:
+        if enabled:
+            gc.enable()
+
+def measure_relative(operation, against, min_time=0.5, repeat=7):
+    """
+    Time an operation and, right after every run of it, another one for as
+    long, so both see the machine in the same state.
+
+    Parameters:
+    operation (callable): Function of no arguments to time.
+    against (callable): Function of no arguments to compare it with.
+    min_time (float): Rough total seconds to spend timing the operation.
+    repeat (int): Number of timed runs of each.
+
+    Returns:
+    tuple: (median seconds per call of the operation, median ratio of each
+    run's time per call to the other function's).
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        loops = _loops_for(operation, min_time / repeat)
+        against_loops = _loops_for(against, min_time / repeat)
+        times, ratios = [], []
+        for _ in range(repeat):
+            times.append(_time(operation, loops))
+            ratios.append(times[-1] / _time(against, against_loops))
+    finally:
+        if enabled:
+            gc.enable()
+    return statistics.median(times), statistics.median(ratios)
+
+def run(names=None, min_time=0.5):
+    """
+    Run benchmarks.
+
+    Parameters:
+    names (iterable): Benchmarks to run, all of them if not given.
+    min_time (float): Rough seconds to spend on each.
+
+    Returns:
+    dict: By benchmark name, a dict of "seconds" per operation and
+    "relative", its time per operation over the reference loop's.
+    """
+    results = {}
+    for name in names or BENCHMARKS:
+        setup, per_call = BENCHMARKS[name]
+        seconds, relative = measure_relative(setup(), reference, min_time)
+        results[name] = {"seconds": seconds / per_call, "relative": relative / per_call}
+    return results
+
+def slowdown(results, baseline, name):
+    """
+    How much slower a benchmark ran than its baseline, relative to the reference loop.
+
+    Returns:
+    float: Fractional slowdown; negative if it got faster.
+    """
+    return results[name]["relative"] / baseline[name]["relative"] - 1
+
+def compare(results, baseline, threshold=THRESHOLD):
+    """
+    Find benchmarks that got slower than the baseline allows.
+
+    Parameters:
+    results (dict): Results by benchmark name, from run().
+    baseline (dict): Baseline results in the same form.
+    threshold (float): Fractional slowdown allowed.
+
+    Returns:
+    list: (name, baseline seconds, seconds) for every regression.
+    """
+    return [(name, baseline[name]["seconds"], result["seconds"]) for name, result in results.items()
+            if name in baseline and slowdown(results, baseline, name) > threshold]
+
+def load_baseline(path=BASELINE_PATH):
+    """
+    Read stored baseline results.
+
+    Returns:
+    dict: Results by benchmark name, as from run(); empty if there is no
+    baseline or it was stored in an older format.
+    """
+    try:
+        with open(path) as file:
+            results = json.load(file)["results"]
+    except FileNotFoundError:
+        return {}
+    return {name: result for name, result in results.items() if isinstance(result, dict)}
+
+def save_baseline(results, path=BASELINE_PATH):
+    """
+    Store results as the new baseline.
+    """
+    data = {"python": platform.python_version(), "machine": platform.machine(), "results": results}
+    with open(path, 'w') as file:
+        json.dump(data, file, indent=2, sort_keys=True)
+        file.write("\n")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Breakout simulation and renderer.")
+    parser.add_argument("--filter", default="", help="only run benchmarks whose name contains this")
+    parser.add_argument("--min-time", type=float, default=0.5, help="rough seconds per benchmark")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD, help="allowed fractional slowdown")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save", action="store_true", help="store the results as the new baseline")
+    args = parser.parse_args()
+
+    names = [name for name in BENCHMARKS if args.filter in name]
+    results = run(names, args.min_time)
+    baseline = load_baseline(args.baseline)
+    for name, result in results.items():
+        seconds = result["seconds"]
+        line = f"{name:<22} {seconds * 1e6:10.2f} us {1 / seconds:12.0f} /s"
+        if name in baseline:
+            line += f"   {slowdown(results, baseline, name):+7.1%} vs baseline"
+        print(line)
+
+    if args.save:
+        # A baseline that the same code cannot pass straight away would only report noise
+        unstable = compare(run(names, args.min_time), results, args.threshold)
+        for name, before, after in unstable:
+            print(f"UNSTABLE {name}: {before * 1e6:.2f} us, then {after * 1e6:.2f} us")
+        if unstable:
+            print("baseline not saved; try again on a quieter machine or with a longer --min-time")
+            sys.exit(1)
+        save_baseline(dict(baseline, **results), args.baseline)
+        print(f"baseline saved to {args.baseline}")
+        return
+    regressions = compare(results, baseline, args.threshold)
+    for name, before, after in regressions:
+        print(f"REGRESSION {name}: {before * 1e6:.2f} us -> {after * 1e6:.2f} us")
+    sys.exit(1 if regressions else 0)
+
+if __name__ == "__main__":
+    main()
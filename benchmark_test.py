@@ -0,0 +1,72 @@
+import os
+import tempfile
+import unittest
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+from benchmark import (BENCHMARKS, block_field, compare, load_baseline, measure, measure_relative, run,
+                       save_baseline, slowdown)
+
+
+class TestBenchmark(unittest.TestCase):
+    """Unit test case for the benchmark suite."""
+
+    def test_block_field_sizes(self):
+        """Test that block fields have the requested number of blocks."""
+        for count in (50, 500, 5000):
+            self.assertEqual(len(block_field(count)), count)
+
+    def test_every_benchmark_runs(self):
+        """Test that each benchmark sets up and times without errors."""
+        results = run(min_time=0.001)
+        self.assertEqual(set(results), set(BENCHMARKS))
+        self.assertTrue(all(result["seconds"] > 0 and result["relative"] > 0 for result in results.values()))
+
+    def test_measure(self):
+        """Test that measure times one call of an operation."""
+        calls = []
+        seconds = measure(lambda: calls.append(None), min_time=0.001, repeat=3)
+        self.assertGreater(seconds, 0)
+        self.assertGreaterEqual(len(calls), 3)
+
+    def test_measure_relative(self):
+        """Test that an operation doing twice the work of another takes about twice as long."""
+        once = lambda: sum(range(1000))
+        twice = lambda: (sum(range(1000)), sum(range(1000)))
+        seconds, relative = measure_relative(twice, once, min_time=0.1)
+        self.assertGreater(seconds, 0)
+        self.assertAlmostEqual(relative, 2, delta=0.6)
+
+    def test_compare(self):
+        """Test that only slowdowns beyond the threshold are regressions."""
+        baseline = {"fast": {"seconds": 1.0, "relative": 1.0}, "slow": {"seconds": 1.0, "relative": 1.0}}
+        results = {"fast": {"seconds": 1.2, "relative": 1.2}, "slow": {"seconds": 1.3, "relative": 1.3},
+                   "new": {"seconds": 9.0, "relative": 9.0}}
+        self.assertEqual(compare(results, baseline, 0.25), [("slow", 1.0, 1.3)])
+
+    def test_compare_normalises_machine_speed(self):
+        """Test that a uniformly slower run is not a regression."""
+        baseline = {"step": {"seconds": 1.0, "relative": 1.0}}
+        results = {"step": {"seconds": 2.1, "relative": 1.05}}
+        self.assertAlmostEqual(slowdown(results, baseline, "step"), 0.05)
+        self.assertEqual(compare(results, baseline), [])
+
+    def test_unchanged_code_passes(self):
+        """Test that running the same code twice is not reported as a regression."""
+        names = ["ball.update", "step.blocks_50"]
+        self.assertEqual(compare(run(names, min_time=0.3), run(names, min_time=0.3)), [])
+
+    def test_baseline_round_trip(self):
+        """Test saving and loading a baseline."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "baseline.json")
+            self.assertEqual(load_baseline(path), {})
+            results = {"step": {"seconds": 2.0, "relative": 1.5}}
+            save_baseline(results, path)
+            self.assertEqual(load_baseline(path), results)
+            save_baseline({"reference": 1.0, "step": 2.0}, path)  # The old format, without ratios
+            self.assertEqual(load_baseline(path), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
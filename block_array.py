@@ -0,0 +1,195 @@
+"""
+Array-backed block field using NumPy.
+
+Stores every block as one slot in a set of parallel arrays (struct of arrays)
+instead of one Python object per block, so overlap tests, damage and scoring
+for a whole field are single vectorized operations.
+"""
+
+import numpy as np
+
+from simulation import (WIDTH, HEIGHT, BLOCK_COLORS, BLOCK_POINTS, Block)
+
+MAX_COLORS = 256  # Distinct colors a color_id can tell apart
+POINTS_TABLE = np.array(BLOCK_POINTS, dtype=np.int32)
+
+# Class for BlockArray
+class BlockArray:
+    """
+    Initialize an array-backed block field.
+
+    Destroyed blocks keep their slot with health 0 so indices stay stable;
+    call compact() to drop them.
+
+    Parameters:
+    x (array): Left edge of each block.
+    y (array): Top edge of each block.
+    w (array): Width of each block.
+    h (array): Height of each block.
+    color_id (array): Index of each block's color in the palette.
+    points (array): Optional point value of each block, looked up from color_id by default,
+    which only works for the standard colors.
+    health (array): Optional health of each block, 1 by default.
+    palette (list): Optional RGB tuples indexed by color_id; the standard colors by default.
+    """
+    def __init__(self, x, y, w, h, color_id, points=None, health=None, palette=None):
+        self.x = np.asarray(x, dtype=np.float32)
+        self.y = np.asarray(y, dtype=np.float32)
+        self.w = np.asarray(w, dtype=np.float32)
+        self.h = np.asarray(h, dtype=np.float32)
+        self.color_id = np.asarray(color_id, dtype=np.uint8)
+        if points is None:
+            points = POINTS_TABLE[self.color_id]
+        self.points = np.asarray(points, dtype=np.int32)  # Level files allow up to 65535
+        if health is None:
+            health = np.ones(len(self.x), dtype=np.int16)
+        self.health = np.asarray(health, dtype=np.int16)
+        self.right = self.x + self.w
+        self.bottom = self.y + self.h
+        self.palette = list(BLOCK_COLORS if palette is None else palette)
+
+    @classmethod
+    def create(cls, block_width, block_height, horizontal_gap, vertical_gap, rng=None):
+        """
+        Create a block field laid out like simulation.create_blocks.
+
+        Parameters:
+        block_width (int): Width of each block.
+        block_height (int): Height of each block.
+        horizontal_gap (int): Horizontal gap between blocks.
+        vertical_gap (int): Vertical gap between blocks.
+        rng (numpy.random.Generator): Optional source of randomness for block colors.
+
+        Returns:
+        BlockArray: The new block field.
+        """
+        if rng is None:
+            rng = np.random.default_rng()
+        columns = np.arange(0, WIDTH, block_width + horizontal_gap)
+        rows = np.arange(0, HEIGHT // 2, block_height + vertical_gap)
+        x, y = np.meshgrid(columns, rows, indexing='ij')
+        count = x.size
+        return cls(x.ravel(), y.ravel(), np.full(count, block_width), np.full(count, block_height),
+                   rng.integers(0, len(BLOCK_COLORS), count))
+
+    @classmethod
+    def from_blocks(cls, blocks):
+        """
+        Build a block field from Block objects. Standard colors keep their
+        ids; any other color, such as a level file's own, is added to the
+        field's palette.
+
+        Parameters:
+        blocks (iterable): The blocks to copy.
+
+        Returns:
+        BlockArray: The new block field.
+        """
+        blocks = list(blocks)
+        palette = list(BLOCK_COLORS)
+        ids = {color: index for index, color in enumerate(palette)}
+        color_id = []
+        for block in blocks:
+            color = tuple(block.color)
+            if color not in ids:
+                if len(palette) == MAX_COLORS:
+                    raise ValueError(f"blocks have more than {MAX_COLORS} colors")
+                ids[color] = len(palette)
+                palette.append(color)
+            color_id.append(ids[color])
+        return cls([block.posx for block in blocks], [block.posy for block in blocks],
+                   [block.width for block in blocks], [block.height for block in blocks],
+                   color_id, [block.points for block in blocks], [block.health for block in blocks], palette)
+
+    def to_blocks(self):
+        """
+        Convert the live blocks back into Block objects.
+
+        Returns:
+        list: List of block objects.
+        """
+        blocks = []
+        for i in np.flatnonzero(self.health > 0):
+            block = Block(float(self.x[i]), float(self.y[i]), float(self.w[i]), float(self.h[i]),
+                          self.palette[self.color_id[i]], int(self.points[i]))
+            block.health = int(self.health[i])
+            blocks.append(block)
+        return blocks
+
+    def collide(self, left, top, width, height):
+        """
+        Find the live blocks overlapping one rectangle.
+
+        Parameters:
+        left (float): Left edge of the rectangle.
+        top (float): Top edge of the rectangle.
+        width (float): Width of the rectangle.
+        height (float): Height of the rectangle.
+
+        Returns:
+        numpy.ndarray: Boolean mask over the blocks.
+        """
+        return ((self.health > 0) & (self.x < left + width) & (self.right > left)
+                & (self.y < top + height) & (self.bottom > top))
+
+    def collide_many(self, left, top, width, height):
+        """
+        Find the live blocks overlapping each of several rectangles, such as
+        the rects of many balls.
+
+        Parameters:
+        left (array): Left edge of each rectangle.
+        top (array): Top edge of each rectangle.
+        width (array): Width of each rectangle.
+        height (array): Height of each rectangle.
+
+        Returns:
+        numpy.ndarray: Boolean mask of shape (rectangles, blocks).
+        """
+        left = np.asarray(left, dtype=np.float32)[:, None]
+        top = np.asarray(top, dtype=np.float32)[:, None]
+        right = left + np.asarray(width, dtype=np.float32)[:, None]
+        bottom = top + np.asarray(height, dtype=np.float32)[:, None]
+        return ((self.health > 0) & (self.x < right) & (self.right > left)
+                & (self.y < bottom) & (self.bottom > top))
+
+    def damage(self, hits):
+        """
+        Apply hits to the blocks and collect the points of the ones destroyed.
+
+        Parameters:
+        hits (array): A boolean mask from collide() or collide_many(), where a
+        block hit by k rectangles takes k damage, or an array of block indices.
+
+        Returns:
+        tuple: (indices of the destroyed blocks, points scored).
+        """
+        hits = np.asarray(hits)
+        if hits.dtype == bool:
+            counts = hits.sum(axis=0) if hits.ndim == 2 else hits
+        else:
+            counts = np.bincount(hits, minlength=len(self.health))
+        alive = self.health > 0
+        self.health -= np.minimum(counts, self.health).astype(np.int16)
+        destroyed = np.flatnonzero(alive & (self.health <= 0))
+        return destroyed, int(self.points[destroyed].sum(dtype=np.int64))
+
+    def compact(self):
+        """
+        Drop destroyed blocks from the arrays. Block indices change.
+        """
+        keep = self.health > 0
+        for name in ('x', 'y', 'w', 'h', 'color_id', 'points', 'health', 'right', 'bottom'):
+            setattr(self, name, getattr(self, name)[keep])
+
+    def colors(self):
+        """
+        Get the RGB color of every block.
+
+        Returns:
+        numpy.ndarray: Array of shape (blocks, 3).
+        """
+        return np.array(self.palette, dtype=np.uint8)[self.color_id]
+
+    def __len__(self):
+        return int(np.count_nonzero(self.health > 0))
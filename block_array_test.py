@@ -0,0 +1,84 @@
+import random
+import unittest
+
+import numpy as np
+
+from simulation import RED, Block, create_blocks
+from block_array import BlockArray
+
+
+class TestBlockArray(unittest.TestCase):
+    """Unit test case for the array-backed block field."""
+
+    def setUp(self):
+        """Build the same field as objects and as arrays."""
+        self.blocks = create_blocks(40, 15, 20, 20, random.Random(7))
+        self.field = BlockArray.from_blocks(self.blocks)
+
+    def test_create_layout(self):
+        """Test that create() lays blocks out like create_blocks."""
+        field = BlockArray.create(40, 15, 20, 20, np.random.default_rng(1))
+        self.assertEqual(len(field), len(self.blocks))
+        self.assertEqual(sorted(zip(field.x.tolist(), field.y.tolist())),
+                         sorted((block.posx, block.posy) for block in self.blocks))
+
+    def test_collide_matches_objects(self):
+        """Test that vectorized overlap agrees with Rect.colliderect."""
+        ball = self.blocks[12].get_rect()
+        mask = self.field.collide(ball.left + 5, ball.top + 5, 14, 14)
+        self.assertEqual(np.flatnonzero(mask).tolist(), [12])
+
+    def test_collide_many(self):
+        """Test batched overlap for several balls at once."""
+        mask = self.field.collide_many([5, 65, 590], [5, 5, 400], [14, 14, 14], [14, 14, 14])
+        self.assertEqual(mask.shape, (3, len(self.blocks)))
+        self.assertEqual(mask.sum(axis=1).tolist(), [1, 1, 0])
+
+    def test_damage_and_score(self):
+        """Test that damage destroys blocks and sums their points."""
+        mask = self.field.collide_many([5, 6, 65], [5, 5, 5], [14, 14, 14], [14, 14, 14])
+        destroyed, points = self.field.damage(mask)
+        expected = [i for i, block in enumerate(self.blocks) if block.posy == 0 and block.posx in (0, 60)]
+        self.assertEqual(destroyed.tolist(), expected)
+        self.assertEqual(points, sum(self.blocks[i].points for i in expected))
+        self.assertEqual(len(self.field), len(self.blocks) - 2)
+        self.assertFalse(self.field.collide(5, 5, 14, 14).any())
+
+    def test_multi_hit_health(self):
+        """Test that blocks with more health survive a single hit."""
+        self.field.health[:] = 2
+        destroyed, points = self.field.damage([0, 1, 1])
+        self.assertEqual(destroyed.tolist(), [1])
+        self.assertEqual(self.field.health[:3].tolist(), [1, 0, 2])
+
+    def test_round_trip_and_compact(self):
+        """Test conversion back to Block objects and dropping dead slots."""
+        self.field.damage([0])
+        self.field.compact()
+        blocks = self.field.to_blocks()
+        self.assertEqual(len(blocks), len(self.blocks) - 1)
+        self.assertEqual((blocks[0].posx, blocks[0].posy, blocks[0].color),
+                         (self.blocks[1].posx, self.blocks[1].posy, self.blocks[1].color))
+
+
+    def test_custom_colors(self):
+        """Test that colors outside the standard palette, as level files allow, get their own ids."""
+        purple, orange = (128, 0, 128), (255, 128, 0)
+        blocks = [Block(0, 0, 40, 15, purple, 50000, 3), Block(60, 0, 40, 15, RED, 15),
+                  Block(120, 0, 40, 15, orange, 5), Block(180, 0, 40, 15, purple, 5)]
+        field = BlockArray.from_blocks(blocks)
+        self.assertEqual(field.color_id[0], field.color_id[3])
+        self.assertEqual([tuple(color) for color in field.colors().tolist()], [purple, RED, orange, purple])
+        self.assertEqual([(block.color, block.points, block.health) for block in field.to_blocks()],
+                         [(purple, 50000, 3), (RED, 15, 1), (orange, 5, 1), (purple, 5, 1)])
+        self.assertEqual(self.field.palette, BlockArray.from_blocks([]).palette)  # Standard ids are unchanged
+
+    def test_too_many_colors(self):
+        """Test that a field with more colors than a color id holds is refused."""
+        blocks = [Block(i, 0, 1, 1, (i % 256, i // 256, 1), 1) for i in range(300)]
+        with self.assertRaises(ValueError):
+            BlockArray.from_blocks(blocks)
+
+
+if __name__ == '__main__':
+    unittest.main()
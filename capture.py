@@ -0,0 +1,333 @@
+"""
+Frame capture and video export.
+
+FrameCapture copies the screen into a ring of preallocated buffers once per
+frame, straight from the surface's pixel memory, and a background thread
+converts and writes the frames out. If the writer falls behind and the ring
+is full, frames are dropped rather than making the game wait.
+
+Three writers are available:
+    PNGSequenceWriter  frame_000000.png, frame_000001.png, ... in a directory
+    RawWriter          one file of packed RGB24 frames, for example for
+                       ffmpeg -f rawvideo -pix_fmt rgb24 -s 600x500 -r 30 -i game.rgb
+    AVIWriter          uncompressed AVI that most players open directly
+
+Render a saved replay to video with:
+    python capture.py replays/game.bkr game.avi
+"""
+
+import os
+import queue
+import struct
+import sys
+import threading
+import zlib
+
+import numpy as np
+
+CAPACITY = 64  # Frames the ring buffer holds while the writer catches up
+AVI_MAX_BYTES = 1 << 30  # Start a new AVI file past this size; AVI 1.0 readers stop near 2 GB
+
+# Class for PNGSequenceWriter
+class PNGSequenceWriter:
+    """
+    Write frames as numbered PNG files.
+
+    Parameters:
+    directory (str): Directory to write into; created if missing.
+    level (int): zlib compression level, 1 (fast) to 9 (small).
+    """
+    def __init__(self, directory, level=1):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.level = level
+        self.count = 0
+
+    @staticmethod
+    def _chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    def write(self, rgb):
+        """
+        Write one frame.
+
+        Parameters:
+        rgb (numpy.ndarray): Uint8 array of shape (height, width, 3).
+        """
+        height, width, _ = rgb.shape
+        # Each scanline starts with filter type 0 (none)
+        rows = np.zeros((height, width * 3 + 1), dtype=np.uint8)
+        rows[:, 1:] = rgb.reshape(height, width * 3)
+        png = (b"\x89PNG\r\n\x1a\n"
+               + self._chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+               + self._chunk(b"IDAT", zlib.compress(rows.tobytes(), self.level))
+               + self._chunk(b"IEND", b""))
+        with open(os.path.join(self.directory, f"frame_{self.count:06d}.png"), 'wb') as file:
+            file.write(png)
+        self.count += 1
+
+    def close(self):
+        """
+        Nothing to finish; every frame is already a complete file.
+        """
+
+# Class for RawWriter
+class RawWriter:
+    """
+    Write frames back to back as packed RGB24 into one file.
+
+    Parameters:
+    path (str): File to write.
+    """
+    def __init__(self, path):
+        self.file = open(path, 'wb')
+        self.count = 0
+
+    def write(self, rgb):
+        """
+        Write one frame.
+
+        Parameters:
+        rgb (numpy.ndarray): Uint8 array of shape (height, width, 3).
+        """
+        self.file.write(np.ascontiguousarray(rgb).data)
+        self.count += 1
+
+    def close(self):
+        """
+        Close the file.
+        """
+        self.file.close()
+
+# Class for AVIWriter
+class AVIWriter:
+    """
+    Write frames into an uncompressed 24-bit AVI. Files are split into
+    name-001.avi, name-002.avi, ... once one reaches max_bytes.
+
+    Parameters:
+    path (str): File to write.
+    size (tuple): (width, height) of every frame.
+    fps (int): Frame rate to play back at.
+    max_bytes (int): Size at which to start the next file.
+    """
+    def __init__(self, path, size, fps, max_bytes=AVI_MAX_BYTES):
+        self.path = path
+        self.width, self.height = size
+        self.fps = fps
+        self.max_bytes = max_bytes
+        self.row_bytes = (self.width * 3 + 3) & ~3  # DIB rows are padded to 4 bytes
+        self.frame_bytes = self.row_bytes * self.height
+        self.paths = []
+        self.count = 0  # Frames in all files
+        self.file = None
+
+    def _open(self):
+        root, extension = os.path.splitext(self.path)
+        path = self.path if not self.paths else f"{root}-{len(self.paths):03d}{extension}"
+        self.paths.append(path)
+        self.file = open(path, 'wb')
+        self.index = []
+        width, height, frame_bytes = self.width, self.height, self.frame_bytes
+
+        avih = struct.pack("<14I", 1000000 // self.fps, frame_bytes * self.fps, 0, 0x10, 0, 0, 1,
+                           frame_bytes, width, height, 0, 0, 0, 0)
+        strh = struct.pack("<4s4sIHHIIIIIIIIhhhh", b"vids", b"DIB ", 0, 0, 0, 0, 1, self.fps, 0, 0,
+                           frame_bytes, 0xFFFFFFFF, 0, 0, 0, width, height)
+        strf = struct.pack("<IiiHHIIiiII", 40, width, height, 1, 24, 0, frame_bytes, 0, 0, 0, 0)
+        strl = b"strl" + b"strh" + struct.pack("<I", len(strh)) + strh + b"strf" + struct.pack("<I", len(strf)) + strf
+        hdrl = (b"hdrl" + b"avih" + struct.pack("<I", len(avih)) + avih
+                + b"LIST" + struct.pack("<I", len(strl)) + strl)
+        header = b"RIFF" + b"\0\0\0\0" + b"AVI " + b"LIST" + struct.pack("<I", len(hdrl)) + hdrl
+        # Places to fill in on close: dwTotalFrames in avih and dwLength in strh
+        self.total_frames_at = header.index(b"avih") + 8 + 16
+        self.length_at = header.index(b"strh") + 8 + 32
+        self.file.write(header)
+        self.movi_at = self.file.tell()
+        self.file.write(b"LIST\0\0\0\0movi")
+
+    def write(self, rgb):
+        """
+        Write one frame.
+
+        Parameters:
+        rgb (numpy.ndarray): Uint8 array of shape (height, width, 3).
+        """
+        if self.file is None or self.file.tell() + self.frame_bytes + 16 * (len(self.index) + 1) > self.max_bytes:
+            if self.file is not None:
+                self._finish()
+            self._open()
+        # DIBs are stored bottom row first, in BGR order
+        frame = np.zeros((self.height, self.row_bytes), dtype=np.uint8)
+        frame[:, :self.width * 3] = rgb[::-1, :, ::-1].reshape(self.height, self.width * 3)
+        self.index.append(self.file.tell() - self.movi_at - 8)
+        self.file.write(b"00db" + struct.pack("<I", self.frame_bytes))
+        self.file.write(frame.data)
+        self.count += 1
+
+    def _finish(self):
+        """
+        Write the index and fill in the sizes and frame counts of the current file.
+        """
+        file = self.file
+        movi_end = file.tell()
+        file.write(b"idx1" + struct.pack("<I", 16 * len(self.index)))
+        file.write(b"".join(struct.pack("<4sIII", b"00db", 0x10, offset, self.frame_bytes)
+                            for offset in self.index))
+        end = file.tell()
+        for position, value in ((4, end - 8), (self.movi_at + 4, movi_end - self.movi_at - 8),
+                                (self.total_frames_at, len(self.index)), (self.length_at, len(self.index))):
+            file.seek(position)
+            file.write(struct.pack("<I", value))
+        file.close()
+        self.file = None
+
+    def close(self):
+        """
+        Finish the last file.
+        """
+        if self.file is not None:
+            self._finish()
+
+def open_writer(path, size, fps):
+    """
+    Pick a writer from a path: .avi for AVIWriter, .rgb or .raw for RawWriter,
+    anything else is a directory for PNGSequenceWriter.
+
+    Parameters:
+    path (str): Where to write.
+    size (tuple): (width, height) of the frames.
+    fps (int): Frame rate, for AVI files.
+
+    Returns:
+    The writer.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".avi":
+        return AVIWriter(path, size, fps)
+    if extension in (".rgb", ".raw"):
+        return RawWriter(path)
+    return PNGSequenceWriter(path)
+
+# Class for FrameCapture
+class FrameCapture:
+    """
+    Capture frames of a surface to a writer on a background thread.
+
+    Parameters:
+    surface (pygame.Surface): A 24 or 32-bit surface, normally the screen.
+    writer: A PNGSequenceWriter, RawWriter or AVIWriter.
+    capacity (int): Number of frames the ring buffer holds.
+    """
+    def __init__(self, surface, writer, capacity=CAPACITY):
+        self.writer = writer
+        self.width, self.height = surface.get_size()
+        self.pitch = surface.get_pitch()
+        bytesize = surface.get_bytesize()
+        if bytesize not in (3, 4):
+            raise ValueError("frame capture needs a 24 or 32-bit surface")
+        # Byte offset of red, green and blue within each pixel
+        self.channels = [shift // 8 for shift in surface.get_shifts()[:3]]
+        self.bytesize = bytesize
+
+        self.ring = np.empty((capacity, self.height, self.pitch), dtype=np.uint8)
+        self.free = queue.SimpleQueue()
+        for slot in range(capacity):
+            self.free.put(slot)
+        self.filled = queue.SimpleQueue()
+        self.captured = self.dropped = 0
+        self.error = None
+        self.thread = threading.Thread(target=self._write_frames, name="frame-writer", daemon=True)
+        self.thread.start()
+
+    def grab(self, surface, block=False):
+        """
+        Copy the surface's current pixels into the ring.
+
+        Parameters:
+        surface (pygame.Surface): The surface given to the constructor.
+        block (bool): Wait for the writer if the ring is full, instead of
+        dropping the frame. Only for offline rendering.
+
+        Returns:
+        bool: True if the frame was captured, False if it was dropped.
+        """
+        try:
+            slot = self.free.get(block)
+        except queue.Empty:
+            self.dropped += 1
+            return False
+        # The buffer is the surface's own pixel memory; one copy, and it is
+        # released straight away so the surface is unlocked again
+        pixels = surface.get_buffer()
+        np.copyto(self.ring[slot], np.frombuffer(pixels, dtype=np.uint8).reshape(self.height, self.pitch))
+        del pixels
+        self.filled.put(slot)
+        self.captured += 1
+        return True
+
+    def _write_frames(self):
+        width, bytesize = self.width, self.bytesize
+        while True:
+            slot = self.filled.get()
+            if slot is None:
+                break
+            if self.error is None:
+                try:
+                    pixels = self.ring[slot, :, :width * bytesize].reshape(self.height, width, bytesize)
+                    self.writer.write(pixels[:, :, self.channels])
+                except Exception as error:  # Handed to the main thread by close()
+                    self.error = error
+            self.free.put(slot)
+
+    def close(self):
+        """
+        Write out every captured frame and close the writer.
+        """
+        self.filled.put(None)
+        self.thread.join()
+        self.writer.close()
+        if self.error is not None:
+            error, self.error = self.error, None
+            raise error
+
+def render_replay(replay, writer):
+    """
+    Play a replay headless, drawing every frame to a writer.
+
+    Parameters:
+    replay (replay.Replay): The recording.
+    writer: A PNGSequenceWriter, RawWriter or AVIWriter.
+
+    Returns:
+    int: Number of frames written.
+    """
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    import pygame
+    from renderer import Renderer
+    from replay import play
+    from simulation import WIDTH, HEIGHT
+
+    pygame.font.init()
+    surface = pygame.Surface((WIDTH, HEIGHT), depth=32)
+    renderer = Renderer(surface, pygame.font.Font(None, 15))
+    capture = FrameCapture(surface, writer)
+    def draw(game):
+        renderer.draw(game)
+        capture.grab(surface, block=True)
+    try:
+        play(replay, on_step=draw)
+    finally:
+        capture.close()
+    return capture.captured
+
+def main():
+    if len(sys.argv) != 3:
+        sys.exit("usage: python capture.py REPLAY OUTPUT")
+    from replay import Replay
+    from simulation import WIDTH, HEIGHT
+    count = render_replay(Replay.load(sys.argv[1]), open_writer(sys.argv[2], (WIDTH, HEIGHT), 30))
+    print(f"{count} frames written to {sys.argv[2]}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+import os
+import struct
+import tempfile
+import threading
+import unittest
+
+import numpy as np
+import pygame
+
+from capture import AVIWriter, FrameCapture, PNGSequenceWriter, RawWriter, render_replay
+from replay_test import record
+
+
+class ListWriter:
+    """Writer that keeps frames in memory, optionally waiting to be let go."""
+
+    def __init__(self, gate=None):
+        self.frames = []
+        self.gate = gate
+        self.closed = False
+
+    def write(self, rgb):
+        if self.gate is not None:
+            self.gate.wait()
+        self.frames.append(rgb.copy())
+
+    def close(self):
+        self.closed = True
+
+
+def read_avi(path):
+    """Split an AVI into its header values and frame payloads."""
+    with open(path, 'rb') as file:
+        data = file.read()
+    assert data[:4] == b"RIFF" and data[8:12] == b"AVI "
+    assert struct.unpack_from("<I", data, 4)[0] == len(data) - 8
+    total_frames = struct.unpack_from("<I", data, data.index(b"avih") + 8 + 16)[0]
+    width, height = struct.unpack_from("<ii", data, data.index(b"strf") + 12)
+    movi = data.index(b"movi") - 8
+    idx1 = data.index(b"idx1", movi + struct.unpack_from("<I", data, movi + 4)[0] + 8)
+    frames = []
+    for position in range(idx1 + 8, len(data), 16):
+        kind, flags, offset, size = struct.unpack_from("<4sIII", data, position)
+        start = movi + 8 + offset + 8
+        assert data[start - 8:start - 4] == kind == b"00db"
+        frames.append(data[start:start + size])
+    return total_frames, (width, height), frames
+
+
+class TestCapture(unittest.TestCase):
+    """Unit test case for frame capture and the video writers."""
+
+    def setUp(self):
+        """Draw a recognisable frame and make a directory for output."""
+        self.surface = pygame.Surface((64, 48), depth=32)
+        self.surface.fill((10, 20, 30))
+        pygame.draw.rect(self.surface, (200, 100, 50), (5, 0, 10, 4))
+        self.rgb = pygame.surfarray.array3d(self.surface).transpose(1, 0, 2)
+        self.directory = tempfile.TemporaryDirectory()
+
+    def test_frames_match_surface(self):
+        """Test that captured frames are the surface's pixels in RGB order."""
+        writer = ListWriter()
+        capture = FrameCapture(self.surface, writer)
+        for _ in range(3):
+            self.assertTrue(capture.grab(self.surface))
+        capture.close()
+        self.assertTrue(writer.closed)
+        self.assertEqual(len(writer.frames), 3)
+        np.testing.assert_array_equal(writer.frames[0], self.rgb)
+
+    def test_full_ring_drops_frames(self):
+        """Test that a slow writer makes frames drop instead of blocking the game."""
+        gate = threading.Event()
+        writer = ListWriter(gate)
+        capture = FrameCapture(self.surface, writer, capacity=2)
+        grabbed = [capture.grab(self.surface) for _ in range(5)]
+        self.assertEqual(grabbed, [True, True, False, False, False])
+        self.assertEqual(capture.dropped, 3)
+        gate.set()
+        capture.close()
+        self.assertEqual(len(writer.frames), 2)
+
+    def test_writer_error_reaches_caller(self):
+        """Test that an error on the writer thread is raised by close()."""
+        writer = ListWriter()
+        writer.write = lambda rgb: 1 / 0
+        capture = FrameCapture(self.surface, writer)
+        capture.grab(self.surface)
+        with self.assertRaises(ZeroDivisionError):
+            capture.close()
+
+    def test_png_sequence(self):
+        """Test that PNG frames load back as the captured image."""
+        writer = PNGSequenceWriter(self.directory.name)
+        writer.write(self.rgb)
+        image = pygame.image.load(os.path.join(self.directory.name, "frame_000000.png"))
+        np.testing.assert_array_equal(pygame.surfarray.array3d(image).transpose(1, 0, 2), self.rgb)
+
+    def test_raw(self):
+        """Test that raw files hold packed RGB frames back to back."""
+        path = os.path.join(self.directory.name, "frames.rgb")
+        writer = RawWriter(path)
+        writer.write(self.rgb)
+        writer.write(self.rgb)
+        writer.close()
+        data = np.fromfile(path, dtype=np.uint8).reshape(2, 48, 64, 3)
+        np.testing.assert_array_equal(data[1], self.rgb)
+
+    def test_avi(self):
+        """Test that the AVI has consistent headers, an index and bottom-up BGR frames."""
+        path = os.path.join(self.directory.name, "game.avi")
+        writer = AVIWriter(path, (64, 48), 30)
+        for _ in range(4):
+            writer.write(self.rgb)
+        writer.close()
+        total_frames, size, frames = read_avi(path)
+        self.assertEqual((total_frames, size, len(frames)), (4, (64, 48), 4))
+        frame = np.frombuffer(frames[0], dtype=np.uint8).reshape(48, 64, 3)
+        np.testing.assert_array_equal(frame[::-1, :, ::-1], self.rgb)
+
+    def test_avi_splits_large_recordings(self):
+        """Test that recordings past max_bytes continue in numbered files."""
+        path = os.path.join(self.directory.name, "game.avi")
+        writer = AVIWriter(path, (64, 48), 30, max_bytes=40000)
+        for _ in range(10):
+            writer.write(self.rgb)
+        writer.close()
+        self.assertGreater(len(writer.paths), 1)
+        self.assertEqual(sum(read_avi(path)[0] for path in writer.paths), 10)
+
+    def test_render_replay(self):
+        """Test drawing every frame of a replay."""
+        game, replay = record(3, 40)
+        writer = ListWriter()
+        self.assertEqual(render_replay(replay, writer), 40)
+        self.assertEqual(len(writer.frames), 40)
+        self.assertEqual(writer.frames[0].shape, (500, 600, 3))
+
+    def tearDown(self):
+        """Remove the output directory."""
+        self.directory.cleanup()
+
+
+if __name__ == '__main__':
+    unittest.main()
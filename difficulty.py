@@ -0,0 +1,321 @@
+"""
+Monte Carlo level difficulty analysis.
+
+Plays thousands of headless games of a single level layout with a scripted
+paddle across a process pool and reports how often the level is cleared,
+how long clearing takes, the spread of scores and how often each brick is
+hit. Reports are cached in the level cache directory under a hash of the
+compiled layout and the analysis settings, so analysing an unchanged level
+again costs nothing:
+
+    python difficulty.py levels/level2.json --episodes 2000
+    python difficulty.py --classic
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+from levels import CACHE_DIR, LEVEL_DIR, Layout, LevelSet, load_level
+from physics import TICK_RATE
+from profiler import percentile
+from runner import episode_seed, follow_ball
+from simulation import BLOCK_WIDTH, BLOCK_HEIGHT, HORIZONTAL_GAP, VERTICAL_GAP, WIDTH, HEIGHT, Game
+
+ANALYSIS_VERSION = 2  # Bump when the simulation changes, so cached reports are not reused
+EPISODES = 1000
+MAX_FRAMES = 20000
+SHADES = ".:-=+*#%@"  # Heatmap characters from fewest hits to most
+
+def _autopilot(seed):
+    from autopilot import Autopilot
+    return Autopilot(seed)
+
+# Paddle policies by name, each a function that makes a fresh policy for the game with the given seed
+POLICIES = {
+    "follow": lambda seed: follow_ball,
+    "autopilot": _autopilot,
+}
+
+def classic_layout():
+    """
+    Describe the classic grid of random blocks from create_blocks as a layout.
+
+    Returns:
+    levels.Layout: Every brick is of a random standard color.
+    """
+    cell_width, cell_height = BLOCK_WIDTH + HORIZONTAL_GAP, BLOCK_HEIGHT + VERTICAL_GAP
+    bricks = [(x, y, BLOCK_WIDTH, BLOCK_HEIGHT, None, 0, 1)
+              for x in range(0, WIDTH, cell_width) for y in range(0, HEIGHT // 2, cell_height)]
+    return Layout(bricks, cell_width, cell_height, "Classic")
+
+def layout_hash(layout):
+    """
+    Hash a layout by its compiled form, so reformatting its file does not change it.
+
+    Returns:
+    str: Hex digest.
+    """
+    return hashlib.sha256(layout.to_bytes()).hexdigest()
+
+# Class for SingleLevel
+class SingleLevel:
+    """
+    Stand in for a levels.LevelSet holding just one layout, so a game ends
+    as soon as the layout is cleared.
+
+    Parameters:
+    layout (levels.Layout): The layout to play.
+    """
+    def __init__(self, layout):
+        self.layout = layout
+
+    def __len__(self):
+        return 1
+
+    def __getitem__(self, level):
+        return self.layout
+
+def play_level(layout, seed, policy="follow", max_frames=MAX_FRAMES, powerups=True):
+    """
+    Play one game of a layout until it is cleared, the lives run out or max_frames.
+
+    Parameters:
+    layout (levels.Layout): The layout.
+    seed: Seed for the game.
+    policy (str): Name of a paddle policy in POLICIES.
+    max_frames (int): Frame limit for the game.
+    powerups (bool): Whether destroyed blocks can drop power-ups.
+
+    Returns:
+    tuple: (cleared, frames, score, damage), where damage is the number of
+    hits each brick of the layout took, in layout order.
+    """
+    game = Game(seed, powerups=powerups, levels=SingleLevel(layout))
+    pilot = POLICIES[policy](seed)
+    # Blocks keep their health after they are removed, so what each one took
+    # can be read off at the end without watching every step
+    order = {(x, y): index for index, (x, y, *_) in enumerate(layout.bricks)}
+    blocks = [(order[block.posx, block.posy], block, block.health) for block in game.blocks]
+    while not game.over and game.frame < max_frames:
+        game.step(pilot(game))
+    damage = [0] * len(layout.bricks)
+    for index, block, health in blocks:
+        damage[index] = health - max(block.health, 0)
+    return not game.blocks, game.frame, game.score, damage
+
+def _run_chunk(args):
+    """
+    Play a list of games in a worker process, adding up the damage to each brick.
+    """
+    layout, seeds, policy, max_frames, powerups = args
+    outcomes = []
+    hits = [0] * len(layout.bricks)
+    broken = [0] * len(layout.bricks)
+    health = [brick[6] for brick in layout.bricks]
+    for seed in seeds:
+        cleared, frames, score, damage = play_level(layout, seed, policy, max_frames, powerups)
+        outcomes.append((cleared, frames, score))
+        for index, taken in enumerate(damage):
+            hits[index] += taken
+            broken[index] += taken >= health[index]
+    return outcomes, hits, broken
+
+def simulate(layout, episodes=EPISODES, base_seed=0, workers=None, policy="follow", max_frames=MAX_FRAMES,
+             powerups=True):
+    """
+    Play many games of a layout across a process pool.
+
+    Parameters:
+    layout (levels.Layout): The layout.
+    episodes (int): Number of games.
+    base_seed (int): Seed of the whole run.
+    workers (int): Number of worker processes; all cores by default, 1 runs in-process.
+    policy (str): Name of a paddle policy in POLICIES.
+    max_frames (int): Frame limit per game.
+    powerups (bool): Whether destroyed blocks can drop power-ups.
+
+    Returns:
+    tuple: (outcomes, hits, broken): a (cleared, frames, score) tuple per
+    game in episode order, and per brick the total hits and the number of
+    games it was destroyed in.
+    """
+    if policy not in POLICIES:
+        raise ValueError(f"unknown policy {policy!r}; choose from {', '.join(POLICIES)}")
+    seeds = [episode_seed(base_seed, i) for i in range(episodes)]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        return _run_chunk((layout, seeds, policy, max_frames, powerups))
+
+    chunk_size = max(1, episodes // (workers * 4))
+    chunks = [(layout, seeds[i:i + chunk_size], policy, max_frames, powerups) for i in range(0, episodes, chunk_size)]
+    outcomes, hits, broken = [], [0] * len(layout.bricks), [0] * len(layout.bricks)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for chunk_outcomes, chunk_hits, chunk_broken in executor.map(_run_chunk, chunks):
+            outcomes.extend(chunk_outcomes)
+            hits = [total + more for total, more in zip(hits, chunk_hits)]
+            broken = [total + more for total, more in zip(broken, chunk_broken)]
+    return outcomes, hits, broken
+
+def report(layout, outcomes, hits, broken):
+    """
+    Summarize simulated games of a layout.
+
+    Parameters:
+    layout (levels.Layout): The layout played.
+    outcomes (list): (cleared, frames, score) per game.
+    hits (list): Total hits per brick.
+    broken (list): Games each brick was destroyed in.
+
+    Returns:
+    dict: "name", "layout" (hash), "episodes", "clear_rate", "mean_clear_frames"
+    and "mean_clear_seconds" (over cleared games only, 0 if none were),
+    "score" (mean, min, p10, p50, p90 and max) and "bricks", per brick its
+    "x", "y", "health", mean "hits" per game and the "broken" fraction of games.
+    """
+    episodes = len(outcomes)
+    clears = [frames for cleared, frames, _ in outcomes if cleared]
+    scores = sorted(score for _, _, score in outcomes)
+    mean_clear = sum(clears) / len(clears) if clears else 0
+    return {
+        "name": layout.name,
+        "layout": layout_hash(layout),
+        "episodes": episodes,
+        "clear_rate": len(clears) / episodes if episodes else 0,
+        "mean_clear_frames": mean_clear,
+        "mean_clear_seconds": mean_clear / TICK_RATE,
+        "score": {
+            "mean": sum(scores) / episodes if episodes else 0,
+            "min": scores[0] if scores else 0,
+            "p10": percentile(scores, 0.10),
+            "p50": percentile(scores, 0.50),
+            "p90": percentile(scores, 0.90),
+            "max": scores[-1] if scores else 0,
+        },
+        "bricks": [{"x": x, "y": y, "health": health, "hits": total / episodes if episodes else 0,
+                    "broken": count / episodes if episodes else 0}
+                   for (x, y, _, _, _, _, health), total, count in zip(layout.bricks, hits, broken)],
+    }
+
+def analyze(layout, episodes=EPISODES, base_seed=0, workers=None, policy="follow", max_frames=MAX_FRAMES,
+            powerups=True, cache_dir=CACHE_DIR):
+    """
+    Report on a layout's difficulty, reusing a cached report when the layout
+    and settings have been analysed before.
+
+    Parameters:
+    layout (levels.Layout): The layout.
+    episodes, base_seed, workers, policy, max_frames, powerups: As for simulate().
+    cache_dir (str): Directory of cached reports, or None to always simulate.
+
+    Returns:
+    dict: The report, as from report(), with "cached" saying whether it came from the cache.
+    """
+    settings = {"version": ANALYSIS_VERSION, "episodes": episodes, "seed": base_seed, "policy": policy,
+                "max_frames": max_frames, "powerups": powerups}
+    key = hashlib.sha256(layout.to_bytes() + json.dumps(settings, sort_keys=True).encode()).hexdigest()
+    cache_path = os.path.join(cache_dir, f"{key}.difficulty.json") if cache_dir else None
+    if cache_path:
+        try:
+            with open(cache_path) as file:
+                return dict(json.load(file), cached=True)
+        except (OSError, ValueError):
+            pass
+
+    result = report(layout, *simulate(layout, episodes, base_seed, workers, policy, max_frames, powerups))
+    if cache_path:
+        temp_path = None
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            handle, temp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+            with os.fdopen(handle, 'w') as file:
+                json.dump(result, file)
+            os.replace(temp_path, cache_path)
+        except OSError:
+            # Still answered, just not remembered
+            if temp_path is not None and os.path.exists(temp_path):
+                os.remove(temp_path)
+    return dict(result, cached=False)
+
+def heatmap(result, layout):
+    """
+    Draw the mean hits per brick as a grid of characters, one per grid cell.
+
+    Parameters:
+    result (dict): A report from analyze().
+    layout (levels.Layout): The layout it is for.
+
+    Returns:
+    str: One line per row of the layout; darker characters took more hits.
+    """
+    cells = {}
+    for brick in result["bricks"]:
+        cells[brick["y"] // layout.cell_height, brick["x"] // layout.cell_width] = brick["hits"]
+    if not cells:
+        return ""
+    most = max(cells.values()) or 1
+    rows = max(row for row, _ in cells) + 1
+    columns = max(column for _, column in cells) + 1
+    lines = []
+    for row in range(rows):
+        line = ""
+        for column in range(columns):
+            hits = cells.get((row, column))
+            line += " " if hits is None else SHADES[min(int(hits / most * len(SHADES)), len(SHADES) - 1)]
+        lines.append(line.rstrip())
+    return "\n".join(lines)
+
+def format_report(result, layout):
+    """
+    Format a report for the terminal.
+
+    Returns:
+    str: Summary lines followed by the heatmap.
+    """
+    score = result["score"]
+    lines = [
+        f"{result['name']} ({result['layout'][:12]}, {result['episodes']} games"
+        f"{', cached' if result.get('cached') else ''})",
+        f"  cleared {result['clear_rate']:.1%}, in {result['mean_clear_seconds']:.1f} s on average",
+        f"  score mean {score['mean']:.0f}, p10 {score['p10']}, p50 {score['p50']}, p90 {score['p90']},"
+        f" max {score['max']}",
+        "  hits per brick:",
+    ]
+    lines += ["    " + line for line in heatmap(result, layout).splitlines()]
+    return "\n".join(lines)
+
+def main():
+    parser = argparse.ArgumentParser(description="Estimate how hard level layouts are by simulated play.")
+    parser.add_argument("paths", nargs="*", help="Level files; every level in the levels directory by default")
+    parser.add_argument("--classic", action="store_true", help="Analyse the classic random grid instead")
+    parser.add_argument("--episodes", type=int, default=EPISODES)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--policy", choices=sorted(POLICIES), default="follow")
+    parser.add_argument("--max-frames", type=int, default=MAX_FRAMES)
+    parser.add_argument("--no-powerups", action="store_true")
+    parser.add_argument("--no-cache", action="store_true")
+    parser.add_argument("--json", action="store_true", help="Print the full reports as JSON")
+    args = parser.parse_args()
+
+    if args.classic:
+        layouts = [classic_layout()]
+    elif args.paths:
+        layouts = [load_level(path)[0] for path in args.paths]
+    else:
+        layouts = LevelSet(LEVEL_DIR).layouts
+    results = []
+    for layout in layouts:
+        result = analyze(layout, args.episodes, args.seed, args.workers, args.policy, args.max_frames,
+                         not args.no_powerups, None if args.no_cache else CACHE_DIR)
+        results.append(result)
+        if not args.json:
+            print(format_report(result, layout))
+    if args.json:
+        print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+import os
+import tempfile
+import unittest
+
+from difficulty import analyze, classic_layout, heatmap, layout_hash, play_level, report, simulate
+from levels import parse_level
+from simulation import BLOCK_WIDTH, BLOCK_HEIGHT, HORIZONTAL_GAP, VERTICAL_GAP, create_blocks
+
+SMALL = '{"name": "Small", "bricks": {"S": {"color": [1, 2, 3], "points": 7, "health": 2}}, "layout": ["W..S", "", "G?"]}'
+
+
+class TestDifficulty(unittest.TestCase):
+    """Unit test case for the Monte Carlo level difficulty analyzer."""
+
+    def setUp(self):
+        """Compile a small layout."""
+        self.layout = parse_level(SMALL)
+
+    def test_classic_layout(self):
+        """Test that the classic layout puts bricks where create_blocks does."""
+        blocks = create_blocks(BLOCK_WIDTH, BLOCK_HEIGHT, HORIZONTAL_GAP, VERTICAL_GAP)
+        self.assertEqual([(x, y) for x, y, *_ in classic_layout().bricks], [(block.posx, block.posy) for block in blocks])
+
+    def test_play_level(self):
+        """Test that one game of a layout is repeatable and accounts for every hit."""
+        for policy in ("follow", "autopilot"):
+            result = play_level(self.layout, "a", policy, max_frames=5000)
+            self.assertEqual(result, play_level(self.layout, "a", policy, max_frames=5000))
+        cleared, frames, score, damage = result
+        self.assertTrue(cleared)
+        self.assertLess(frames, 5000)
+        self.assertEqual(damage, [1, 1, 1, 2])  # Bricks go column by column
+
+    def test_pool_matches_in_process(self):
+        """Test that spreading games across workers does not change the results."""
+        serial = simulate(self.layout, 6, base_seed=2, workers=1, max_frames=3000)
+        pooled = simulate(self.layout, 6, base_seed=2, workers=3, max_frames=3000)
+        self.assertEqual(serial, pooled)
+        with self.assertRaises(ValueError):
+            simulate(self.layout, 1, policy="psychic")
+
+    def test_report(self):
+        """Test the summary of a handful of made-up games."""
+        outcomes = [(True, 300, 40), (False, 900, 10), (True, 600, 30), (False, 100, 0)]
+        result = report(self.layout, outcomes, [4, 2, 3, 6], [4, 2, 3, 2])
+        self.assertEqual(result["clear_rate"], 0.5)
+        self.assertEqual(result["mean_clear_frames"], 450)
+        self.assertEqual(result["score"]["p50"], 10)
+        self.assertEqual((result["score"]["min"], result["score"]["max"]), (0, 40))
+        self.assertEqual(result["bricks"][3], {"x": 180, "y": 0, "health": 2, "hits": 1.5, "broken": 0.5})
+        self.assertEqual(heatmap(result, self.layout).splitlines(), ["#  @", "", "=+"])
+
+    def test_cached_per_layout(self):
+        """Test that a report is reused for the same layout and settings, and only then."""
+        with tempfile.TemporaryDirectory() as directory:
+            first = analyze(self.layout, 4, workers=1, max_frames=2000, cache_dir=directory)
+            again = analyze(self.layout, 4, workers=1, max_frames=2000, cache_dir=directory)
+            self.assertFalse(first["cached"])
+            self.assertTrue(again["cached"])
+            self.assertEqual(dict(first, cached=True), again)
+            self.assertEqual(again["layout"], layout_hash(self.layout))
+
+            self.assertFalse(analyze(self.layout, 5, workers=1, max_frames=2000, cache_dir=directory)["cached"])
+            other = parse_level(SMALL.replace("W..S", "W.S."))
+            self.assertFalse(analyze(other, 4, workers=1, max_frames=2000, cache_dir=directory)["cached"])
+            self.assertEqual(len(os.listdir(directory)), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+"""
+Pool of preallocated, reusable game objects.
+
+Balls and power-ups come and go constantly once multi-ball is in play, so
+rather than creating and garbage collecting them, the game takes objects
+from a pool and hands them back. Pooled objects must have a writable
+pool_index attribute.
+"""
+
+# Class for EntityPool
+class EntityPool:
+    """
+    Initialize a pool.
+
+    Parameters:
+    factory (callable): Makes one object; called capacity times up front.
+    capacity (int): Number of objects to preallocate.
+    """
+    def __init__(self, factory, capacity):
+        self.free = [factory() for _ in range(capacity)]
+        self.active = []
+        for item in self.free:
+            item.pool_index = -1
+
+    def acquire(self):
+        """
+        Take an object out of the pool. The caller must reinitialize it.
+
+        Returns:
+        An inactive object, or None if the pool is exhausted.
+        """
+        if not self.free:
+            return None
+        item = self.free.pop()
+        self.adopt(item)
+        return item
+
+    def adopt(self, item):
+        """
+        Make an object created elsewhere active, as if it came from the pool.
+
+        Parameters:
+        item: The object to add.
+        """
+        item.pool_index = len(self.active)
+        self.active.append(item)
+
+    def release(self, item):
+        """
+        Return an active object to the pool in O(1). The last active object
+        takes its place, so the active order changes.
+
+        Parameters:
+        item: The object to release.
+        """
+        index = item.pool_index
+        last = self.active.pop()
+        if last is not item:
+            self.active[index] = last
+            last.pool_index = index
+        item.pool_index = -1
+        self.free.append(item)
+
+    def release_all(self):
+        """
+        Return every active object to the pool.
+        """
+        for item in self.active:
+            item.pool_index = -1
+        self.free.extend(self.active)
+        self.active.clear()
+
+    def __len__(self):
+        return len(self.active)
+
+    def __iter__(self):
+        return iter(self.active)
@@ -0,0 +1,52 @@
+import unittest
+
+from entities import EntityPool
+
+
+class Item:
+    """Minimal pooled object."""
+    __slots__ = ("pool_index",)
+
+
+class TestEntityPool(unittest.TestCase):
+    """Unit test case for the preallocated entity pool."""
+
+    def setUp(self):
+        """Create a small pool for testing."""
+        self.pool = EntityPool(Item, 3)
+
+    def test_acquire_until_exhausted(self):
+        """Test that the pool hands out each object once, then None."""
+        items = [self.pool.acquire() for _ in range(3)]
+        self.assertEqual(len(set(map(id, items))), 3)
+        self.assertIsNone(self.pool.acquire())
+        self.assertEqual(len(self.pool), 3)
+
+    def test_release_reuses_objects(self):
+        """Test that released objects come back instead of new ones being made."""
+        first = self.pool.acquire()
+        self.pool.release(first)
+        self.assertEqual(len(self.pool), 0)
+        self.assertIs(self.pool.acquire(), first)
+
+    def test_release_keeps_indices(self):
+        """Test that swap-removal keeps every active object's index right."""
+        a, b, c = (self.pool.acquire() for _ in range(3))
+        self.pool.release(a)
+        self.assertEqual(self.pool.active, [c, b])
+        self.assertEqual([item.pool_index for item in self.pool.active], [0, 1])
+        self.assertEqual(a.pool_index, -1)
+
+    def test_adopt_and_release_all(self):
+        """Test that outside objects can join the pool, and all go back together."""
+        outsider = Item()
+        self.pool.acquire()
+        self.pool.adopt(outsider)
+        self.assertEqual(len(self.pool), 2)
+        self.pool.release_all()
+        self.assertEqual(len(self.pool), 0)
+        self.assertEqual(len(self.pool.free), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,156 @@
+"""
+Gym-style environment for training paddle-control agents.
+
+BreakoutEnv follows the Gymnasium API, reset(seed) -> (observation, info) and
+step(action) -> (observation, reward, terminated, truncated, info), without
+depending on gym itself. Actions are indexes into ACTIONS. Each step repeats
+the action for frame_skip frames and the reward is the points scored.
+
+Two observations are available:
+    "vector": float32 array laid out like batch_env.BatchEnv.observe(): ball
+              x and y, ball direction, paddle x (positions scaled to 0..1),
+              then one alive flag per block of the standard layout.
+    "pixels": uint8 grayscale image of the frame, downsampled to pixel_size.
+
+Pixels are drawn offscreen with renderer.DirtyRenderer, shrunk into a small
+surface and read through a pygame.surfarray view of it, so no full-size frame
+is ever copied out of pygame. No display is needed. Shrinking samples the
+nearest pixels, except that rows are sampled more finely than the paddle is
+tall and then averaged, so the paddle never falls between samples.
+"""
+
+import math
+
+import numpy as np
+import pygame
+
+from batch_env import CELL_WIDTH, CELL_HEIGHT, ROWS, OBSERVATION_SIZE
+from renderer import DirtyRenderer
+from simulation import WIDTH, HEIGHT, PADDLE_HEIGHT, Game
+
+ACTIONS = (0, -1, 1)  # Action index -> paddle direction: stay, left, right
+FRAME_SKIP = 4
+PIXEL_SIZE = (84, 84)
+LUMA = (77, 150, 29)  # ITU-R 601 weights, in 256ths
+
+# Class for BreakoutEnv
+class BreakoutEnv:
+    """
+    Initialize a Breakout environment.
+
+    Parameters:
+    observation (str): "vector", "pixels" or "both"; with "both" observations
+    are dicts with "vector" and "pixels" entries.
+    frame_skip (int): Frames each action is repeated for.
+    pixel_size (tuple): (width, height) of the pixel observation.
+    max_steps (int): Optional step limit after which episodes are truncated.
+    seed (int): Optional seed for the first episode.
+    """
+    def __init__(self, observation="vector", frame_skip=FRAME_SKIP, pixel_size=PIXEL_SIZE,
+                 max_steps=None, seed=None):
+        if observation not in ("vector", "pixels", "both"):
+            raise ValueError(f"unknown observation type {observation!r}")
+        self.observation = observation
+        self.frame_skip = frame_skip
+        self.pixel_size = pixel_size
+        self.max_steps = max_steps
+        self.num_actions = len(ACTIONS)
+        self.game = Game(seed)
+        self.steps = 0
+
+        self.renderer = None
+        if observation != "vector":
+            pygame.font.init()
+            width, height = pixel_size
+            self.screen = pygame.Surface((WIDTH, HEIGHT))
+            self.small = pygame.Surface(pixel_size, depth=32)
+            oversample = math.ceil(HEIGHT / (height * PADDLE_HEIGHT))
+            self.tall = pygame.Surface((width, height * oversample), depth=32) if oversample > 1 else None
+            self.renderer = DirtyRenderer(self.screen, pygame.font.Font(None, 15))
+
+    def reset(self, seed=None):
+        """
+        Start a new episode.
+
+        Parameters:
+        seed (int): Optional seed for the new game.
+
+        Returns:
+        tuple: (observation, info).
+        """
+        self.game.reset(seed)
+        self.steps = 0
+        if self.renderer is not None:
+            self.renderer.invalidate()
+        return self._observe(), self._info()
+
+    def step(self, action):
+        """
+        Apply an action for frame_skip frames.
+
+        Parameters:
+        action (int): Index into ACTIONS.
+
+        Returns:
+        tuple: (observation, reward, terminated, truncated, info). terminated
+        is set when the game is over, truncated when max_steps is reached.
+        """
+        game = self.game
+        direction = ACTIONS[action]
+        score = game.score
+        for _ in range(self.frame_skip):
+            game.step(direction)
+            if game.over:
+                break
+        self.steps += 1
+        truncated = self.max_steps is not None and self.steps >= self.max_steps and not game.over
+        return self._observe(), game.score - score, game.over, truncated, self._info()
+
+    def _info(self):
+        game = self.game
+        return {"score": game.score, "lives": game.lives, "level": game.level, "frame": game.frame}
+
+    def _observe(self):
+        if self.observation == "vector":
+            return self.vector_observation()
+        if self.observation == "pixels":
+            return self.pixel_observation()
+        return {"vector": self.vector_observation(), "pixels": self.pixel_observation()}
+
+    def vector_observation(self):
+        """
+        Build the low-dimensional observation of the current frame.
+
+        Returns:
+        numpy.ndarray: Float32 array of OBSERVATION_SIZE values.
+        """
+        game = self.game
+        ball, paddle = game.ball, game.paddle
+        obs = np.zeros(OBSERVATION_SIZE, dtype=np.float32)
+        obs[:5] = ball.posx / WIDTH, ball.posy / HEIGHT, ball.x_fac, ball.y_fac, paddle.posx / WIDTH
+        for block in game.blocks:
+            obs[5 + int(block.posx // CELL_WIDTH) * ROWS + int(block.posy // CELL_HEIGHT)] = 1
+        return obs
+
+    def pixel_observation(self):
+        """
+        Draw the current frame and shrink it to a grayscale image.
+
+        Returns:
+        numpy.ndarray: Uint8 array of shape (height, width).
+        """
+        self.renderer.draw(self.game)
+        if self.tall is None:
+            pygame.transform.scale(self.screen, self.pixel_size, self.small)
+        else:
+            pygame.transform.scale(self.screen, self.tall.get_size(), self.tall)
+            pygame.transform.smoothscale(self.tall, self.pixel_size, self.small)
+        # pixels3d is a view of the surface's own memory, indexed [x, y, channel];
+        # it locks the surface, so let go of it before the next draw
+        rgb = pygame.surfarray.pixels3d(self.small)
+        gray = rgb[..., 0] * np.uint16(LUMA[0])
+        gray += rgb[..., 1] * np.uint16(LUMA[1])
+        gray += rgb[..., 2] * np.uint16(LUMA[2])
+        del rgb
+        gray >>= 8
+        return gray.T.astype(np.uint8)
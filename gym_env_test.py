@@ -0,0 +1,77 @@
+import unittest
+
+import numpy as np
+
+from batch_env import OBSERVATION_SIZE
+from gym_env import ACTIONS, BreakoutEnv
+from simulation import Game
+
+
+class TestBreakoutEnv(unittest.TestCase):
+    """Unit test case for the Gym-style training environment."""
+
+    def test_vector_observation(self):
+        """Test the layout of the vector observation."""
+        env = BreakoutEnv(seed=1)
+        obs, info = env.reset(1)
+        self.assertEqual((obs.shape, obs.dtype), ((OBSERVATION_SIZE,), np.float32))
+        self.assertEqual(obs[5:].sum(), len(env.game.blocks))
+        self.assertAlmostEqual(obs[0], env.game.ball.posx / 600)
+        self.assertEqual(info["lives"], 3)
+
+    def test_frame_skip_and_reward(self):
+        """Test that a step repeats the action and rewards the points scored."""
+        env = BreakoutEnv(frame_skip=3)
+        env.reset(5)
+        game = Game(5)
+        total = 0
+        for _ in range(300):
+            obs, reward, terminated, truncated, info = env.step(2)
+            for _ in range(3):
+                game.step(ACTIONS[2])
+            total += reward
+            self.assertEqual(info["frame"], game.frame)
+        self.assertEqual((total, env.game.paddle.posx), (game.score, game.paddle.posx))
+
+    def test_pixel_observation(self):
+        """Test that the pixel observation is a small grayscale frame showing the paddle."""
+        env = BreakoutEnv("pixels", pixel_size=(84, 84))
+        obs, _ = env.reset(2)
+        self.assertEqual((obs.shape, obs.dtype), ((84, 84), np.uint8))
+        paddle_row = int(env.game.paddle.posy * 84 / 500)
+        self.assertGreater(obs[paddle_row - 1:paddle_row + 2, 42].max(), 64)
+        self.assertEqual(obs[paddle_row - 1:paddle_row + 2, 2].max(), 0)
+
+    def test_pixels_follow_the_game(self):
+        """Test that moving the paddle moves it in the pixel observation."""
+        env = BreakoutEnv("both")
+        obs, _ = env.reset(2)
+        for _ in range(20):
+            obs, *_ = env.step(1)
+        paddle_row = int(env.game.paddle.posy * 84 / 500)
+        lit = np.flatnonzero(obs["pixels"][paddle_row - 1:paddle_row + 2].max(axis=0))
+        self.assertLess(lit[0], 5)
+        self.assertAlmostEqual(obs["vector"][4], 0)
+
+    def test_termination_and_truncation(self):
+        """Test that episodes end when the game is lost or the step limit is hit."""
+        env = BreakoutEnv(max_steps=10)
+        env.reset(3)
+        truncated = [env.step(0)[3] for _ in range(10)]
+        self.assertEqual(truncated, [False] * 9 + [True])
+
+        env = BreakoutEnv(frame_skip=8)
+        env.reset(3)
+        terminated = False
+        while not terminated:
+            obs, reward, terminated, truncated, info = env.step(0)
+        self.assertEqual(info["lives"], 0)
+
+    def test_bad_observation_type(self):
+        """Test that unknown observation types are rejected."""
+        with self.assertRaises(ValueError):
+            BreakoutEnv("rgb")
+
+
+if __name__ == '__main__':
+    unittest.main()
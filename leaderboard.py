@@ -0,0 +1,327 @@
+"""
+Shared leaderboard service for many cabinets.
+
+LeaderboardServer is an asyncio TCP server backed by SQLite. Submissions are
+queued and written in batches by a single writer thread, and top-N queries
+run on a small pool of reader threads, each with its own connection, against
+an index on score. LeaderboardClient talks to it from a background thread so
+the game never waits on the network.
+
+The protocol is one JSON object per line in each direction:
+    {"op": "submit", "score": 120, "initials": "ABC", "cabinet": "east-1"} -> {"ok": true}
+    {"op": "top", "n": 10} -> {"ok": true, "scores": [[score, initials], ...]}
+    {"op": "top", "n": 10, "initials": "ABC"} -> that player's best scores
+
+Run a server with:
+    python leaderboard.py --db leaderboard.db --port 8765
+"""
+
+import argparse
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_PORT = 8765
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scores (
+    id INTEGER PRIMARY KEY,
+    score INTEGER NOT NULL,
+    initials TEXT NOT NULL,
+    cabinet TEXT NOT NULL DEFAULT '',
+    submitted REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS scores_by_score ON scores (score DESC, id);
+CREATE INDEX IF NOT EXISTS scores_by_player ON scores (initials, score DESC, id);
+"""
+
+# Class for LeaderboardServer
+class LeaderboardServer:
+    """
+    Initialize a leaderboard server.
+
+    Parameters:
+    db_path (str): SQLite database file.
+    host (str): Address to listen on.
+    port (int): Port to listen on, 0 to pick a free one.
+    batch_size (int): Most submissions written in one transaction.
+    readers (int): Number of reader threads, each with its own connection.
+    """
+    def __init__(self, db_path, host="127.0.0.1", port=DEFAULT_PORT, batch_size=256, readers=4):
+        self.db_path = db_path
+        self.host = host
+        self.port = port
+        self.batch_size = batch_size
+        self.local = threading.local()
+        self.connections = []
+        self.connections_lock = threading.Lock()
+        self.write_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="leaderboard-writer")
+        self.read_executor = ThreadPoolExecutor(max_workers=readers, thread_name_prefix="leaderboard-reader")
+        self.server = None
+        self.queue = None
+        self.writer_task = None
+
+    def _connection(self):
+        """
+        Get the calling thread's SQLite connection, opening it the first time.
+        """
+        connection = getattr(self.local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.db_path, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self.local.connection = connection
+            with self.connections_lock:
+                self.connections.append(connection)
+        return connection
+
+    def _create_schema(self):
+        connection = self._connection()
+        connection.executescript(SCHEMA)
+        connection.commit()
+
+    def _insert(self, rows):
+        connection = self._connection()
+        with connection:
+            connection.executemany(
+                "INSERT INTO scores (score, initials, cabinet, submitted) VALUES (?, ?, ?, ?)", rows)
+
+    def _top(self, n, initials=None):
+        connection = self._connection()
+        if initials is None:
+            cursor = connection.execute(
+                "SELECT score, initials FROM scores ORDER BY score DESC, id LIMIT ?", (n,))
+        else:
+            cursor = connection.execute(
+                "SELECT score, initials FROM scores WHERE initials = ? ORDER BY score DESC, id LIMIT ?",
+                (initials, n))
+        return cursor.fetchall()
+
+    async def start(self):
+        """
+        Create the database and start listening.
+        """
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self.write_executor, self._create_schema)
+        self.queue = asyncio.Queue()
+        self.writer_task = asyncio.create_task(self._write_batches())
+        self.server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self):
+        """
+        Start the server and run until cancelled.
+        """
+        await self.start()
+        try:
+            await self.server.serve_forever()
+        finally:
+            await self.close()
+
+    async def close(self):
+        """
+        Stop listening, write out queued submissions and close the database.
+        """
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+            self.server = None
+        if self.writer_task is not None:
+            await self.queue.join()
+            self.writer_task.cancel()
+            self.writer_task = None
+        self.write_executor.shutdown()
+        self.read_executor.shutdown()
+        with self.connections_lock:
+            for connection in self.connections:
+                connection.close()
+            self.connections.clear()
+
+    async def _write_batches(self):
+        """
+        Drain the submission queue, writing everything waiting in one transaction.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            while len(batch) < self.batch_size and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+            try:
+                await loop.run_in_executor(self.write_executor, self._insert, [row for row, _ in batch])
+            except Exception as error:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(error)
+            else:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_result(None)
+            for _ in batch:
+                self.queue.task_done()
+
+    async def submit(self, score, initials, cabinet=""):
+        """
+        Queue a score and wait until it is committed.
+        """
+        future = asyncio.get_running_loop().create_future()
+        self.queue.put_nowait(((int(score), str(initials), str(cabinet), time.time()), future))
+        await future
+
+    async def top(self, n=10, initials=None):
+        """
+        Get the best scores, overall or for one player.
+
+        Returns:
+        list: (score, initials) tuples, best first.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.read_executor, self._top, int(n), initials)
+
+    async def _dispatch(self, request):
+        op = request.get("op")
+        if op == "submit":
+            await self.submit(request["score"], request["initials"], request.get("cabinet", ""))
+            return {"ok": True}
+        if op == "top":
+            scores = await self.top(request.get("n", 10), request.get("initials"))
+            return {"ok": True, "scores": [list(row) for row in scores]}
+        return {"ok": False, "error": f"unknown op {op!r}"}
+
+    async def _handle(self, reader, writer):
+        """
+        Serve one client connection until it closes.
+        """
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    response = await self._dispatch(json.loads(line))
+                except (ValueError, KeyError, TypeError) as error:
+                    response = {"ok": False, "error": str(error)}
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+# Class for LeaderboardClient
+class LeaderboardClient:
+    """
+    Initialize a leaderboard client that runs on its own background thread.
+
+    Calls return immediately with a concurrent.futures.Future; requests are
+    sent in order over one connection, which is reopened if it drops. A
+    submission whose reply is lost fails rather than being sent again, so a
+    score is never recorded twice.
+
+    Parameters:
+    host (str): Server address.
+    port (int): Server port.
+    cabinet (str): Name sent with every submission.
+    timeout (float): Seconds to wait for a connection or a reply.
+    """
+    def __init__(self, host="127.0.0.1", port=DEFAULT_PORT, cabinet="", timeout=2.0):
+        self.host, self.port = host, port
+        self.cabinet = cabinet
+        self.timeout = timeout
+        self.top_scores = []  # Last board fetched by refresh_top
+        self.reader = self.writer = None
+        self.loop = asyncio.new_event_loop()
+        self.lock = None
+        self.thread = threading.Thread(target=self.loop.run_forever, name="leaderboard-client", daemon=True)
+        self.thread.start()
+
+    async def _request(self, message, repeatable=True):
+        """
+        Send a request and wait for the reply, trying once more on a fresh
+        connection if it fails.
+
+        Parameters:
+        message (dict): The request.
+        repeatable (bool): Whether sending the request twice is harmless. A
+        request that is not is never sent again once written, since the
+        server may have acted on it before the reply was lost.
+
+        Returns:
+        dict: The server's reply.
+        """
+        if self.lock is None:
+            self.lock = asyncio.Lock()
+        async with self.lock:
+            for attempt in range(2):
+                written = False
+                try:
+                    if self.reader is not None and self.reader.at_eof():
+                        self._disconnect()  # Closed by the server while idle; nothing was sent on it
+                    if self.writer is None:
+                        self.reader, self.writer = await asyncio.wait_for(
+                            asyncio.open_connection(self.host, self.port), self.timeout)
+                    written = True
+                    self.writer.write(json.dumps(message).encode() + b"\n")
+                    await self.writer.drain()
+                    line = await asyncio.wait_for(self.reader.readline(), self.timeout)
+                    if not line:
+                        raise ConnectionError("leaderboard server closed the connection")
+                    return json.loads(line)
+                except (OSError, asyncio.TimeoutError):
+                    self._disconnect()
+                    if attempt or (written and not repeatable):
+                        raise
+
+    def _disconnect(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+    def submit(self, score, initials):
+        """
+        Send a score in the background.
+
+        Returns:
+        concurrent.futures.Future: Resolves to the server's reply.
+        """
+        message = {"op": "submit", "score": score, "initials": initials, "cabinet": self.cabinet}
+        return asyncio.run_coroutine_threadsafe(self._request(message, repeatable=False), self.loop)
+
+    def refresh_top(self, n=10):
+        """
+        Fetch the top scores in the background into top_scores.
+
+        Returns:
+        concurrent.futures.Future: Resolves to the list of (score, initials) tuples.
+        """
+        async def fetch():
+            reply = await self._request({"op": "top", "n": n})
+            self.top_scores = [tuple(row) for row in reply["scores"]]
+            return self.top_scores
+        return asyncio.run_coroutine_threadsafe(fetch(), self.loop)
+
+    def close(self):
+        """
+        Close the connection and stop the background thread.
+        """
+        async def shutdown():
+            self._disconnect()
+        asyncio.run_coroutine_threadsafe(shutdown(), self.loop).result(self.timeout)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(self.timeout)
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the shared Breakout leaderboard server.")
+    parser.add_argument("--db", default="leaderboard.db")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    args = parser.parse_args()
+    try:
+        asyncio.run(LeaderboardServer(args.db, args.host, args.port).serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+import asyncio
+import json
+import os
+import tempfile
+import threading
+import unittest
+
+from leaderboard import LeaderboardClient, LeaderboardServer
+
+
+class TestLeaderboard(unittest.TestCase):
+    """Unit test case for the shared leaderboard server and client."""
+
+    def setUp(self):
+        """Create a database file for the server."""
+        self.directory = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.directory.name, "leaderboard.db")
+
+    def test_burst_of_submissions(self):
+        """Test that concurrent cabinets' submissions are batched and all stored."""
+        async def scenario():
+            server = LeaderboardServer(self.db_path, port=0)
+            batches = []
+            insert = server._insert
+            server._insert = lambda rows: (batches.append(len(rows)), insert(rows))
+            await server.start()
+
+            async def cabinet(number):
+                reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+                for i in range(20):
+                    writer.write(json.dumps({"op": "submit", "score": number * 100 + i,
+                                             "initials": f"C{number}"}).encode() + b"\n")
+                await writer.drain()
+                replies = [json.loads(await reader.readline()) for _ in range(20)]
+                writer.close()
+                return replies
+
+            replies = await asyncio.gather(*(cabinet(number) for number in range(10)))
+            top = await server.top(3)
+            player = await server.top(2, "C4")
+            await server.close()
+            return replies, batches, top, player
+
+        replies, batches, top, player = asyncio.run(scenario())
+        self.assertTrue(all(reply == {"ok": True} for cabinet in replies for reply in cabinet))
+        self.assertEqual(sum(batches), 200)
+        self.assertLess(len(batches), 200)
+        self.assertEqual(top, [(919, "C9"), (918, "C9"), (917, "C9")])
+        self.assertEqual(player, [(419, "C4"), (418, "C4")])
+
+    def test_bad_request(self):
+        """Test that malformed requests get an error reply and keep the connection."""
+        async def scenario():
+            server = LeaderboardServer(self.db_path, port=0)
+            await server.start()
+            reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+            writer.write(b"not json\n{\"op\": \"nope\"}\n{\"op\": \"top\"}\n")
+            replies = [json.loads(await reader.readline()) for _ in range(3)]
+            writer.close()
+            await server.close()
+            return replies
+
+        bad, unknown, top = asyncio.run(scenario())
+        self.assertFalse(bad["ok"])
+        self.assertFalse(unknown["ok"])
+        self.assertEqual(top, {"ok": True, "scores": []})
+
+    def test_client(self):
+        """Test the game's background client against a localhost server."""
+        loop = asyncio.new_event_loop()
+        thread = threading.Thread(target=loop.run_forever, daemon=True)
+        thread.start()
+        server = LeaderboardServer(self.db_path, port=0)
+        asyncio.run_coroutine_threadsafe(server.start(), loop).result(5)
+
+        client = LeaderboardClient("127.0.0.1", server.port, cabinet="test")
+        futures = [client.submit(score, "AB") for score in (10, 30, 20)]
+        self.assertEqual([future.result(5) for future in futures], [{"ok": True}] * 3)
+        self.assertEqual(client.refresh_top(2).result(5), [(30, "AB"), (20, "AB")])
+        self.assertEqual(client.top_scores, [(30, "AB"), (20, "AB")])
+        client.close()
+
+        asyncio.run_coroutine_threadsafe(server.close(), loop).result(5)
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(5)
+        loop.close()
+
+    def test_client_without_server(self):
+        """Test that an unreachable server fails the future instead of blocking the caller."""
+        client = LeaderboardClient("127.0.0.1", 1, timeout=0.5)
+        with self.assertRaises(OSError):
+            client.submit(10, "AB").result(5)
+        client.close()
+
+    def test_submit_is_not_repeated(self):
+        """Test that a submission whose reply never comes fails instead of being stored twice."""
+        received = []
+        loop = asyncio.new_event_loop()
+        thread = threading.Thread(target=loop.run_forever, daemon=True)
+        thread.start()
+
+        async def silent(reader, writer):
+            # Takes requests but never answers, like a server stuck committing
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                received.append(json.loads(line)["op"])
+            writer.close()
+        server = asyncio.run_coroutine_threadsafe(asyncio.start_server(silent, "127.0.0.1", 0), loop).result(5)
+        port = server.sockets[0].getsockname()[1]
+
+        client = LeaderboardClient("127.0.0.1", port, timeout=0.3)
+        with self.assertRaises(asyncio.TimeoutError):
+            client.submit(10, "AB").result(5)
+        self.assertEqual(received, ["submit"])
+        with self.assertRaises(asyncio.TimeoutError):
+            client.refresh_top().result(5)
+        self.assertEqual(received, ["submit", "top", "top"])  # Reading the board again is harmless
+        client.close()
+
+        server.close()
+        asyncio.run_coroutine_threadsafe(server.wait_closed(), loop).result(5)
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(5)
+        loop.close()
+
+    def tearDown(self):
+        """Remove the database."""
+        self.directory.cleanup()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,256 @@
+"""
+Level files and their compiled cache.
+
+A level is a JSON file describing a grid of bricks:
+
+    {
+        "name": "Fortress",
+        "bricks": {"S": {"color": [128, 128, 128], "points": 50, "health": 3}},
+        "layout": [
+            "SSSSSSSSSS",
+            "S?......?S",
+            "RRRRRRRRRR"
+        ]
+    }
+
+Each character of a layout row is one grid cell. "." and " " are empty, "?"
+is a brick of a random standard color, and W, G, R, B and Y are the standard
+white, green, red, blue and yellow bricks. "bricks" can add or override
+letters. Optional "block_width", "block_height", "horizontal_gap" and
+"vertical_gap" change the grid from the classic one.
+
+Parsing JSON for every level switch would be wasted work, so each file is
+compiled once to a packed binary layout, cached in levels/__pycache__ under
+the hash of the file's contents, and loaded from there afterwards.
+"""
+
+import hashlib
+import json
+import os
+import struct
+import tempfile
+
+from simulation import (BLOCK_COLORS, BLOCK_POINTS, BLOCK_WIDTH, BLOCK_HEIGHT, HORIZONTAL_GAP, VERTICAL_GAP,
+                        WHITE, GREEN, RED, BLUE, YELLOW, Block)
+
+LEVEL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "levels")
+CACHE_DIR = os.path.join(LEVEL_DIR, "__pycache__")
+
+MAGIC = b"BKLV"
+VERSION = 1
+HEADER = struct.Struct("<4sBHHIB")  # magic, version, cell width, cell height, brick count, name length
+BRICK = struct.Struct("<HHHHBBBHBB")  # x, y, width, height, r, g, b, points, health, random
+U8, U16 = 0xFF, 0xFFFF  # Largest values the packed fields hold
+
+EMPTY = ". "
+RANDOM = "?"
+STANDARD_BRICKS = {
+    letter: {"color": list(color), "points": points, "health": 1}
+    for letter, color, points in zip("WGRBY", (WHITE, GREEN, RED, BLUE, YELLOW), BLOCK_POINTS)
+}
+
+# Class for Layout
+class Layout:
+    """
+    Initialize a compiled level layout.
+
+    Parameters:
+    bricks (list): (x, y, width, height, color, points, health) tuples, with
+    color None for a brick of random standard color.
+    cell_width (int): Width of a grid cell, one block plus its gap.
+    cell_height (int): Height of a grid cell, one block plus its gap.
+    name (str): Name of the level.
+    """
+    def __init__(self, bricks, cell_width, cell_height, name=""):
+        self.bricks = bricks
+        self.cell_width, self.cell_height = cell_width, cell_height
+        self.name = name
+
+    def build(self, rng):
+        """
+        Create the blocks for a fresh play of the level.
+
+        Parameters:
+        rng (random.Random): Source of randomness for random bricks.
+
+        Returns:
+        list: List of block objects.
+        """
+        blocks = []
+        for x, y, width, height, color, points, health in self.bricks:
+            if color is None:
+                kind = rng.randrange(len(BLOCK_COLORS))
+                color, points = BLOCK_COLORS[kind], BLOCK_POINTS[kind]
+            blocks.append(Block(x, y, width, height, color, points, health))
+        return blocks
+
+    def to_bytes(self):
+        """
+        Pack the layout into its binary cache format.
+
+        Returns:
+        bytes: The packed layout.
+        """
+        name = self.name.encode("utf-8")[:255]
+        out = bytearray(HEADER.pack(MAGIC, VERSION, self.cell_width, self.cell_height, len(self.bricks), len(name)))
+        out += name
+        for x, y, width, height, color, points, health in self.bricks:
+            red, green, blue = color or (0, 0, 0)
+            out += BRICK.pack(x, y, width, height, red, green, blue, points, health, color is None)
+        return bytes(out)
+
+    @classmethod
+    def from_bytes(cls, data):
+        """
+        Unpack a layout from its binary cache format.
+
+        Parameters:
+        data (bytes): A packed layout.
+
+        Returns:
+        Layout: The layout.
+        """
+        magic, version, cell_width, cell_height, count, name_length = HEADER.unpack_from(data)
+        start = HEADER.size + name_length
+        if magic != MAGIC or version != VERSION or len(data) != start + count * BRICK.size:
+            raise ValueError("not a compiled Breakout level, or an unsupported version")
+        bricks = [(x, y, width, height, None if random else (red, green, blue), points, health)
+                  for x, y, width, height, red, green, blue, points, health, random
+                  in BRICK.iter_unpack(memoryview(data)[start:])]
+        return cls(bricks, cell_width, cell_height, data[HEADER.size:start].decode("utf-8", "replace"))
+
+def parse_level(text, name="level"):
+    """
+    Compile the JSON source of a level.
+
+    Parameters:
+    text (str): The level file's contents.
+    name (str): Name used in error messages.
+
+    Returns:
+    Layout: The compiled layout.
+    """
+    try:
+        source = json.loads(text)
+        legend = dict(STANDARD_BRICKS, **source.get("bricks", {}))
+        block_width = source.get("block_width", BLOCK_WIDTH)
+        block_height = source.get("block_height", BLOCK_HEIGHT)
+        cell_width = block_width + source.get("horizontal_gap", HORIZONTAL_GAP)
+        cell_height = block_height + source.get("vertical_gap", VERTICAL_GAP)
+        rows = source["layout"]
+    except (ValueError, KeyError, TypeError, AttributeError) as error:
+        raise ValueError(f"{name}: bad level file: {error}") from None
+    for field, value in (("block_width", block_width), ("block_height", block_height),
+                         ("cell width", cell_width), ("cell height", cell_height)):
+        if not isinstance(value, int) or not 1 <= value <= U16:
+            raise ValueError(f"{name}: {field} must be a whole number from 1 to {U16}, not {value!r}")
+    if not isinstance(rows, list) or not all(isinstance(line, str) for line in rows):
+        raise ValueError(f"{name}: layout must be a list of strings")
+    title = source.get("name", name)
+    if not isinstance(title, str):
+        raise ValueError(f"{name}: name must be a string, not {title!r}")
+
+    # Bricks go column by column, top to bottom, the order create_blocks uses
+    bricks = []
+    for column in range(max(map(len, rows), default=0)):
+        for row, line in enumerate(rows):
+            char = line[column] if column < len(line) else " "
+            if char in EMPTY:
+                continue
+            x, y = column * cell_width, row * cell_height
+            if x > U16 or y > U16:
+                raise ValueError(f"{name}: row {row + 1}: brick {char!r} at ({x}, {y}) is past {U16} pixels")
+            if char == RANDOM:
+                bricks.append((x, y, block_width, block_height, None, 0, 1))
+                continue
+            brick = legend.get(char)
+            if brick is None:
+                raise ValueError(f"{name}: row {row + 1}: unknown brick {char!r}")
+            try:
+                color = tuple(int(channel) for channel in brick["color"])
+                points, health = int(brick.get("points", 0)), int(brick.get("health", 1))
+            except (ValueError, KeyError, TypeError) as error:
+                raise ValueError(f"{name}: brick {char!r}: {error}") from None
+            if len(color) != 3 or not all(0 <= channel <= U8 for channel in color):
+                raise ValueError(f"{name}: brick {char!r}: color must be 3 channels from 0 to {U8}, not {color}")
+            if not 0 <= points <= U16:
+                raise ValueError(f"{name}: brick {char!r}: points must be from 0 to {U16}, not {points}")
+            if not 1 <= health <= U8:
+                raise ValueError(f"{name}: brick {char!r}: health must be from 1 to {U8}, not {health}")
+            bricks.append((x, y, block_width, block_height, color, points, health))
+    return Layout(bricks, cell_width, cell_height, title)
+
+def load_level(path, cache_dir=CACHE_DIR):
+    """
+    Load a level file, compiling it only if no cached layout matches its contents.
+
+    Parameters:
+    path (str): The level file.
+    cache_dir (str): Directory of compiled layouts, or None to always compile.
+
+    Returns:
+    tuple: (Layout, content hash as bytes).
+    """
+    with open(path, 'rb') as file:
+        data = file.read()
+    digest = hashlib.sha256(data).digest()
+    name = os.path.splitext(os.path.basename(path))[0]
+    if cache_dir is None:
+        return parse_level(data.decode("utf-8"), name), digest
+
+    cache_path = os.path.join(cache_dir, f"{digest.hex()}.v{VERSION}.bin")
+    try:
+        with open(cache_path, 'rb') as file:
+            return Layout.from_bytes(file.read()), digest
+    except (OSError, ValueError, struct.error):
+        pass
+
+    layout = parse_level(data.decode("utf-8"), name)
+    packed = layout.to_bytes()
+    temp_path = None
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        handle, temp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+        with os.fdopen(handle, 'wb') as file:
+            file.write(packed)
+        os.replace(temp_path, cache_path)
+    except OSError:
+        pass  # A read-only install still works, just without the cache
+    finally:
+        # Gone once renamed into place; anything left is a failed write
+        if temp_path is not None and os.path.exists(temp_path):
+            os.remove(temp_path)
+    return layout, digest
+
+# Class for LevelSet
+class LevelSet:
+    """
+    Load every level*.json file in a directory, in level number order.
+
+    Parameters:
+    directory (str): Directory holding the level files.
+    cache (bool): Whether to keep compiled layouts in the directory's __pycache__.
+    """
+    def __init__(self, directory=LEVEL_DIR, cache=True):
+        cache_dir = os.path.join(directory, "__pycache__") if cache else None
+        names = [name for name in os.listdir(directory) if name.startswith("level") and name.endswith(".json")]
+        names.sort(key=lambda name: (len(name), name))  # level2 before level10
+        if not names:
+            raise ValueError(f"no level files in {directory}")
+        self.layouts = []
+        combined = hashlib.sha256()
+        for name in names:
+            layout, digest = load_level(os.path.join(directory, name), cache_dir)
+            self.layouts.append(layout)
+            combined.update(digest)
+        # Short fingerprint of the whole set, so replays can tell which levels they need
+        self.digest = int.from_bytes(combined.digest()[:4], "little")
+
+    def __len__(self):
+        return len(self.layouts)
+
+    def __getitem__(self, level):
+        """
+        Get the layout of a level, counting from 1.
+        """
+        return self.layouts[level - 1]
@@ -0,0 +1,136 @@
+import json
+import os
+import random
+import tempfile
+import unittest
+from unittest import mock
+
+import levels
+from levels import Layout, LevelSet, load_level, parse_level
+from simulation import RED, WHITE, Ball, Game, create_blocks
+
+
+LEVEL = {
+    "name": "Test",
+    "bricks": {"S": {"color": [128, 128, 128], "points": 50, "health": 3}},
+    "layout": ["S.R", "?W"],
+}
+
+
+class TestLevels(unittest.TestCase):
+    """Unit test case for level files and the compiled level cache."""
+
+    def setUp(self):
+        """Create a directory with two level files."""
+        self.directory = tempfile.TemporaryDirectory()
+        self.write("level1.json", LEVEL)
+        self.write("level2.json", {"layout": ["RRRR"]})
+
+    def write(self, name, level):
+        with open(os.path.join(self.directory.name, name), 'w') as file:
+            json.dump(level, file)
+
+    def test_parse(self):
+        """Test that bricks are placed on the grid, column by column."""
+        layout = parse_level(json.dumps(LEVEL))
+        self.assertEqual(layout.name, "Test")
+        self.assertEqual(layout.bricks, [(0, 0, 40, 15, (128, 128, 128), 50, 3),
+                                         (0, 35, 40, 15, None, 0, 1),
+                                         (60, 35, 40, 15, WHITE, 10, 1),
+                                         (120, 0, 40, 15, RED, 15, 1)])
+
+    def test_classic_level_matches_create_blocks(self):
+        """Test that a grid of random bricks is the same as the classic layout."""
+        layout = LevelSet(levels.LEVEL_DIR, cache=False)[1]
+        built = layout.build(random.Random(4))
+        classic = create_blocks(40, 15, 20, 20, random.Random(4))
+        self.assertEqual([(b.posx, b.posy, b.color, b.points) for b in built],
+                         [(b.posx, b.posy, b.color, b.points) for b in classic])
+
+    def test_binary_round_trip(self):
+        """Test that a compiled layout survives packing and unpacking."""
+        layout = parse_level(json.dumps(LEVEL))
+        unpacked = Layout.from_bytes(layout.to_bytes())
+        self.assertEqual((unpacked.bricks, unpacked.cell_width, unpacked.cell_height, unpacked.name),
+                         (layout.bricks, layout.cell_width, layout.cell_height, layout.name))
+
+    def test_cache_skips_parsing(self):
+        """Test that an unchanged file loads from the cache, and a changed one is recompiled."""
+        path = os.path.join(self.directory.name, "level1.json")
+        cache_dir = os.path.join(self.directory.name, "__pycache__")
+        first, digest = load_level(path, cache_dir)
+        with mock.patch.object(levels, "parse_level", side_effect=AssertionError("parsed")):
+            cached, cached_digest = load_level(path, cache_dir)
+        self.assertEqual((cached.bricks, cached_digest), (first.bricks, digest))
+
+        self.write("level1.json", {"layout": ["W"]})
+        changed, changed_digest = load_level(path, cache_dir)
+        self.assertNotEqual(changed_digest, digest)
+        self.assertEqual(len(changed.bricks), 1)
+
+    def test_bad_files(self):
+        """Test that broken level files are reported as ValueError."""
+        for text in ("not json", '{"name": "no layout"}', '{"layout": ["X"]}',
+                     '{"layout": ["S"], "bricks": {"S": {"color": [1, 2, 3], "health": 0}}}'):
+            with self.assertRaises(ValueError):
+                parse_level(text)
+
+    def test_out_of_range_fields(self):
+        """Test that values too big for the compiled format are reported as ValueError."""
+        bricks = ({"color": [1, 2, 3], "points": 70000}, {"color": [1, 2, 3], "points": -1},
+                  {"color": [1, 2, 3], "health": 256}, {"color": [1, 2, 256]}, {"color": [-1, 2, 3]})
+        for brick in bricks:
+            with self.assertRaises(ValueError):
+                parse_level(json.dumps({"layout": ["S"], "bricks": {"S": brick}}))
+        for grid in ({"block_width": 70000}, {"block_height": 1.5}, {"horizontal_gap": 65535},
+                     {"block_width": 0}, {"block_width": 0, "horizontal_gap": 0}, {"block_height": 0},
+                     {"block_height": 10, "vertical_gap": -10}):
+            with self.assertRaises(ValueError):
+                parse_level(json.dumps(dict(grid, layout=["W"])))
+        with self.assertRaises(ValueError):
+            parse_level(json.dumps({"block_width": 1000, "layout": ["." * 70 + "W"]}))
+
+    def test_wrong_field_types(self):
+        """Test that a name or layout of the wrong type is reported as ValueError."""
+        for level in ({"name": 5, "layout": ["W"]}, {"layout": [1, 2]}, {"layout": "WW"}, {"layout": None}):
+            with self.assertRaises(ValueError):
+                parse_level(json.dumps(level))
+        self.write("level3.json", {"name": 5, "layout": ["W"]})
+        with self.assertRaises(ValueError):
+            load_level(os.path.join(self.directory.name, "level3.json"), None)
+
+    def test_no_temporary_files_left(self):
+        """Test that the cache leaves no temporary files behind, whether or not writing it works."""
+        path = os.path.join(self.directory.name, "level1.json")
+        cache_dir = os.path.join(self.directory.name, "__pycache__")
+        for error in (OSError("read-only"), RuntimeError("interrupted")):
+            with mock.patch.object(levels.os, "replace", side_effect=error):
+                try:
+                    load_level(path, cache_dir)
+                except RuntimeError:
+                    pass
+            self.assertEqual(os.listdir(cache_dir), [])
+        load_level(path, cache_dir)
+        self.assertEqual([name for name in os.listdir(cache_dir) if name.endswith(".tmp")], [])
+
+    def test_game_plays_levels(self):
+        """Test that a game uses the level files and multi-hit blocks take several hits."""
+        level_set = LevelSet(self.directory.name)
+        self.assertEqual(len(level_set), 2)
+        game = Game(seed=1, levels=level_set)
+        self.assertEqual((len(game.blocks), game.max_level), (4, 2))
+        steel = next(iter(game.blocks))
+        self.assertEqual(steel.health, 3)
+        for hit in range(3):
+            game.ball = Ball(20, 10, 7, 0, WHITE)
+            game.step()
+        self.assertNotIn(steel, game.blocks)
+        self.assertEqual(game.score, 50)
+
+    def tearDown(self):
+        """Remove the level directory."""
+        self.directory.cleanup()
+
+
+if __name__ == '__main__':
+    unittest.main()
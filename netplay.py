@@ -0,0 +1,652 @@
+"""
+Spectating and versus play over the network.
+
+The host's games are authoritative. After every simulation step the host
+publishes each game's state to connected peers as a compact binary
+snapshot, and peers rebuild it into a Mirror that the normal renderers can
+draw. Spectators just watch; in versus play a second player sends paddle
+directions for a second game that the host runs alongside its own.
+
+Most snapshots are deltas carrying only what changed since the last one: the
+HUD values, the paddle, the balls, the falling power-ups and the indexes of
+blocks destroyed that step. Their size depends on what moved, not on how many
+blocks the level has. A keyframe with the whole state, block field included,
+is sent when a level starts, every KEYFRAME_INTERVAL steps, and to peers that
+have just joined or fallen behind.
+
+Every message is a u32 length followed by the payload, little-endian:
+    snapshot: kind (u8: 1 keyframe, 2 delta), stream (u8), frame (u32),
+              sections present (u8), then the sections in bit order:
+        1 HUD       score (u32), lives (i8), level (u8), over (u8)
+        2 paddle    x, width (i16 each, in 1/16 px)
+        4 balls     count (u16), then x, y per ball (i16, 1/16 px)
+        8 power-ups count (u8), then kind (u8), x, y per capsule
+        16 broken   count (varint), then ascending block indexes as
+                    varint differences (deltas only)
+              a keyframe then carries a zlib-compressed block field:
+              epoch (u16), cell width and height (f32), count (u32), then
+              per block the index difference (varint), x, y, width, height
+              (i16, 1/16 px), red, green, blue (u8)
+    hello:    kind 3, stream to control (u8, 255 to only watch)
+    input:    kind 4, stream (u8), paddle direction (i8)
+
+Peers are plain non-blocking TCP sockets polled from the game loop, so
+publishing never waits on the network.
+
+    python netplay.py watch HOST:PORT          # spectate the host's game
+    python netplay.py join HOST:PORT           # play the versus game
+"""
+
+import argparse
+import socket
+import struct
+import zlib
+
+from replay import _read_varint, _write_varint
+from simulation import (WIDTH, HEIGHT, START_LIVES, BALL_RADIUS, BALL_SPEED, PADDLE_WIDTH, PADDLE_HEIGHT, PADDLE_SPEED,
+                        WHITE, POWERUP_KINDS, Ball, Block, Paddle, PowerUp, Rect)
+from spatial import BlockGrid
+
+DEFAULT_PORT = 8766
+KEYFRAME_INTERVAL = 90  # Steps between keyframes, three seconds of play
+MAX_BUFFER = 1 << 20  # Bytes queued for a peer before it counts as behind
+SCALE = 16  # Positions are sent in sixteenths of a pixel
+
+KEYFRAME, DELTA, HELLO, INPUT = 1, 2, 3, 4
+WATCH = 255  # Hello stream for spectators
+HUD, PADDLE, BALLS, POWERUPS, BROKEN = 1, 2, 4, 8, 16
+
+LENGTH = struct.Struct("<I")
+HEADER = struct.Struct("<BBIB")  # kind, stream, frame, sections
+HUD_STATE = struct.Struct("<IbBB")
+POINT = struct.Struct("<hh")
+COUNT16 = struct.Struct("<H")
+POWERUP = struct.Struct("<Bhh")
+FIELD = struct.Struct("<HffI")
+BRICK = struct.Struct("<hhhhBBB")
+CONTROL = struct.Struct("<BBb")
+
+def _fixed(value):
+    """
+    Convert a position to sixteenths of a pixel, clamped to an i16.
+    """
+    return max(-32768, min(32767, round(value * SCALE)))
+
+# Class for SnapshotEncoder
+class SnapshotEncoder:
+    """
+    Encode one game's state, step by step, as keyframes and deltas.
+
+    Parameters:
+    stream (int): Stream number written into every snapshot.
+    keyframe_interval (int): Steps between keyframes.
+    """
+    def __init__(self, stream=0, keyframe_interval=KEYFRAME_INTERVAL):
+        self.stream = stream
+        self.keyframe_interval = keyframe_interval
+        self.blocks = None  # The block field the indexes below refer to
+        self.index = {}
+        self.epoch = 0
+        self.since_keyframe = 0
+        self.last = None  # (HUD, paddle, balls, power-ups) last sent
+
+    @staticmethod
+    def _state(game):
+        paddle = game.paddle
+        return ((game.score, max(-128, min(127, game.lives)), game.level, game.over),
+                (_fixed(paddle.posx), _fixed(paddle.width)),
+                [(_fixed(ball.posx), _fixed(ball.posy)) for ball in game.balls],
+                [(POWERUP_KINDS.index(powerup.kind), _fixed(powerup.posx), _fixed(powerup.posy))
+                 for powerup in game.falling_powerups])
+
+    @staticmethod
+    def _pack(out, sections, state):
+        hud, paddle, balls, powerups = state
+        if sections & HUD:
+            out += HUD_STATE.pack(hud[0], hud[1], hud[2], hud[3])
+        if sections & PADDLE:
+            out += POINT.pack(*paddle)
+        if sections & BALLS:
+            out += COUNT16.pack(len(balls))
+            for ball in balls:
+                out += POINT.pack(*ball)
+        if sections & POWERUPS:
+            out.append(len(powerups))
+            for powerup in powerups:
+                out += POWERUP.pack(*powerup)
+
+    def _broken(self, game):
+        """
+        Forget the blocks destroyed in the last step.
+
+        Returns:
+        list: Their indexes, ascending.
+        """
+        index = self.index
+        return sorted(index.pop(block) for block in game.broken if block in index)
+
+    def delta(self, game):
+        """
+        Encode what changed since the last snapshot. Call once after every step.
+
+        Parameters:
+        game (simulation.Game): The game, just stepped.
+
+        Returns:
+        bytes: The delta, or None if a keyframe is due instead.
+        """
+        if self.last is None or game.blocks is not self.blocks or self.since_keyframe >= self.keyframe_interval:
+            return None
+        self.since_keyframe += 1
+        state = self._state(game)
+        sections = 0
+        for bit, now, before in zip((HUD, PADDLE, BALLS, POWERUPS), state, self.last):
+            if now != before:
+                sections |= bit
+        broken = self._broken(game)
+        if broken:
+            sections |= BROKEN
+        self.last = state
+
+        out = bytearray(HEADER.pack(DELTA, self.stream, game.frame, sections))
+        self._pack(out, sections, state)
+        if broken:
+            _write_varint(out, len(broken))
+            previous = 0
+            for position in broken:
+                _write_varint(out, position - previous)
+                previous = position
+        return bytes(out)
+
+    def keyframe(self, game, due=True):
+        """
+        Encode the whole state of the game.
+
+        Parameters:
+        game (simulation.Game): The game.
+        due (bool): Whether this is the keyframe delta() asked for, rather
+        than an extra one for a peer that needs to catch up.
+
+        Returns:
+        bytes: The keyframe.
+        """
+        if game.blocks is not self.blocks:
+            self.blocks = game.blocks
+            self.index = {block: position for position, block in enumerate(game.blocks)}
+            self.epoch = (self.epoch + 1) & 0xFFFF
+        else:
+            self._broken(game)
+        if due:
+            self.since_keyframe = 0
+        state = self.last = self._state(game)
+
+        out = bytearray(HEADER.pack(KEYFRAME, self.stream, game.frame, HUD | PADDLE | BALLS | POWERUPS))
+        self._pack(out, HUD | PADDLE | BALLS | POWERUPS, state)
+        blocks = self.blocks
+        field = bytearray(FIELD.pack(self.epoch, blocks.cell_width, blocks.cell_height, len(blocks)))
+        previous = 0
+        for block in blocks:
+            position = self.index[block]
+            _write_varint(field, position - previous)
+            previous = position
+            field += BRICK.pack(_fixed(block.posx), _fixed(block.posy), _fixed(block.width), _fixed(block.height),
+                                *block.color)
+        out += zlib.compress(bytes(field), 1)
+        return bytes(out)
+
+# Class for Mirror
+class Mirror:
+    """
+    Initialize a copy of a remote game, rebuilt from snapshots. It has the
+    attributes the renderers draw from, so it can be drawn like a Game.
+    """
+    def __init__(self):
+        self.frame = 0
+        self.score, self.lives, self.level, self.over = 0, START_LIVES, 1, False
+        self.paddle = Paddle(WIDTH // 2 - PADDLE_WIDTH // 2, HEIGHT - 50, PADDLE_WIDTH, PADDLE_HEIGHT, PADDLE_SPEED,
+                             WHITE)
+        self.balls = []
+        self.falling_powerups = []
+        self.blocks = BlockGrid(1, 1)
+        self.block_index = {}
+        self.epoch = None
+        self.synced = False  # Whether a keyframe has arrived to apply deltas to
+
+    @property
+    def ball(self):
+        return self.balls[0] if self.balls else None
+
+    def apply(self, message):
+        """
+        Update from one snapshot.
+
+        Parameters:
+        message (bytes): A keyframe or delta payload.
+
+        Returns:
+        bool: False if it was a delta that arrived before any keyframe and was ignored.
+        """
+        kind, _, frame, sections = HEADER.unpack_from(message)
+        if kind == DELTA and not self.synced:
+            return False
+        self.frame = frame
+        position = HEADER.size
+        if sections & HUD:
+            score, lives, level, over = HUD_STATE.unpack_from(message, position)
+            self.score, self.lives, self.level, self.over = score, lives, level, bool(over)
+            position += HUD_STATE.size
+        if sections & PADDLE:
+            x, width = POINT.unpack_from(message, position)
+            position += POINT.size
+            paddle = self.paddle
+            paddle.last_x = paddle.posx
+            paddle.posx, paddle.width = x / SCALE, width / SCALE
+            paddle.paddle_rect = Rect(paddle.posx, paddle.posy, paddle.width, paddle.height)
+        if sections & BALLS:
+            (count,) = COUNT16.unpack_from(message, position)
+            position += COUNT16.size
+            balls = self.balls
+            del balls[count:]
+            for number, (x, y) in enumerate(POINT.iter_unpack(message[position:position + count * POINT.size])):
+                if number < len(balls):
+                    ball = balls[number]
+                    ball.last_x, ball.last_y = ball.posx, ball.posy
+                    ball.posx, ball.posy = x / SCALE, y / SCALE
+                else:
+                    balls.append(Ball(x / SCALE, y / SCALE, BALL_RADIUS, BALL_SPEED, WHITE))
+            position += count * POINT.size
+        if sections & POWERUPS:
+            count = message[position]
+            position += 1
+            self.falling_powerups = [PowerUp(x / SCALE, y / SCALE, POWERUP_KINDS[kind])
+                                     for kind, x, y in POWERUP.iter_unpack(
+                                         message[position:position + count * POWERUP.size])]
+            position += count * POWERUP.size
+        if kind == DELTA:
+            if sections & BROKEN:
+                count, position = _read_varint(message, position)
+                index = 0
+                for _ in range(count):
+                    step, position = _read_varint(message, position)
+                    index += step
+                    block = self.block_index.pop(index, None)
+                    if block is not None:
+                        self.blocks.remove(block)
+            return True
+
+        self._apply_field(zlib.decompress(message[position:]))
+        self.synced = True
+        return True
+
+    def _apply_field(self, field):
+        """
+        Take the block field from a keyframe, keeping the current one if it is
+        the same field with blocks missing, so renderers need not redraw it.
+        """
+        epoch, cell_width, cell_height, count = FIELD.unpack_from(field)
+        position = FIELD.size
+        index = 0
+        present = {}
+        for _ in range(count):
+            step, position = _read_varint(field, position)
+            index += step
+            present[index] = BRICK.unpack_from(field, position)
+            position += BRICK.size
+
+        if epoch == self.epoch:
+            for index in [index for index in self.block_index if index not in present]:
+                self.blocks.remove(self.block_index.pop(index))
+            return
+        self.epoch = epoch
+        self.block_index = {
+            index: Block(x / SCALE, y / SCALE, width / SCALE, height / SCALE, (red, green, blue), 0)
+            for index, (x, y, width, height, red, green, blue) in present.items()}
+        self.blocks = BlockGrid(cell_width, cell_height, self.block_index.values())
+
+# Class for FrameReader
+class FrameReader:
+    """
+    Split a byte stream into length-prefixed messages.
+
+    Parameters:
+    max_length (int): Optional longest message accepted.
+    """
+    def __init__(self, max_length=None):
+        self.buffer = bytearray()
+        self.max_length = max_length
+
+    def feed(self, data):
+        """
+        Add received bytes.
+
+        Returns:
+        list: Every message now complete, as bytes.
+
+        Raises:
+        ValueError: If a message is longer than max_length.
+        """
+        buffer = self.buffer
+        buffer += data
+        messages = []
+        position = 0
+        while len(buffer) - position >= LENGTH.size:
+            (length,) = LENGTH.unpack_from(buffer, position)
+            if self.max_length is not None and length > self.max_length:
+                raise ValueError(f"message of {length} bytes is longer than {self.max_length}")
+            end = position + LENGTH.size + length
+            if end > len(buffer):
+                break
+            messages.append(bytes(buffer[position + LENGTH.size:end]))
+            position = end
+        del buffer[:position]
+        return messages
+
+def _frame(payload):
+    return LENGTH.pack(len(payload)) + payload
+
+def _receive(sock, reader):
+    """
+    Read whatever a non-blocking socket has waiting.
+
+    Returns:
+    tuple: (list of complete messages, True if the connection closed or
+    sent a message too long for the reader).
+    """
+    messages = []
+    while True:
+        try:
+            data = sock.recv(65536)
+        except (BlockingIOError, InterruptedError):
+            return messages, False
+        except OSError:
+            return messages, True
+        if not data:
+            return messages, True
+        try:
+            messages += reader.feed(data)
+        except ValueError:
+            return messages, True
+
+def _send_some(sock, outgoing):
+    """
+    Write as much of a buffer as a non-blocking socket takes, and drop what was written.
+
+    Parameters:
+    sock (socket.socket): The socket.
+    outgoing (bytearray): Bytes waiting to be sent.
+
+    Returns:
+    bool: False if the connection has closed.
+    """
+    try:
+        sent = sock.send(outgoing)
+    except (BlockingIOError, InterruptedError):
+        return True
+    except OSError:
+        return False
+    del outgoing[:sent]
+    return True
+
+# Class for Peer
+class Peer:
+    """
+    One connection to a SnapshotServer.
+    """
+    def __init__(self, sock):
+        self.sock = sock
+        self.reader = FrameReader(CONTROL.size)  # Peers only send hellos and input, so nothing longer is buffered
+        self.outgoing = bytearray()
+        self.synced = set()  # Streams this peer has a keyframe for
+        self.closed = False
+
+    def send(self, message, max_buffer):
+        """
+        Queue a message and write as much as the socket takes.
+
+        Returns:
+        bool: False if the peer is too far behind and the message was not queued.
+        """
+        if len(self.outgoing) > max_buffer:
+            self.flush()
+            return False
+        self.outgoing += _frame(message)
+        self.flush()
+        return True
+
+    def flush(self):
+        if self.outgoing and not self.closed:
+            self.closed = not _send_some(self.sock, self.outgoing)
+
+# Class for SnapshotServer
+class SnapshotServer:
+    """
+    Publish games to spectators and a versus player over TCP.
+
+    Parameters:
+    host (str): Address to listen on.
+    port (int): Port to listen on, 0 to pick a free one.
+    keyframe_interval (int): Steps between keyframes.
+    max_buffer (int): Bytes queued for a peer before it counts as behind.
+    """
+    def __init__(self, host="127.0.0.1", port=DEFAULT_PORT, keyframe_interval=KEYFRAME_INTERVAL,
+                 max_buffer=MAX_BUFFER):
+        self.listener = socket.create_server((host, port))
+        self.listener.setblocking(False)
+        self.port = self.listener.getsockname()[1]
+        self.keyframe_interval = keyframe_interval
+        self.max_buffer = max_buffer
+        self.peers = []
+        self.encoders = {}  # stream -> SnapshotEncoder
+        self.controllers = {}  # stream -> the Peer playing it
+        self.directions = {}  # stream -> last paddle direction from its player
+        self.bytes_sent = self.keyframes_sent = self.deltas_sent = 0
+
+    def poll(self):
+        """
+        Accept new peers, read their messages and drop closed connections.
+        """
+        while True:
+            try:
+                sock, _ = self.listener.accept()
+            except (BlockingIOError, InterruptedError):
+                break
+            sock.setblocking(False)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self.peers.append(Peer(sock))
+
+        for peer in self.peers:
+            messages, closed = _receive(peer.sock, peer.reader)
+            peer.closed = peer.closed or closed
+            for message in messages:
+                kind, stream, value = CONTROL.unpack_from(message.ljust(CONTROL.size, b"\0"))
+                if kind == HELLO and stream != WATCH and stream not in self.controllers:
+                    self.controllers[stream] = peer
+                elif kind == INPUT and self.controllers.get(stream) is peer:
+                    self.directions[stream] = max(-1, min(1, value))
+            peer.flush()
+
+        for peer in [peer for peer in self.peers if peer.closed]:
+            self.peers.remove(peer)
+            peer.sock.close()
+            for stream in [stream for stream, controller in self.controllers.items() if controller is peer]:
+                del self.controllers[stream]
+                self.directions.pop(stream, None)
+
+    def direction(self, stream):
+        """
+        Get the paddle direction the player of a stream last sent.
+
+        Returns:
+        int: -1, 0 or 1; 0 if nobody is playing it.
+        """
+        return self.directions.get(stream, 0)
+
+    def publish(self, game, stream=0):
+        """
+        Send a game's state to every peer. Call once after every step of the game.
+
+        Parameters:
+        game (simulation.Game): The game, just stepped.
+        stream (int): Which of the host's games it is.
+        """
+        self.poll()
+        encoder = self.encoders.get(stream)
+        if encoder is None:
+            encoder = self.encoders[stream] = SnapshotEncoder(stream, self.keyframe_interval)
+        delta = encoder.delta(game)
+        keyframe = encoder.keyframe(game) if delta is None else None
+
+        for peer in self.peers:
+            if keyframe is None and stream not in peer.synced:
+                keyframe = encoder.keyframe(game, due=False)
+            message = delta if delta is not None and stream in peer.synced else keyframe
+            if peer.send(message, self.max_buffer):
+                peer.synced.add(stream)
+                self.bytes_sent += LENGTH.size + len(message)
+                if message is delta:
+                    self.deltas_sent += 1
+                else:
+                    self.keyframes_sent += 1
+            else:
+                # It missed a delta, so it needs a keyframe once it catches up
+                peer.synced.discard(stream)
+
+    def close(self):
+        """
+        Disconnect every peer and stop listening.
+        """
+        for peer in self.peers:
+            peer.sock.close()
+        self.peers.clear()
+        self.listener.close()
+
+# Class for SnapshotClient
+class SnapshotClient:
+    """
+    Connect to a SnapshotServer and keep a Mirror of each game it publishes.
+
+    Parameters:
+    host (str): Server address.
+    port (int): Server port.
+    control (int): Stream to play, or None to only watch.
+    timeout (float): Seconds to wait for the connection.
+    """
+    def __init__(self, host="127.0.0.1", port=DEFAULT_PORT, control=None, timeout=2.0):
+        self.sock = socket.create_connection((host, port), timeout)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.control = control
+        self.reader = FrameReader()
+        self.mirrors = {}  # stream -> Mirror
+        self.outgoing = bytearray()  # Input the socket has not taken yet
+        self.closed = False
+        self.sock.sendall(_frame(CONTROL.pack(HELLO, WATCH if control is None else control, 0)))
+        self.sock.setblocking(False)
+
+    def mirror(self, stream=0):
+        """
+        Get the mirror of a stream, creating an empty one if nothing has arrived yet.
+        """
+        mirror = self.mirrors.get(stream)
+        if mirror is None:
+            mirror = self.mirrors[stream] = Mirror()
+        return mirror
+
+    def flush(self):
+        """
+        Send as much queued input as the socket takes.
+        """
+        if self.outgoing and not self.closed:
+            self.closed = not _send_some(self.sock, self.outgoing)
+
+    def poll(self):
+        """
+        Send any input still queued and apply every snapshot that has arrived.
+
+        Returns:
+        int: Number of snapshots applied.
+        """
+        self.flush()
+        messages, closed = _receive(self.sock, self.reader)
+        self.closed = self.closed or closed
+        applied = 0
+        for message in messages:
+            applied += self.mirror(message[1]).apply(message)
+        return applied
+
+    def send_input(self, direction):
+        """
+        Send the paddle direction for the stream this client plays.
+
+        The message is queued, so whatever the socket does not take now goes
+        out on a later poll() rather than being lost.
+
+        Parameters:
+        direction (int): -1, 0 or 1.
+
+        Returns:
+        bool: False if nothing was queued, because this client only watches or is disconnected.
+        """
+        if self.control is None or self.closed:
+            return False
+        self.outgoing += _frame(CONTROL.pack(INPUT, self.control, direction))
+        self.flush()
+        return True
+
+    def close(self):
+        """
+        Close the connection.
+        """
+        self.sock.close()
+
+def parse_address(address, default_port=DEFAULT_PORT):
+    """
+    Split "host:port" into its parts; either may be left out.
+
+    Returns:
+    tuple: (host, port).
+    """
+    host, colon, port = address.rpartition(":")
+    if not colon and not port.isdigit():
+        host, port = port, ""
+    return host or "127.0.0.1", int(port) if port else default_port
+
+def main():
+    parser = argparse.ArgumentParser(description="Watch or join a Breakout game hosted over the network.")
+    parser.add_argument("mode", choices=("watch", "join"))
+    parser.add_argument("address", help="host:port of the hosting game")
+    parser.add_argument("--stream", type=int, default=None, help="game to show when watching (default 0)")
+    args = parser.parse_args()
+
+    import pygame
+    from renderer import DirtyRenderer
+
+    host, port = parse_address(args.address)
+    stream = 1 if args.mode == "join" else (args.stream or 0)
+    client = SnapshotClient(host, port, control=stream if args.mode == "join" else None)
+    pygame.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.display.set_caption("Breakout - " + ("versus" if args.mode == "join" else "spectating"))
+    renderer = DirtyRenderer(screen, pygame.font.Font('freesansbold.ttf', 15))
+    clock = pygame.time.Clock()
+    direction = 0
+    try:
+        while not client.closed:
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+                    return
+            if args.mode == "join":
+                keys = pygame.key.get_pressed()
+                wanted = keys[pygame.K_RIGHT] - keys[pygame.K_LEFT]
+                if wanted != direction and client.send_input(wanted):
+                    direction = wanted
+            client.poll()
+            mirror = client.mirror(stream)
+            if mirror.synced:
+                pygame.display.update(renderer.draw(mirror))
+            clock.tick(60)
+    finally:
+        client.close()
+        pygame.quit()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+import socket
+import struct
+import time
+import unittest
+
+from benchmark import block_field
+from netplay import KEYFRAME, SCALE, Mirror, SnapshotClient, SnapshotEncoder, SnapshotServer, parse_address
+from simulation import Game
+
+
+def bot(game):
+    """Paddle direction that follows the first ball."""
+    return 1 if game.ball.posx > game.paddle.posx + game.paddle.width / 2 else -1
+
+
+def wait_for(condition, server=None, timeout=5.0):
+    """Poll until condition() holds, keeping the server accepting and reading meanwhile."""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("timed out waiting for the network")
+        if server is not None:
+            server.poll()
+        time.sleep(0.005)
+
+
+class SlowSocket:
+    """A socket that takes nothing while stalled, then a few bytes per send."""
+
+    def __init__(self, sock):
+        self.sock = sock
+        self.stalled = True
+
+    def send(self, data):
+        if self.stalled:
+            raise BlockingIOError
+        return self.sock.send(data[:3])
+
+    def __getattr__(self, name):
+        return getattr(self.sock, name)
+
+
+class TestNetplay(unittest.TestCase):
+    """Unit test case for snapshot encoding and the spectator/versus transport."""
+
+    def assertMirrors(self, mirror, game):
+        """Check that a mirror shows the same state as the game."""
+        self.assertEqual((mirror.frame, mirror.score, mirror.lives, mirror.level, mirror.over),
+                         (game.frame, game.score, game.lives, game.level, game.over))
+        self.assertAlmostEqual(mirror.paddle.posx, game.paddle.posx, delta=1 / SCALE)
+        self.assertEqual(len(mirror.balls), len(game.balls))
+        for shown, ball in zip(mirror.balls, game.balls):
+            self.assertAlmostEqual(shown.posx, ball.posx, delta=1 / SCALE)
+            self.assertAlmostEqual(shown.posy, ball.posy, delta=1 / SCALE)
+        self.assertEqual(sorted((round(block.posx), round(block.posy), block.color) for block in mirror.blocks),
+                         sorted((round(block.posx), round(block.posy), block.color) for block in game.blocks))
+
+    def test_round_trip(self):
+        """Test that keyframes and deltas rebuild the game exactly, across levels and power-ups."""
+        game = Game(seed=1, powerups=True)
+        encoder = SnapshotEncoder(keyframe_interval=50)
+        mirror = Mirror()
+        mirror.apply(encoder.keyframe(game))
+        kinds = set()
+        levels = set()
+        for _ in range(3000):
+            game.step(bot(game))
+            message = encoder.delta(game) or encoder.keyframe(game)
+            kinds.add(message[0])
+            mirror.apply(message)
+            self.assertMirrors(mirror, game)
+            levels.add(game.level)
+            if game.over:
+                break
+        self.assertEqual(kinds, {KEYFRAME, 2})
+        self.assertGreater(len(levels), 1)
+
+    def test_delta_size_is_flat(self):
+        """Test that deltas cost the same however many blocks there are, while keyframes grow."""
+        sizes = {}
+        for count in (50, 5000):
+            game = Game(seed=0)
+            game.blocks = block_field(count)
+            game.lives = 10 ** 9
+            encoder = SnapshotEncoder(keyframe_interval=10 ** 9)
+            keyframe = len(encoder.keyframe(game))
+            total = 0
+            for _ in range(300):
+                game.step(bot(game))
+                total += len(encoder.delta(game))
+            sizes[count] = (keyframe, total / 300)
+        self.assertLess(sizes[5000][1], 30)
+        self.assertAlmostEqual(sizes[50][1], sizes[5000][1], delta=3)
+        self.assertGreater(sizes[5000][0], 10 * sizes[50][0])
+
+    def test_deltas_wait_for_a_keyframe(self):
+        """Test that a mirror ignores deltas until it has a keyframe."""
+        game = Game(seed=2)
+        encoder = SnapshotEncoder()
+        encoder.keyframe(game)
+        game.step()
+        mirror = Mirror()
+        self.assertFalse(mirror.apply(encoder.delta(game)))
+        self.assertFalse(mirror.synced)
+
+    def test_localhost_spectators_and_versus(self):
+        """Test spectators joining at different times and a versus player over localhost TCP."""
+        server = SnapshotServer(port=0)
+        host, rival = Game(seed=5), Game(seed=5)
+        early = SnapshotClient(port=server.port)
+        player = SnapshotClient(port=server.port, control=1)
+        try:
+            wait_for(lambda: len(server.peers) == 2 and 1 in server.controllers, server)
+            player.send_input(1)
+            wait_for(lambda: server.direction(1) == 1, server)
+
+            late = None
+            for step in range(400):
+                host.step(bot(host))
+                server.publish(host, 0)
+                rival.step(server.direction(1))
+                server.publish(rival, 1)
+                if step == 200:
+                    late = SnapshotClient(port=server.port)
+            def caught_up():
+                for client in (early, late, player):
+                    client.poll()
+                return (early.mirror(0).frame == late.mirror(0).frame == host.frame
+                        and player.mirror(1).frame == rival.frame)
+            wait_for(caught_up, server)
+
+            self.assertMirrors(early.mirror(0), host)
+            self.assertMirrors(late.mirror(0), host)
+            self.assertMirrors(player.mirror(1), rival)
+            self.assertGreater(rival.paddle.posx, host.paddle.posx)  # The player held right throughout
+            self.assertGreater(server.deltas_sent, server.keyframes_sent)
+        finally:
+            for client in (early, player, late):
+                if client is not None:
+                    client.close()
+            server.close()
+
+    def test_peer_that_falls_behind_gets_a_keyframe(self):
+        """Test that a peer whose queue overflows is resynchronized with a keyframe."""
+        server = SnapshotServer(port=0, max_buffer=0)
+        game = Game(seed=8)
+        client = SnapshotClient(port=server.port)
+        try:
+            wait_for(lambda: server.peers, server)
+            peer = server.peers[0]
+            peer.flush = lambda: None  # Stall the socket so messages pile up
+            for _ in range(3):
+                game.step()
+                server.publish(game)
+            self.assertNotIn(0, peer.synced)
+            self.assertEqual(server.keyframes_sent, 1)
+
+            del peer.flush
+            for _ in range(5):
+                game.step()
+                server.publish(game)
+            self.assertEqual(server.keyframes_sent, 2)
+
+            def caught_up():
+                client.poll()
+                return client.mirror(0).frame == game.frame
+            wait_for(caught_up, server)
+            self.assertMirrors(client.mirror(0), game)
+        finally:
+            client.close()
+            server.close()
+
+    def test_input_survives_a_full_socket(self):
+        """Test that input the socket cannot take yet is sent later, even a few bytes at a time."""
+        server = SnapshotServer(port=0)
+        player = SnapshotClient(port=server.port, control=1)
+        try:
+            wait_for(lambda: 1 in server.controllers, server)
+            player.sock = slow = SlowSocket(player.sock)
+            self.assertTrue(player.send_input(-1))
+            self.assertTrue(player.outgoing)
+            for _ in range(5):
+                server.poll()
+            self.assertEqual(server.direction(1), 0)
+
+            slow.stalled = False
+            def arrived():
+                player.poll()
+                return server.direction(1) == -1
+            wait_for(arrived, server)
+            self.assertFalse(player.outgoing)
+            watcher = SnapshotClient(port=server.port)
+            self.assertFalse(watcher.send_input(1))  # Only watching, so there is no stream to steer
+            watcher.close()
+        finally:
+            player.close()
+            server.close()
+
+    def test_oversized_message_drops_peer(self):
+        """Test that a peer announcing a message longer than any control message is disconnected."""
+        server = SnapshotServer(port=0)
+        player = SnapshotClient(port=server.port, control=1)
+        rogue = socket.create_connection(("127.0.0.1", server.port))
+        try:
+            wait_for(lambda: len(server.peers) == 2, server)
+            rogue.sendall(struct.pack("<I", 0xFFFFFFFF) + bytes(1000))
+            wait_for(lambda: len(server.peers) == 1, server)
+            self.assertIn(1, server.controllers)  # Well-behaved peers keep their connection
+        finally:
+            rogue.close()
+            player.close()
+            server.close()
+
+    def test_parse_address(self):
+        """Test reading host:port settings."""
+        self.assertEqual(parse_address("0.0.0.0:9000"), ("0.0.0.0", 9000))
+        self.assertEqual(parse_address("9000"), ("127.0.0.1", 9000))
+        self.assertEqual(parse_address("cabinet-2"), ("cabinet-2", 8766))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,158 @@
+"""
+Frame rate selection and automatic quality degradation.
+
+The simulation always steps at physics.TICK_RATE, whatever the frame rate,
+so the game plays the same on every machine; only how often it is drawn
+changes. FramePacer keeps the chosen frame rate and watches how long each
+frame's work takes. When the average over a window of frames goes over the
+frame budget it degrades one level, first redrawing the HUD less often and
+then drawing only every second or third frame, and when frames are cheap
+again it recovers one level at a time.
+"""
+
+from physics import TICK_RATE
+
+FRAME_RATES = (30, 60, 120, 0)  # Selectable targets; 0 is uncapped
+WINDOW = 30  # Frames averaged before deciding to degrade or recover
+RECOVER = 0.5  # Recover once the average is under this fraction of the budget
+LEVELS = (  # (HUD interval, render interval) for each degradation level
+    (1, 1),
+    (10, 1),
+    (10, 2),
+    (10, 3),
+)
+
+# Class for FramePacer
+class FramePacer:
+    """
+    Initialize a frame pacer.
+
+    Parameters:
+    fps (int): Target frame rate, one of FRAME_RATES.
+    window (int): Frames averaged before each decision.
+    adaptive (bool): Whether to degrade automatically when frames run long.
+    """
+    def __init__(self, fps=FRAME_RATES[0], window=WINDOW, adaptive=True):
+        self.window = window
+        self.adaptive = adaptive
+        self.level = 0
+        self.frames = 0
+        self.skipped = 0  # Frames not drawn because of degradation
+        self.average_work = self.average_fps = 0.0
+        self.set_rate(fps)
+
+    def set_rate(self, fps):
+        """
+        Change the target frame rate, starting over at full quality.
+
+        Parameters:
+        fps (int): One of FRAME_RATES.
+        """
+        if fps not in FRAME_RATES:
+            raise ValueError(f"frame rate must be one of {FRAME_RATES}, not {fps!r}")
+        self.fps = fps
+        self.level = 0
+        self._clear_window()
+
+    def cycle_rate(self):
+        """
+        Switch to the next frame rate in FRAME_RATES.
+        """
+        self.set_rate(FRAME_RATES[(FRAME_RATES.index(self.fps) + 1) % len(FRAME_RATES)])
+
+    def _clear_window(self):
+        self.window_frames = 0
+        self.window_work = self.window_time = 0.0
+
+    @property
+    def budget(self):
+        """
+        Seconds of work a frame may take. Uncapped play only has to keep up
+        with the simulation.
+        """
+        return 1 / (self.fps or TICK_RATE)
+
+    @property
+    def hud_interval(self):
+        """
+        Frames between HUD checks at the current level.
+        """
+        return LEVELS[self.level][0]
+
+    @property
+    def render_interval(self):
+        """
+        Frames between draws at the current level.
+        """
+        return LEVELS[self.level][1]
+
+    @property
+    def interpolate(self):
+        """
+        Whether frames come at a different rate from simulation steps, so
+        moving things should be drawn between steps.
+        """
+        return self.fps != TICK_RATE
+
+    def should_draw(self):
+        """
+        Whether the current frame should be drawn. Frames that are not are
+        counted as skipped.
+        """
+        if self.frames % self.render_interval == 0:
+            return True
+        self.skipped += 1
+        return False
+
+    def record(self, work, frame):
+        """
+        Note how long a frame took and adjust the level if needed.
+
+        Parameters:
+        work (float): Seconds spent on the frame, not counting waiting for the clock.
+        frame (float): Seconds from the start of this frame to the start of the next.
+        """
+        self.frames += 1
+        self.window_frames += 1
+        self.window_work += work
+        self.window_time += frame
+        if self.window_frames < self.window:
+            return
+        average = self.window_work / self.window_frames
+        if self.adaptive:
+            if average > self.budget and self.level < len(LEVELS) - 1:
+                self.level += 1
+            elif average < self.budget * RECOVER and self.level > 0:
+                self.level -= 1
+        self.average_work = average
+        self.average_fps = self.window_frames / self.window_time if self.window_time else 0.0
+        self._clear_window()
+
+    def stats(self):
+        """
+        Summarize pacing over the last full window.
+
+        Returns:
+        dict: "target_fps" (0 for uncapped), "fps", "work_ms" (mean work per
+        frame), "budget_ms", "level", "hud_interval", "render_interval" and
+        "skipped" (frames not drawn so far).
+        """
+        return {
+            "target_fps": self.fps,
+            "fps": self.average_fps,
+            "work_ms": self.average_work * 1000,
+            "budget_ms": self.budget * 1000,
+            "level": self.level,
+            "hud_interval": self.hud_interval,
+            "render_interval": self.render_interval,
+            "skipped": self.skipped,
+        }
+
+    def overlay_line(self):
+        """
+        Format the stats as one line for the profiler overlay.
+        """
+        stats = self.stats()
+        target = stats["target_fps"] or "max"
+        return (f"fps {stats['fps']:5.1f}/{target}  work {stats['work_ms']:5.2f}/{stats['budget_ms']:.1f} ms"
+                f"  level {stats['level']}")
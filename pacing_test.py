@@ -0,0 +1,72 @@
+import unittest
+
+from pacing import FRAME_RATES, LEVELS, FramePacer
+
+
+class TestFramePacer(unittest.TestCase):
+    """Unit test case for frame rate selection and automatic degradation."""
+
+    def run_frames(self, pacer, work, count):
+        """Record count frames that each took work seconds, drawing as the pacer says."""
+        drawn = 0
+        for _ in range(count):
+            drawn += pacer.should_draw()
+            pacer.record(work, max(work, pacer.budget))
+        return drawn
+
+    def test_rates(self):
+        """Test selecting and cycling the frame rate."""
+        pacer = FramePacer(60)
+        self.assertAlmostEqual(pacer.budget, 1 / 60)
+        self.assertTrue(pacer.interpolate)
+        for fps in FRAME_RATES[2:] + FRAME_RATES[:2]:
+            pacer.cycle_rate()
+            self.assertEqual(pacer.fps, fps)
+        self.assertFalse(FramePacer(30).interpolate)
+        self.assertAlmostEqual(FramePacer(0).budget, 1 / 30)
+        with self.assertRaises(ValueError):
+            FramePacer(45)
+
+    def test_degrades_and_recovers(self):
+        """Test that slow frames lower quality a level per window and fast ones bring it back."""
+        pacer = FramePacer(60, window=10)
+        self.run_frames(pacer, 0.001, 10)
+        self.assertEqual(pacer.level, 0)
+
+        self.run_frames(pacer, 0.030, 10)
+        self.assertEqual((pacer.level, pacer.hud_interval), (1, LEVELS[1][0]))
+        self.run_frames(pacer, 0.030, 20)
+        self.assertEqual(pacer.level, len(LEVELS) - 1)
+        self.run_frames(pacer, 0.030, 10)
+        self.assertEqual(pacer.level, len(LEVELS) - 1)
+        skipped = pacer.stats()["skipped"]
+        self.assertEqual(self.run_frames(pacer, 0.030, 9), 3)  # Every third frame is drawn
+        self.assertEqual(pacer.stats()["skipped"], skipped + 6)
+
+        self.run_frames(pacer, 0.001, 1 + 10 * len(LEVELS))
+        self.assertEqual(pacer.level, 0)
+        self.assertEqual(self.run_frames(pacer, 0.001, 5), 5)
+
+    def test_not_adaptive(self):
+        """Test that degradation can be turned off."""
+        pacer = FramePacer(120, window=5, adaptive=False)
+        self.run_frames(pacer, 0.1, 20)
+        self.assertEqual(pacer.level, 0)
+
+    def test_stats(self):
+        """Test the reported frame rate and work time."""
+        pacer = FramePacer(30, window=10)
+        for _ in range(10):
+            pacer.record(0.005, 0.040)
+        stats = pacer.stats()
+        self.assertAlmostEqual(stats["fps"], 25)
+        self.assertAlmostEqual(stats["work_ms"], 5)
+        self.assertEqual((stats["target_fps"], stats["level"], stats["render_interval"]), (30, 0, 1))
+        self.assertIn("fps  25.0/30", pacer.overlay_line())
+
+        pacer.set_rate(0)
+        self.assertIn("/max", pacer.overlay_line())
+
+
+if __name__ == '__main__':
+    unittest.main()
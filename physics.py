@@ -0,0 +1,122 @@
+"""
+Fixed-timestep clock and swept collision helpers for the Breakout simulation.
+"""
+
+import math
+
+TICK_RATE = 30  # Physics steps per second, independent of how often we render
+
+# Class for FixedTimestep
+class FixedTimestep:
+    """
+    Accumulate real elapsed time and hand it out as whole physics steps.
+
+    Parameters:
+    step (float): Length of one physics step in seconds.
+    max_steps (int): Most steps to run for one call to advance(); time beyond
+    that is dropped so a long stall cannot snowball into ever longer frames.
+    """
+    def __init__(self, step=1 / TICK_RATE, max_steps=5):
+        self.step = step
+        self.max_steps = max_steps
+        self.accumulator = 0.0
+
+    def advance(self, elapsed):
+        """
+        Add elapsed time and return how many physics steps are due.
+
+        Parameters:
+        elapsed (float): Seconds since the last call.
+
+        Returns:
+        int: Number of steps to run now.
+        """
+        self.accumulator += elapsed
+        steps = int(self.accumulator // self.step)
+        if steps > self.max_steps:
+            steps = self.max_steps
+            self.accumulator = 0.0
+        else:
+            self.accumulator -= steps * self.step
+        return steps
+
+    @property
+    def alpha(self):
+        """
+        Fraction of a step left in the accumulator, for interpolating drawing.
+        """
+        return self.accumulator / self.step
+
+def _ray_circle(x, y, dx, dy, cx, cy, radius):
+    """
+    Find the first time in [0, 1] the point (x, y) + t * (dx, dy) is on a circle.
+
+    Returns:
+    float: The time of impact, or None.
+    """
+    fx, fy = x - cx, y - cy
+    a = dx * dx + dy * dy
+    b = 2 * (fx * dx + fy * dy)
+    c = fx * fx + fy * fy - radius * radius
+    disc = b * b - 4 * a * c
+    if a == 0 or disc < 0:
+        return None
+    t = (-b - math.sqrt(disc)) / (2 * a)
+    if 0 <= t <= 1:
+        return t
+    return None
+
+def sweep_circle_rect(x, y, dx, dy, radius, rect):
+    """
+    Sweep a moving circle against a rectangle.
+
+    The circle touches the rectangle exactly when its center touches the
+    rectangle grown by the radius with rounded corners, so this casts the
+    center as a ray against that shape.
+
+    Parameters:
+    x (float): Circle center x at the start of the move.
+    y (float): Circle center y at the start of the move.
+    dx (float): Movement in x over the step.
+    dy (float): Movement in y over the step.
+    radius (float): Circle radius.
+    rect (Rect): Rectangle to test, anything with left/top/width/height.
+
+    Returns:
+    tuple: (time of impact in [0, 1], normal x, normal y), or None if the
+    circle does not reach the rectangle during the move. Circles already
+    overlapping the rectangle, or moving away from it, report no impact.
+    """
+    left, top = rect.left, rect.top
+    right, bottom = left + rect.width, top + rect.height
+
+    # Ray against the rectangle grown by the radius (slab method)
+    t_enter, t_exit = -math.inf, math.inf
+    normal_x = normal_y = 0
+    for start, delta, low, high, axis in ((x, dx, left - radius, right + radius, 0),
+                                          (y, dy, top - radius, bottom + radius, 1)):
+        if delta == 0:
+            if start <= low or start >= high:
+                return None
+            continue
+        t_low, t_high = (low - start) / delta, (high - start) / delta
+        t_near, t_far = min(t_low, t_high), max(t_low, t_high)
+        if t_near > t_enter:
+            t_enter = t_near
+            normal_x, normal_y = (-math.copysign(1, delta), 0) if axis == 0 else (0, -math.copysign(1, delta))
+        t_exit = min(t_exit, t_far)
+    if t_enter > t_exit or t_enter < 0 or t_enter > 1:
+        return None
+
+    # A hit beyond the rectangle on both axes is in a rounded corner
+    hit_x, hit_y = x + dx * t_enter, y + dy * t_enter
+    corner_x = left if hit_x < left else right if hit_x > right else None
+    corner_y = top if hit_y < top else bottom if hit_y > bottom else None
+    if corner_x is None or corner_y is None:
+        return t_enter, normal_x, normal_y
+
+    t = _ray_circle(x, y, dx, dy, corner_x, corner_y, radius)
+    if t is None:
+        return None
+    hit_x, hit_y = x + dx * t, y + dy * t
+    return t, (hit_x - corner_x) / radius, (hit_y - corner_y) / radius
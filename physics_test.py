@@ -0,0 +1,57 @@
+import unittest
+
+from simulation import Rect
+from physics import FixedTimestep, sweep_circle_rect
+
+
+class TestPhysics(unittest.TestCase):
+    """Unit test case for the fixed timestep and swept collision helpers."""
+
+    def setUp(self):
+        """Create a rectangle to sweep against."""
+        self.rect = Rect(100, 100, 40, 10)
+
+    def test_sweep_hits_top(self):
+        """Test a circle falling onto the top face."""
+        toi, nx, ny = sweep_circle_rect(120, 50, 0, 100, 5, self.rect)
+        self.assertAlmostEqual(toi, 0.45)
+        self.assertEqual((nx, ny), (0, -1))
+
+    def test_sweep_hits_side(self):
+        """Test a circle moving sideways into the left face."""
+        toi, nx, ny = sweep_circle_rect(0, 105, 200, 0, 5, self.rect)
+        self.assertAlmostEqual(toi, 95 / 200)
+        self.assertEqual((nx, ny), (-1, 0))
+
+    def test_sweep_tunnelling_move(self):
+        """Test that a move far longer than the rectangle is still caught."""
+        hit = sweep_circle_rect(120, 0, 0, 1000, 5, self.rect)
+        self.assertIsNotNone(hit)
+        self.assertAlmostEqual(hit[0], 95 / 1000)
+
+    def test_sweep_corner(self):
+        """Test that corners are rounded and report a diagonal normal."""
+        self.assertIsNone(sweep_circle_rect(95, 50, 0, 100, 4.9, Rect(100, 100, 40, 10)))
+        toi, nx, ny = sweep_circle_rect(90, 90, 10, 10, 5, self.rect)
+        self.assertAlmostEqual(nx, ny)
+        self.assertLess(nx, 0)
+        self.assertAlmostEqual(nx * nx + ny * ny, 1)
+
+    def test_sweep_miss_and_moving_away(self):
+        """Test moves that never reach the rectangle."""
+        self.assertIsNone(sweep_circle_rect(120, 50, 0, 40, 5, self.rect))
+        self.assertIsNone(sweep_circle_rect(120, 50, 0, -100, 5, self.rect))
+        self.assertIsNone(sweep_circle_rect(50, 50, 100, 0, 5, self.rect))
+
+    def test_fixed_timestep(self):
+        """Test that elapsed time is handed out in whole steps."""
+        timestep = FixedTimestep(step=0.01, max_steps=5)
+        self.assertEqual(timestep.advance(0.025), 2)
+        self.assertAlmostEqual(timestep.alpha, 0.5)
+        self.assertEqual(timestep.advance(0.005), 1)
+        self.assertEqual(timestep.advance(1.0), 5)
+        self.assertEqual(timestep.accumulator, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,205 @@
+"""
+Frame-time profiler.
+
+Times named sections of each frame, keeps a rolling window of samples per
+section and reports p50/p95/p99. Nothing here imports pygame; the overlay
+only needs a surface and something with a Font-style render method.
+"""
+
+import csv
+import json
+import math
+import time
+from collections import deque
+
+# Class for Section
+class Section:
+    """
+    Context manager that adds the time spent inside it to one profiler section.
+    """
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        current = self.profiler.current
+        current[self.name] = current.get(self.name, 0.0) + time.perf_counter() - self.start
+        return False
+
+# Class for NullSection
+class NullSection:
+    """
+    Context manager that does nothing, handed out while profiling is off.
+    """
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+NULL_SECTION = NullSection()
+
+def percentile(ordered, fraction):
+    """
+    Nearest-rank percentile of an already sorted list.
+
+    Parameters:
+    ordered (list): Sorted samples.
+    fraction (float): Percentile as a fraction, e.g. 0.95.
+
+    Returns:
+    float: The sample at that rank, or 0 for no samples.
+    """
+    if not ordered:
+        return 0.0
+    rank = max(1, math.ceil(fraction * len(ordered)))
+    return ordered[rank - 1]
+
+# Class for FrameProfiler
+class FrameProfiler:
+    """
+    Initialize a frame profiler.
+
+    Parameters:
+    window (int): Number of recent frames to keep samples for.
+    enabled (bool): Whether to record anything. A disabled profiler costs
+    one attribute check per section.
+    """
+    def __init__(self, window=300, enabled=False):
+        self.window = window
+        self.enabled = enabled
+        self.samples = {}
+        self.current = {}
+        self.sections = {}
+        self.frame_start = None
+        self.frames = 0
+        self.overlay = (None, [])  # (frame the lines were made on, lines)
+
+    def section(self, name):
+        """
+        Time a block of code as part of the current frame.
+
+        Parameters:
+        name (str): Section name, e.g. "ball.update".
+
+        Returns:
+        A context manager.
+        """
+        if not self.enabled:
+            return NULL_SECTION
+        section = self.sections.get(name)
+        if section is None:
+            section = self.sections[name] = Section(self, name)
+        return section
+
+    def begin_frame(self):
+        """
+        Mark the start of a frame.
+        """
+        self.current = {}
+        self.frame_start = time.perf_counter() if self.enabled else None
+
+    def end_frame(self):
+        """
+        Mark the end of a frame and store its section times.
+        """
+        if self.frame_start is None:
+            return
+        self.current["frame"] = time.perf_counter() - self.frame_start
+        for name, seconds in self.current.items():
+            samples = self.samples.get(name)
+            if samples is None:
+                samples = self.samples[name] = deque(maxlen=self.window)
+            samples.append(seconds * 1000)
+        self.frames += 1
+        self.frame_start = None
+
+    def stats(self):
+        """
+        Summarize the samples in the window.
+
+        Returns:
+        dict: Section name -> {"count", "mean", "p50", "p95", "p99", "max"} in milliseconds.
+        """
+        stats = {}
+        for name, samples in self.samples.items():
+            ordered = sorted(samples)
+            stats[name] = {
+                "count": len(ordered),
+                "mean": sum(ordered) / len(ordered),
+                "p50": percentile(ordered, 0.50),
+                "p95": percentile(ordered, 0.95),
+                "p99": percentile(ordered, 0.99),
+                "max": ordered[-1],
+            }
+        return stats
+
+    def dump(self, path):
+        """
+        Write the stats to a file, as CSV if the path ends in .csv and JSON otherwise.
+
+        Parameters:
+        path (str): File to write.
+        """
+        stats = self.stats()
+        with open(path, 'w', newline='') as file:
+            if path.endswith('.csv'):
+                writer = csv.writer(file)
+                writer.writerow(["section", "count", "mean", "p50", "p95", "p99", "max"])
+                for name, row in sorted(stats.items()):
+                    writer.writerow([name] + [row[key] for key in ("count", "mean", "p50", "p95", "p99", "max")])
+            else:
+                json.dump({"frames": self.frames, "sections": stats}, file, indent=2)
+
+    def overlay_lines(self, refresh=15):
+        """
+        Format the stats as text lines for the on-screen overlay. The lines are
+        only rebuilt every few frames so the overlay is readable and cheap.
+
+        Parameters:
+        refresh (int): Frames between updates.
+
+        Returns:
+        list: A header, then one line per section, slowest p99 first.
+        """
+        made, lines = self.overlay
+        if made is None or self.frames - made >= refresh:
+            stats = self.stats()
+            names = sorted(stats, key=lambda name: -stats[name]["p99"])
+            lines = [f"{'section':<14} {'p50':>6} {'p95':>6} {'p99':>6}"]
+            lines += [f"{name:<14} {stats[name]['p50']:6.2f} {stats[name]['p95']:6.2f} {stats[name]['p99']:6.2f}"
+                      for name in names]
+            self.overlay = (self.frames, lines)
+        return lines
+
+    def draw_overlay(self, surface, text, position=(10, 10), color=(255, 255, 0)):
+        """
+        Draw the p50/p95/p99 table in milliseconds onto a surface.
+
+        Parameters:
+        surface (pygame.Surface): Surface to draw on.
+        text: Object with a Font-style render(text, antialias, color) method.
+        position (tuple): Top-left corner of the table.
+        color (tuple): Text color.
+
+        Returns:
+        list: The areas drawn.
+        """
+        x, y = position
+        rects = []
+        for line in self.overlay_lines():
+            rendered = text.render(line, False, color)
+            rects.append(surface.blit(rendered, (x, y)))
+            y += rendered.get_height()
+        return rects
+
+NULL_PROFILER = FrameProfiler(enabled=False)
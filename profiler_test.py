@@ -0,0 +1,93 @@
+import csv
+import json
+import os
+import tempfile
+import time
+import unittest
+
+from profiler import FrameProfiler, percentile
+from simulation import Game
+
+
+class TestProfiler(unittest.TestCase):
+    """Unit test case for the frame-time profiler."""
+
+    def setUp(self):
+        """Create an enabled profiler."""
+        self.profiler = FrameProfiler(window=10, enabled=True)
+
+    def test_sections_and_frames(self):
+        """Test that section and frame times are recorded per frame."""
+        for _ in range(3):
+            self.profiler.begin_frame()
+            with self.profiler.section("sleep"):
+                time.sleep(0.002)
+            with self.profiler.section("sleep"):
+                time.sleep(0.001)
+            self.profiler.end_frame()
+        stats = self.profiler.stats()
+        self.assertEqual(stats["sleep"]["count"], 3)
+        self.assertGreaterEqual(stats["sleep"]["p50"], 3)
+        self.assertGreaterEqual(stats["frame"]["max"], stats["sleep"]["max"])
+
+    def test_rolling_window(self):
+        """Test that only the most recent frames are kept."""
+        for _ in range(25):
+            self.profiler.begin_frame()
+            self.profiler.end_frame()
+        self.assertEqual(self.profiler.stats()["frame"]["count"], 10)
+        self.assertEqual(self.profiler.frames, 25)
+
+    def test_disabled_records_nothing(self):
+        """Test that a disabled profiler does not collect samples."""
+        profiler = FrameProfiler()
+        game = Game(seed=1, profiler=profiler)
+        profiler.begin_frame()
+        game.step()
+        profiler.end_frame()
+        self.assertEqual(profiler.stats(), {})
+
+    def test_game_sections(self):
+        """Test that game steps report their parts."""
+        game = Game(seed=1, profiler=self.profiler)
+        self.profiler.begin_frame()
+        game.step()
+        self.profiler.end_frame()
+        self.assertTrue({"paddle.update", "ball.update", "collisions", "frame"} <= set(self.profiler.stats()))
+
+    def test_percentile(self):
+        """Test nearest-rank percentiles."""
+        samples = list(range(1, 101))
+        self.assertEqual(percentile(samples, 0.5), 50)
+        self.assertEqual(percentile(samples, 0.99), 99)
+        self.assertEqual(percentile([], 0.5), 0)
+
+    def test_dump(self):
+        """Test JSON and CSV dumps."""
+        self.profiler.begin_frame()
+        self.profiler.end_frame()
+        with tempfile.TemporaryDirectory() as directory:
+            json_path = os.path.join(directory, "profile.json")
+            csv_path = os.path.join(directory, "profile.csv")
+            self.profiler.dump(json_path)
+            self.profiler.dump(csv_path)
+            with open(json_path) as file:
+                self.assertEqual(json.load(file)["frames"], 1)
+            with open(csv_path) as file:
+                rows = list(csv.reader(file))
+            self.assertEqual(rows[0][:2], ["section", "count"])
+            self.assertEqual(rows[1][0], "frame")
+
+    def test_overlay_lines(self):
+        """Test that overlay text is rebuilt only every few frames."""
+        self.profiler.begin_frame()
+        self.profiler.end_frame()
+        lines = self.profiler.overlay_lines(refresh=5)
+        self.assertEqual(len(lines), 2)
+        self.profiler.begin_frame()
+        self.profiler.end_frame()
+        self.assertIs(self.profiler.overlay_lines(refresh=5), lines)
+
+
+if __name__ == '__main__':
+    unittest.main()
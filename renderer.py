@@ -0,0 +1,267 @@
+"""
+Pygame renderers for the headless Breakout simulation.
+"""
+
+import pygame
+
+from profiler import NULL_PROFILER
+from simulation import WIDTH, HEIGHT, BLACK, WHITE
+from text_cache import GlyphAtlas, TextCache
+
+def lerp(last, now, alpha):
+    """
+    Position a fraction alpha of the way through the last step.
+    """
+    return now if alpha >= 1 else last + (now - last) * alpha
+
+# Class for Renderer
+class Renderer:
+    """
+    Draw a simulation.Game onto a pygame surface, redrawing everything every frame.
+
+    Parameters:
+    screen (pygame.Surface): Surface to draw on.
+    font (pygame.font.Font): Font used for the lives and score text.
+    profiler (profiler.FrameProfiler): Optional profiler to time block and HUD drawing with.
+    """
+    def __init__(self, screen, font, profiler=NULL_PROFILER):
+        self.screen = screen
+        self.font = font
+        self.profiler = profiler
+        self.text = TextCache(font)
+        self.digits = GlyphAtlas(font, "0123456789-", True, WHITE)
+
+    def draw_paddle(self, paddle, surface=None, alpha=1.0):
+        """
+        Draw the paddle.
+
+        Parameters:
+        alpha (float): How far through the last step to draw it, 1 for where it is now.
+
+        Returns:
+        pygame.Rect: The area drawn.
+        """
+        rect = paddle.get_rect()
+        return pygame.draw.rect(surface or self.screen, paddle.color,
+                                (lerp(paddle.last_x, rect.left, alpha), rect.top, rect.width, rect.height))
+
+    def draw_ball(self, ball, surface=None, alpha=1.0):
+        """
+        Draw the ball.
+
+        Parameters:
+        alpha (float): How far through the last step to draw it, 1 for where it is now.
+
+        Returns:
+        pygame.Rect: The area drawn.
+        """
+        return pygame.draw.circle(surface or self.screen, ball.color,
+                                  (lerp(ball.last_x, ball.posx, alpha), lerp(ball.last_y, ball.posy, alpha)),
+                                  ball.radius)
+
+    def draw_powerup(self, powerup, surface=None, alpha=1.0):
+        """
+        Draw a falling power-up.
+
+        Parameters:
+        alpha (float): How far through the last step to draw it, 1 for where it is now.
+
+        Returns:
+        pygame.Rect: The area drawn.
+        """
+        rect = powerup.get_rect()
+        top = lerp(powerup.last_y - powerup.posy + rect.top, rect.top, alpha)
+        return pygame.draw.rect(surface or self.screen, powerup.color, (rect.left, top, rect.width, rect.height))
+
+    def draw_sprites(self, game, alpha=1.0):
+        """
+        Draw everything that moves: the paddle, every ball and every falling power-up.
+
+        Parameters:
+        alpha (float): How far through the last step to draw them, 1 for where they are now.
+
+        Returns:
+        list: The areas drawn.
+        """
+        rects = [self.draw_paddle(game.paddle, alpha=alpha)]
+        rects += [self.draw_ball(ball, alpha=alpha) for ball in game.balls]
+        rects += [self.draw_powerup(powerup, alpha=alpha) for powerup in game.falling_powerups]
+        return rects
+
+    def draw_block(self, block, surface=None):
+        """
+        Draw a block.
+
+        Returns:
+        pygame.Rect: The area drawn.
+        """
+        rect = block.get_rect()
+        return pygame.draw.rect(surface or self.screen, block.color, (rect.left, rect.top, rect.width, rect.height))
+
+    def draw_hud(self, lives, score, surface=None):
+        """
+        Display lives and score at the bottom of the screen.
+
+        Returns:
+        list: The areas drawn.
+        """
+        surface = surface or self.screen
+        rects = []
+        for label, value, position in (("Lives: ", lives, (10, HEIGHT - 20)),
+                                       ("Score: ", score, (WIDTH - 100, HEIGHT - 20))):
+            label_rect = surface.blit(self.text.render(label, True, WHITE), position)
+            value_rect = self.digits.blit(surface, str(value), (label_rect.right, position[1]))
+            rects.append(label_rect.union(value_rect))
+        return rects
+
+    def invalidate(self):
+        """
+        Forget anything cached about the screen, after something else drew on it.
+        """
+
+    def mark(self, rects):
+        """
+        Note areas drawn over the frame by someone else, such as an overlay,
+        so they get cleaned up on the next frame.
+        """
+
+    def draw(self, game, alpha=1.0):
+        """
+        Draw a full frame of the game.
+
+        Parameters:
+        game (simulation.Game): The game state to draw.
+        alpha (float): How far through the last step to draw moving things,
+        for rendering faster than the simulation steps; 1 draws them where they are.
+
+        Returns:
+        list: The areas of the screen that changed, for pygame.display.update.
+        """
+        self.screen.fill(BLACK)
+        self.draw_sprites(game, alpha)
+        with self.profiler.section("blocks"):
+            for block in game.blocks:
+                self.draw_block(block)
+        with self.profiler.section("hud"):
+            self.draw_hud(game.lives, game.score)
+        return [self.screen.get_rect()]
+
+# Class for DirtyRenderer
+class DirtyRenderer(Renderer):
+    """
+    Draw a simulation.Game by only touching the parts of the screen that change.
+
+    The static parts of a frame, the block field and the HUD text, live on a
+    cached background surface. Each frame restores the background under last
+    frame's paddle, balls and power-ups, erases destroyed blocks, redraws the HUD only when
+    lives or score change, and reports just those rectangles. Setting
+    hud_interval above 1 checks the HUD only every that many frames, to save
+    time on slow machines.
+
+    Parameters:
+    screen (pygame.Surface): Surface to draw on.
+    font (pygame.font.Font): Font used for the lives and score text.
+    profiler (profiler.FrameProfiler): Optional profiler to time block and HUD drawing with.
+    """
+    def __init__(self, screen, font, profiler=NULL_PROFILER):
+        super().__init__(screen, font, profiler)
+        self.background = pygame.Surface(screen.get_size())
+        self.hud_interval = 1
+        self.frames = 0
+        self.invalidate()
+
+    def invalidate(self):
+        """
+        Force a full redraw on the next frame.
+        """
+        self.blocks = None
+        self.drawn_blocks = []
+        self.sprite_rects = []
+        self.hud = None
+        self.hud_rects = []
+
+    def _rebuild(self, game):
+        """
+        Compose the background from scratch and put it on the screen.
+        """
+        self.background.fill(BLACK)
+        for block in game.blocks:
+            self.draw_block(block, self.background)
+        self.blocks = game.blocks
+        self.drawn_blocks = list(game.blocks)
+        self.hud = None
+        self.hud_rects = []
+        self._update_hud(game)
+        self.screen.blit(self.background, (0, 0))
+
+    def mark(self, rects):
+        """
+        Note areas drawn over the frame by someone else, such as an overlay,
+        so they get restored from the background on the next frame.
+        """
+        self.sprite_rects.extend(rects)
+
+    def _restore(self, rect):
+        """
+        Copy an area of the background back onto the screen.
+        """
+        self.screen.blit(self.background, rect, rect)
+
+    def _update_hud(self, game):
+        """
+        Redraw the HUD on the background if lives or score changed.
+
+        Returns:
+        list: The areas that changed.
+        """
+        hud = (game.lives, game.score)
+        if hud == self.hud:
+            return []
+        old = self.hud_rects
+        for rect in old:
+            self.background.fill(BLACK, rect)
+        self.hud = hud
+        self.hud_rects = self.draw_hud(game.lives, game.score, self.background)
+        return old + self.hud_rects
+
+    def draw(self, game, alpha=1.0):
+        """
+        Draw the parts of the frame that changed since the last one.
+
+        Parameters:
+        game (simulation.Game): The game state to draw.
+        alpha (float): How far through the last step to draw moving things,
+        for rendering faster than the simulation steps; 1 draws them where they are.
+
+        Returns:
+        list: The areas of the screen that changed, for pygame.display.update.
+        """
+        self.frames += 1
+        if game.blocks is not self.blocks:
+            self._rebuild(game)
+            self.sprite_rects = self.draw_sprites(game, alpha)
+            return [self.screen.get_rect()]
+
+        dirty = list(self.sprite_rects)
+
+        # Erase destroyed blocks from the background
+        with self.profiler.section("blocks"):
+            if len(self.drawn_blocks) != len(game.blocks):
+                remaining = []
+                for block in self.drawn_blocks:
+                    if block in game.blocks:
+                        remaining.append(block)
+                    else:
+                        rect = block.get_rect()
+                        dirty.append(self.background.fill(BLACK, (rect.left, rect.top, rect.width, rect.height)))
+                self.drawn_blocks = remaining
+
+        if self.frames % self.hud_interval == 0:
+            with self.profiler.section("hud"):
+                dirty += self._update_hud(game)
+
+        for rect in dirty:
+            self._restore(rect)
+
+        self.sprite_rects = self.draw_sprites(game, alpha)
+        return dirty + self.sprite_rects
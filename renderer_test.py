@@ -0,0 +1,84 @@
+import unittest
+
+import pygame
+
+from simulation import WIDTH, HEIGHT, Game
+from renderer import Renderer, DirtyRenderer
+
+
+class TestRenderer(unittest.TestCase):
+    """Unit test case for the full and dirty-rectangle renderers."""
+
+    def setUp(self):
+        """Create offscreen surfaces to draw into."""
+        pygame.font.init()
+        self.font = pygame.font.Font(None, 15)
+        self.full_screen = pygame.Surface((WIDTH, HEIGHT))
+        self.dirty_screen = pygame.Surface((WIDTH, HEIGHT))
+        self.game = Game(seed=3)
+
+    def test_dirty_matches_full_redraw(self):
+        """Test that partial updates leave the screen as a full redraw would."""
+        full = Renderer(self.full_screen, self.font)
+        dirty = DirtyRenderer(self.dirty_screen, self.font)
+        for frame in range(1500):
+            self.game.step(1 if self.game.ball.posx > self.game.paddle.posx + 50 else -1)
+            full.draw(self.game)
+            dirty.draw(self.game)
+            if frame % 100 == 0:
+                self.assertEqual(pygame.image.tobytes(self.full_screen, "RGB"),
+                                 pygame.image.tobytes(self.dirty_screen, "RGB"))
+        self.assertGreater(self.game.score, 0)
+
+    def test_dirty_area_is_small(self):
+        """Test that a steady frame only reports the paddle and ball areas."""
+        dirty = DirtyRenderer(self.dirty_screen, self.font)
+        self.assertEqual(dirty.draw(self.game), [self.dirty_screen.get_rect()])
+        self.game.step()
+        rects = dirty.draw(self.game)
+        self.assertLess(sum(rect.width * rect.height for rect in rects), WIDTH * HEIGHT // 20)
+
+    def test_interpolated_frames(self):
+        """Test that drawing part way through a step puts the ball between its positions,
+        and that partial updates still match a full redraw."""
+        full = Renderer(self.full_screen, self.font)
+        dirty = DirtyRenderer(self.dirty_screen, self.font)
+        ball = self.game.ball
+        for frame in range(300):
+            if frame % 2 == 0:
+                self.game.step(1 if ball.posx > self.game.paddle.posx + 50 else -1)
+            alpha = 0.5 if frame % 2 else 1.0
+            full.draw(self.game, alpha)
+            dirty.draw(self.game, alpha)
+        self.assertEqual(pygame.image.tobytes(self.full_screen, "RGB"),
+                         pygame.image.tobytes(self.dirty_screen, "RGB"))
+        rect = full.draw_ball(ball, alpha=0.5)
+        self.assertAlmostEqual(rect.centerx, (ball.last_x + ball.posx) / 2, delta=1)
+        self.assertAlmostEqual(rect.centery, (ball.last_y + ball.posy) / 2, delta=1)
+
+    def test_hud_interval(self):
+        """Test that a longer HUD interval only picks up score changes every that many frames."""
+        dirty = DirtyRenderer(self.dirty_screen, self.font)
+        dirty.hud_interval = 3
+        dirty.draw(self.game)
+        self.game.score += 10
+        redrawn = []
+        for _ in range(3):
+            dirty.draw(self.game)
+            redrawn.append(dirty.hud == (self.game.lives, self.game.score))
+        self.assertEqual(redrawn, [False, True, True])
+
+    def test_invalidate(self):
+        """Test that invalidating forces a full redraw."""
+        dirty = DirtyRenderer(self.dirty_screen, self.font)
+        dirty.draw(self.game)
+        dirty.invalidate()
+        self.assertEqual(dirty.draw(self.game), [self.dirty_screen.get_rect()])
+
+    def tearDown(self):
+        """Quit the font module."""
+        pygame.font.quit()
+
+
+if __name__ == '__main__':
+    unittest.main()
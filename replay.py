@@ -0,0 +1,267 @@
+"""
+Deterministic input recording and replay.
+
+A game is fully determined by its seed, whether power-ups are on, the level
+files it used and the paddle direction on every step, so a replay stores just those: the seed, then each change of direction
+as (steps since the last change, new direction). The final score, lives,
+level and a digest of the block field are stored too, so replaying headless
+can check the recording reproduces exactly.
+
+File layout, little-endian:
+    header: magic b"BKRP", version (u8), flags (u8), seed (u64), frames (u32),
+            score (u32), lives (i8), level (u8), blocks left (u16),
+            block digest (u32)
+    body:   level set digest (u32), only if the levels flag is set; then the
+            number of changes (varint), then per change the step delta
+            (varint) and the new direction + 1 (u8)
+
+Verify recordings from the command line with:
+    python replay.py replays/*.bkr
+"""
+
+import struct
+import sys
+import zlib
+
+from levels import LevelSet
+from simulation import Game
+
+MAGIC = b"BKRP"
+VERSION = 3  # Bump when the format or the simulation rules change; older replays would not reproduce
+HEADER = struct.Struct("<4sBBQIIbBHI")
+FLAG_POWERUPS = 1
+FLAG_LEVELS = 2
+LEVELS = struct.Struct("<I")
+
+def block_digest(blocks):
+    """
+    Checksum the position and health of every block, in order.
+
+    Parameters:
+    blocks (iterable): The block field.
+
+    Returns:
+    int: CRC-32 of the blocks.
+    """
+    crc = 0
+    for block in blocks:
+        crc = zlib.crc32(struct.pack("<ddh", block.posx, block.posy, block.health), crc)
+    return crc
+
+def _write_varint(out, value):
+    while value >= 0x80:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+
+def _read_varint(data, position):
+    value = shift = 0
+    while True:
+        byte = data[position]
+        position += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, position
+        shift += 7
+
+# Class for Replay
+class Replay:
+    """
+    Initialize a replay.
+
+    Parameters:
+    seed (int): Seed the game was started with.
+    changes (list): (step, direction) pairs, the step numbers at which the
+    paddle direction changed and what it changed to.
+    frames (int): Number of steps played.
+    final (tuple): (score, lives, level, blocks left, block digest) at the end.
+    powerups (bool): Whether the game was played with power-ups.
+    levels (int): Digest of the levels.LevelSet the game used, or None for
+    the classic random levels.
+    """
+    def __init__(self, seed, changes, frames, final, powerups=False, levels=None):
+        self.seed = seed
+        self.powerups = powerups
+        self.levels = levels
+        self.changes = changes
+        self.frames = frames
+        self.final = final
+
+    def to_bytes(self):
+        """
+        Encode the replay.
+
+        Returns:
+        bytes: The encoded replay.
+        """
+        score, lives, level, blocks, digest = self.final
+        flags = (FLAG_POWERUPS if self.powerups else 0) | (FLAG_LEVELS if self.levels is not None else 0)
+        out = bytearray(HEADER.pack(MAGIC, VERSION, flags, self.seed, self.frames,
+                                    score, lives, level, blocks, digest))
+        if self.levels is not None:
+            out += LEVELS.pack(self.levels)
+        _write_varint(out, len(self.changes))
+        previous = 0
+        for step, direction in self.changes:
+            _write_varint(out, step - previous)
+            out.append(direction + 1)
+            previous = step
+        return bytes(out)
+
+    @classmethod
+    def from_bytes(cls, data):
+        """
+        Decode a replay.
+
+        Parameters:
+        data (bytes): An encoded replay.
+
+        Returns:
+        Replay: The decoded replay.
+        """
+        magic, version, flags, seed, frames, score, lives, level, blocks, digest = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError("not a Breakout replay")
+        if version != VERSION:
+            raise ValueError(f"replay is version {version}, recorded under different game rules; "
+                             f"this game plays version {VERSION}")
+        position = HEADER.size
+        levels = None
+        if flags & FLAG_LEVELS:
+            (levels,) = LEVELS.unpack_from(data, position)
+            position += LEVELS.size
+        count, position = _read_varint(data, position)
+        changes = []
+        step = 0
+        for _ in range(count):
+            delta, position = _read_varint(data, position)
+            step += delta
+            changes.append((step, data[position] - 1))
+            position += 1
+        return cls(seed, changes, frames, (score, lives, level, blocks, digest),
+                   bool(flags & FLAG_POWERUPS), levels)
+
+    def save(self, path):
+        """
+        Write the replay to a file.
+        """
+        with open(path, 'wb') as file:
+            file.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        """
+        Read a replay from a file.
+        """
+        with open(path, 'rb') as file:
+            return cls.from_bytes(file.read())
+
+# Class for Recorder
+class Recorder:
+    """
+    Record a game as it is played. Use step() in place of game.step().
+
+    Parameters:
+    game (simulation.Game): A game that has just been reset.
+    """
+    def __init__(self, game):
+        if not isinstance(game.seed, int) or not 0 <= game.seed < 2 ** 64:
+            raise ValueError("only games with an integer seed can be recorded")
+        self.game = game
+        self.seed = game.seed
+        self.changes = []
+        self.direction = 0
+
+    def step(self, movement=None):
+        """
+        Advance the game one step and note the paddle direction used.
+
+        Parameters:
+        movement (int): Optional paddle direction (-1, 0 or 1), as for Game.step.
+
+        Returns:
+        list: The events of the step.
+        """
+        game = self.game
+        direction = game.paddle.paddle_x_fac if movement is None else movement
+        if direction != self.direction and not game.over:
+            self.changes.append((game.frame, direction))
+            self.direction = direction
+        return game.step(direction)
+
+    def finish(self):
+        """
+        Capture the final state.
+
+        Returns:
+        Replay: The recording.
+        """
+        game = self.game
+        final = (game.score, game.lives, game.level, len(game.blocks), block_digest(game.blocks))
+        levels = game.levels.digest if game.levels else None
+        return Replay(self.seed, list(self.changes), game.frame, final, game.powerups, levels)
+
+def play(replay, levels=None, on_step=None):
+    """
+    Replay a recording headless, as fast as possible.
+
+    Parameters:
+    replay (Replay): The recording.
+    levels (levels.LevelSet): The level files the game was played with, if
+    any; the default level directory is used if not given.
+    on_step (callable): Optional function called with the game after every step.
+
+    Returns:
+    simulation.Game: The game in its final state.
+    """
+    if replay.levels is None:
+        levels = None
+    else:
+        levels = levels or LevelSet()
+        if levels.digest != replay.levels:
+            raise ValueError("the replay was recorded with different level files")
+    game = Game(replay.seed, powerups=replay.powerups, levels=levels)
+    changes = iter(replay.changes)
+    next_change = next(changes, None)
+    direction = 0
+    while game.frame < replay.frames and not game.over:
+        while next_change is not None and next_change[0] == game.frame:
+            direction = next_change[1]
+            next_change = next(changes, None)
+        game.step(direction)
+        if on_step is not None:
+            on_step(game)
+    return game
+
+def verify(replay, levels=None):
+    """
+    Replay a recording and compare the result with what was recorded.
+
+    Parameters:
+    replay (Replay): The recording.
+    levels (levels.LevelSet): As for play().
+
+    Returns:
+    list: Descriptions of every mismatch; empty if the replay reproduced exactly.
+    """
+    game = play(replay, levels)
+    actual = (game.score, game.lives, game.level, len(game.blocks), block_digest(game.blocks))
+    names = ("score", "lives", "level", "blocks left", "block digest")
+    mismatches = [f"{name}: recorded {want}, replayed {got}"
+                  for name, want, got in zip(names, replay.final, actual) if want != got]
+    if game.frame != replay.frames:
+        mismatches.append(f"frames: recorded {replay.frames}, replayed {game.frame}")
+    return mismatches
+
+def main():
+    failed = 0
+    for path in sys.argv[1:]:
+        mismatches = verify(Replay.load(path))
+        print(f"{path}: {'ok' if not mismatches else 'MISMATCH'}")
+        for mismatch in mismatches:
+            print("    " + mismatch)
+        failed += bool(mismatches)
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+import os
+import random
+import tempfile
+import unittest
+
+from levels import LevelSet
+from simulation import Game
+from replay import VERSION, Recorder, Replay, play, verify
+
+
+def record(seed, frames, policy_seed=0, powerups=False, levels=None):
+    """Record a game driven by a random but sticky paddle policy."""
+    rng = random.Random(policy_seed)
+    game = Game(seed, powerups=powerups, levels=levels)
+    recorder = Recorder(game)
+    for _ in range(frames):
+        if rng.random() < 0.05:
+            game.paddle.set_movement(rng.choice((-1, 0, 1)))
+        recorder.step()
+        if game.over:
+            break
+    return game, recorder.finish()
+
+
+class TestReplay(unittest.TestCase):
+    """Unit test case for input recording and replay."""
+
+    def test_round_trip_encoding(self):
+        """Test that a replay survives encoding and decoding."""
+        game, replay = record(12345, 2000)
+        decoded = Replay.from_bytes(replay.to_bytes())
+        self.assertEqual((decoded.seed, decoded.changes, decoded.frames, decoded.final),
+                         (replay.seed, replay.changes, replay.frames, replay.final))
+
+    def test_replay_reproduces_game(self):
+        """Test that replaying gives the same final state as the live game."""
+        game, replay = record(777, 5000, policy_seed=3)
+        replayed = play(replay)
+        self.assertEqual((replayed.score, replayed.lives, replayed.level, replayed.frame),
+                         (game.score, game.lives, game.level, game.frame))
+        self.assertEqual(verify(replay), [])
+
+    def test_power_ups_replay(self):
+        """Test that games with power-ups record and replay too."""
+        game, replay = record(31, 5000, policy_seed=4, powerups=True)
+        decoded = Replay.from_bytes(replay.to_bytes())
+        self.assertTrue(decoded.powerups)
+        self.assertEqual(verify(decoded), [])
+
+    def test_level_files_replay(self):
+        """Test that games on level files replay, and only with the same files."""
+        game, replay = record(64, 3000, policy_seed=2, levels=LevelSet())
+        decoded = Replay.from_bytes(replay.to_bytes())
+        self.assertEqual(decoded.levels, LevelSet().digest)
+        self.assertEqual(verify(decoded), [])
+        decoded.levels ^= 1
+        with self.assertRaises(ValueError):
+            play(decoded)
+
+    def test_compact(self):
+        """Test that only direction changes are stored."""
+        game, replay = record(5, 3000)
+        self.assertLess(len(replay.to_bytes()), 32 + 3 * len(replay.changes) + 4)
+        self.assertLess(len(replay.changes), replay.frames // 5)
+
+    def test_tampered_replay_detected(self):
+        """Test that a doctored final score fails verification."""
+        game, replay = record(9, 1500)
+        score, lives, level, blocks, digest = replay.final
+        replay.final = (score + 100, lives, level, blocks, digest)
+        mismatches = verify(replay)
+        self.assertEqual(len(mismatches), 1)
+        self.assertTrue(mismatches[0].startswith("score"))
+
+    def test_save_and_load(self):
+        """Test writing a replay to disk and reading it back."""
+        game, replay = record(42, 500)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "game.bkr")
+            replay.save(path)
+            self.assertEqual(verify(Replay.load(path)), [])
+
+    def test_bad_file(self):
+        """Test that other data is rejected."""
+        with self.assertRaises(ValueError):
+            Replay.from_bytes(b"PNG!" + bytes(40))
+
+    def test_old_versions_rejected(self):
+        """Test that a replay recorded under older game rules is refused rather than failing verification."""
+        game, replay = record(3, 200)
+        data = bytearray(replay.to_bytes())
+        data[4] = VERSION - 1
+        with self.assertRaisesRegex(ValueError, "different game rules"):
+            Replay.from_bytes(bytes(data))
+
+    def test_unseeded_games_are_recordable(self):
+        """Test that a game started without a seed still gets one to record."""
+        game = Game()
+        self.assertIsInstance(game.seed, int)
+        Recorder(game)
+
+    def test_string_seeds_are_rejected(self):
+        """Test that a game seeded with a runner episode string cannot be recorded."""
+        with self.assertRaises(ValueError):
+            Recorder(Game("0:1"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,161 @@
+"""
+Process-pool episode runner.
+
+Plays many headless games across worker processes. Every episode gets its
+own seeded simulation.Game, so results depend only on the base seed and the
+episode index, never on how episodes were spread across workers.
+"""
+
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from simulation import Game
+
+MAX_FRAMES = 50000
+
+# Paddle policies take a Game and return a movement direction (-1, 0 or 1).
+# They must be module-level functions so they can be sent to worker processes.
+def follow_ball(game):
+    """
+    Move the paddle towards the ball.
+
+    Parameters:
+    game (simulation.Game): The game being played.
+
+    Returns:
+    int: Paddle direction.
+    """
+    center = game.paddle.posx + game.paddle.width / 2
+    if game.ball.posx < center - game.paddle.speed:
+        return -1
+    if game.ball.posx > center + game.paddle.speed:
+        return 1
+    return 0
+
+def stand_still(game):
+    """
+    Never move the paddle.
+    """
+    return 0
+
+def episode_seed(base_seed, index):
+    """
+    Derive the seed of one episode.
+
+    Parameters:
+    base_seed (int): Seed of the whole run.
+    index (int): Episode number within the run.
+
+    Returns:
+    str: Seed for simulation.Game; random.Random hashes strings, so
+    neighbouring episodes get unrelated streams.
+    """
+    return f"{base_seed}:{index}"
+
+def run_episode(seed, policy=follow_ball, max_frames=MAX_FRAMES):
+    """
+    Play one game to the end or until max_frames.
+
+    Parameters:
+    seed: Seed for the game's random number generator.
+    policy (function): Paddle policy.
+    max_frames (int): Frame limit for the episode.
+
+    Returns:
+    dict: "seed", "score", "frames", "level", "lives" and "clear_frames",
+    the number of frames each cleared level took.
+    """
+    game = Game(seed)
+    clear_frames = []
+    level_start = 0
+    while not game.over and game.frame < max_frames:
+        events = game.step(policy(game))
+        if "level" in events or (game.over and not game.blocks):
+            clear_frames.append(game.frame - level_start)
+            level_start = game.frame
+    return {
+        "seed": seed,
+        "score": game.score,
+        "frames": game.frame,
+        "level": game.level,
+        "lives": game.lives,
+        "clear_frames": clear_frames,
+    }
+
+def _run_chunk(args):
+    """
+    Run a list of episodes in a worker process.
+    """
+    seeds, policy, max_frames = args
+    return [run_episode(seed, policy, max_frames) for seed in seeds]
+
+def run_episodes(count, base_seed=0, workers=None, policy=follow_ball, max_frames=MAX_FRAMES):
+    """
+    Play many episodes across a process pool.
+
+    Parameters:
+    count (int): Number of episodes.
+    base_seed (int): Seed of the whole run.
+    workers (int): Number of worker processes; all cores by default, 1 runs in-process.
+    policy (function): Paddle policy.
+    max_frames (int): Frame limit per episode.
+
+    Returns:
+    list: Episode results in episode order.
+    """
+    seeds = [episode_seed(base_seed, i) for i in range(count)]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        return _run_chunk((seeds, policy, max_frames))
+
+    # Hand out a few chunks per worker to amortize pickling while keeping the load balanced
+    chunk_size = max(1, count // (workers * 4))
+    chunks = [(seeds[i:i + chunk_size], policy, max_frames) for i in range(0, count, chunk_size)]
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for chunk in executor.map(_run_chunk, chunks):
+            results.extend(chunk)
+    return results
+
+def summarize(results):
+    """
+    Aggregate episode results.
+
+    Parameters:
+    results (list): Results from run_episode.
+
+    Returns:
+    dict: Episode count, score and length statistics, and the mean number of
+    frames taken to clear each level.
+    """
+    scores = [result["score"] for result in results]
+    frames = [result["frames"] for result in results]
+    clears = {}
+    for result in results:
+        for level, taken in enumerate(result["clear_frames"], start=1):
+            clears.setdefault(level, []).append(taken)
+    return {
+        "episodes": len(results),
+        "mean_score": sum(scores) / len(scores) if scores else 0,
+        "min_score": min(scores, default=0),
+        "max_score": max(scores, default=0),
+        "mean_frames": sum(frames) / len(frames) if frames else 0,
+        "level_clear_frames": {level: sum(taken) / len(taken) for level, taken in sorted(clears.items())},
+        "level_clear_counts": {level: len(taken) for level, taken in sorted(clears.items())},
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Run headless Breakout episodes across a process pool.")
+    parser.add_argument("--episodes", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--max-frames", type=int, default=MAX_FRAMES)
+    args = parser.parse_args()
+
+    results = run_episodes(args.episodes, args.seed, args.workers, max_frames=args.max_frames)
+    print(json.dumps(summarize(results), indent=2))
+
+if __name__ == "__main__":
+    main()
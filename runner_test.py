@@ -0,0 +1,30 @@
+import unittest
+
+from runner import episode_seed, run_episode, run_episodes, summarize, stand_still
+
+
+class TestRunner(unittest.TestCase):
+    """Unit test case for the process-pool episode runner."""
+
+    def test_episode_is_deterministic(self):
+        """Test that the same seed plays the same game."""
+        self.assertEqual(run_episode("a", max_frames=3000), run_episode("a", max_frames=3000))
+
+    def test_pool_matches_in_process(self):
+        """Test that sharding episodes across workers does not change results."""
+        serial = run_episodes(6, base_seed=4, workers=1, max_frames=2000)
+        pooled = run_episodes(6, base_seed=4, workers=3, max_frames=2000)
+        self.assertEqual(serial, pooled)
+        self.assertEqual([result["seed"] for result in pooled], [episode_seed(4, i) for i in range(6)])
+
+    def test_summarize(self):
+        """Test aggregation of episode results."""
+        results = run_episodes(3, workers=1, policy=stand_still)
+        summary = summarize(results)
+        self.assertEqual(summary["episodes"], 3)
+        self.assertTrue(all(result["lives"] == 0 for result in results))
+        self.assertEqual(summary["mean_frames"], sum(result["frames"] for result in results) / 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,501 @@
+"""
+Game screens as states of one state machine.
+
+The start menu, the attract mode demo, play, the banner between levels and
+the game over screen are each a Scene. A SceneDriver owns the only event pump and the only frame
+clock: every frame it gets the events once, gives them to the current scene
+along with the time since the last frame, and draws whatever scene is
+current afterwards. A scene moves on by returning the next scene from
+update(), or None to quit. The frame rate and how much drawing can be
+skipped on a slow machine come from the shared pacing.FramePacer.
+
+Scenes never read events, flip the display or wait on the clock themselves,
+so they can be built on an offscreen surface and stepped one frame at a time
+without a display.
+"""
+
+import os
+import time
+
+import pygame
+
+from audio import PRIORITIES, MixerBackend, SoundDispatcher
+from pacing import FramePacer
+from profiler import FrameProfiler
+from physics import FixedTimestep
+from renderer import DirtyRenderer
+from replay import Recorder
+from simulation import WIDTH, HEIGHT, BLACK, WHITE
+from text_cache import TextCache
+
+LEVEL_BANNER_SECONDS = 1.5  # How long "Level N" shows before play resumes
+ATTRACT_DELAY = 30.0  # Seconds the start menu waits for a player before the autopilot plays a demo
+
+EVENT_SOUNDS = {  # Simulation event -> sound effect name
+    "wall": "wall",
+    "paddle": "paddle",
+    "brick": "paddle",
+    "powerup": "brick",
+    "lose_life": "lose_life",
+}
+
+# Class for Context
+class Context:
+    """
+    Initialize the state every scene shares.
+
+    Parameters:
+    screen (pygame.Surface): Surface to draw on.
+    font (pygame.font.Font): Font for all text.
+    game (simulation.Game): The game being played.
+    read_scores (callable): Returns the high scores to show as (score, initials) pairs.
+    write_score (callable): Records a score, given the score and the player's initials.
+    profiler (profiler.FrameProfiler): Optional profiler; F3 shows its overlay during play. A disabled
+    one of its own is made if not given, since F3 turns it on.
+    assets (assets.Assets): Optional sounds and music; without it the game is silent.
+    record_dir (str): Optional directory to save a replay of every game in.
+    pacer (pacing.FramePacer): Optional frame pacer; a 30 FPS one is made if not given.
+    server (netplay.SnapshotServer): Optional server to publish every step of play to.
+    rival (simulation.Game): Optional versus game, played by the server's stream 1 player
+    in step with the local game.
+    attract_delay (float): Seconds of an idle start menu before attract mode; None never starts it.
+    """
+    def __init__(self, screen, font, game, read_scores, write_score, profiler=None, assets=None,
+                 record_dir=None, pacer=None, server=None, rival=None, attract_delay=ATTRACT_DELAY):
+        self.screen = screen
+        self.font = font
+        self.text = TextCache(font)  # Menu text barely changes, so render each string once
+        self.game = game
+        self.read_scores = read_scores
+        self.write_score = write_score
+        self.profiler = profiler = profiler or FrameProfiler(enabled=False)
+        self.keep_profiling = profiler.enabled  # Still profiling when the overlay is hidden
+        self.show_profiler = False
+        self.assets = assets
+        self.record_dir = record_dir
+        self.pacer = pacer or FramePacer()
+        self.server = server
+        self.rival = rival
+        self.attract_delay = attract_delay
+        self.renderer = DirtyRenderer(screen, font, profiler)
+        self.audio = SoundDispatcher()  # Silent until start_audio() finds the sounds loaded
+        self.audio_started = False
+
+    def start_audio(self):
+        """
+        Start the music and sound effects once the sounds have loaded. Play
+        calls this every frame rather than waiting, so a game started before
+        the background load finishes begins silent and the audio joins in.
+        """
+        if self.audio_started or self.assets is None:
+            return
+        if not self.assets.ready():
+            self.assets.load_async()  # Only starts loading if the menu never did
+            return
+        self.assets.wait()
+        self.assets.play_music()  # Play on repeat
+        names = set(EVENT_SOUNDS.values())
+        self.audio = SoundDispatcher(MixerBackend({name: self.assets.sound(name) for name in names}))
+        self.audio_started = True
+
+    def blit_centered(self, string, center):
+        """
+        Draw a line of white text centred on a point.
+
+        Returns:
+        pygame.Rect: The area drawn.
+        """
+        rendered = self.text.render(string, True, WHITE)
+        rect = rendered.get_rect()
+        rect.center = center
+        return self.screen.blit(rendered, rect)
+
+# Class for Scene
+class Scene:
+    """
+    Base class for one screen of the game.
+
+    Parameters:
+    context (Context): The shared state.
+    """
+    def __init__(self, context):
+        self.context = context
+
+    def enter(self):
+        """
+        Called each time the scene becomes the current one.
+        """
+
+    def update(self, events, elapsed):
+        """
+        Respond to this frame's events and advance by the time passed.
+
+        Parameters:
+        events (list): pygame events since the last frame.
+        elapsed (float): Seconds since the last frame.
+
+        Returns:
+        Scene: The scene for the next frame; self to stay, None to quit.
+        """
+        return self
+
+    def draw(self):
+        """
+        Draw the scene.
+
+        Returns:
+        list: The areas of the screen that changed, for pygame.display.update.
+        """
+        return []
+
+# Class for MenuScene
+class MenuScene(Scene):
+    """
+    The start menu. SPACE starts a game and ESC quits. Sounds load in the
+    background while it is up, and if nobody presses a key for the context's
+    attract delay the autopilot starts playing a demo.
+    """
+    def __init__(self, context):
+        super().__init__(context)
+        self.idle = 0.0
+
+    def enter(self):
+        self.idle = 0.0
+        if self.context.assets is not None:
+            self.context.assets.load_async()
+
+    def update(self, events, elapsed):
+        for event in events:
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_ESCAPE:
+                    return None
+                if event.key == pygame.K_SPACE:
+                    return PlayScene(self.context)
+                self.idle = 0.0
+        self.idle += elapsed
+        delay = self.context.attract_delay
+        if delay is not None and self.idle >= delay:
+            return AttractScene(self.context)
+        return self
+
+    def draw(self):
+        screen = self.context.screen
+        screen.fill(BLACK)
+        self.context.blit_centered("Breakout!", (WIDTH // 2, HEIGHT // 2 - 20))
+        self.context.blit_centered("Press SPACE to Play", (WIDTH // 2, HEIGHT // 2 + 20))
+        return [screen.get_rect()]
+
+# Class for AttractScene
+class AttractScene(Scene):
+    """
+    Attract mode: the autopilot plays a silent demo game until someone
+    presses a key. SPACE starts a real game, any other key goes back to the
+    start menu, and so does the demo ending.
+
+    Parameters:
+    context (Context): The shared state.
+    """
+    def __init__(self, context):
+        super().__init__(context)
+        from autopilot import Autopilot  # Pulls in the soak test's process pool, so not at startup
+        context.game.reset()
+        self.pilot = Autopilot(context.game.seed)
+        self.timestep = FixedTimestep()
+
+    def enter(self):
+        self.context.renderer.invalidate()
+
+    def update(self, events, elapsed):
+        for event in events:
+            if event.type == pygame.KEYDOWN:
+                return PlayScene(self.context) if event.key == pygame.K_SPACE else MenuScene(self.context)
+        game = self.context.game
+        for _ in range(self.timestep.advance(elapsed)):
+            game.step(self.pilot(game))
+            if game.over:
+                return MenuScene(self.context)
+        return self
+
+    def draw(self):
+        context = self.context
+        alpha = self.timestep.alpha if context.pacer.interpolate else 1.0
+        context.renderer.hud_interval = context.pacer.hud_interval
+        rects = context.renderer.draw(context.game, alpha)
+        banner = [context.blit_centered("DEMO - Press SPACE to Play", (WIDTH // 2, HEIGHT // 2 + 40))]
+        context.renderer.mark(banner)
+        return rects + banner
+
+# Class for PlayScene
+class PlayScene(Scene):
+    """
+    A game in progress. Creating the scene starts a new game, and a new
+    versus game from the same seed if there is a rival.
+
+    Parameters:
+    context (Context): The shared state.
+    """
+    def __init__(self, context):
+        super().__init__(context)
+        context.game.reset()
+        if context.rival is not None:
+            context.rival.reset(context.game.seed)
+        self.recorder = Recorder(context.game) if context.record_dir else None
+        self.timestep = FixedTimestep()
+
+    def enter(self):
+        self.context.start_audio()
+        self.context.renderer.invalidate()
+        # Time spent on another screen is not owed to the simulation
+        self.timestep.accumulator = 0.0
+
+    def handle_key(self, event):
+        """
+        Steer the paddle, toggle the profiler overlay and cycle the frame rate.
+
+        Parameters:
+        event (pygame.event.Event): A KEYDOWN or KEYUP event.
+        """
+        context, paddle = self.context, self.context.game.paddle
+        if event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_LEFT:
+                paddle.set_movement(-1)
+            elif event.key == pygame.K_RIGHT:
+                paddle.set_movement(1)
+            elif event.key == pygame.K_F3:
+                context.show_profiler = not context.show_profiler
+                context.profiler.enabled = context.show_profiler or context.keep_profiling
+            elif event.key == pygame.K_F4:
+                context.pacer.cycle_rate()
+        elif event.type == pygame.KEYUP:
+            if event.key == pygame.K_LEFT and paddle.paddle_x_fac == -1:
+                paddle.set_movement(0)
+            elif event.key == pygame.K_RIGHT and paddle.paddle_x_fac == 1:
+                paddle.set_movement(0)
+
+    def update(self, events, elapsed):
+        context, game = self.context, self.context.game
+        context.start_audio()
+        for event in events:
+            if event.type in (pygame.KEYDOWN, pygame.KEYUP):
+                self.handle_key(event)
+
+        # Advance the simulation at its fixed rate, however long the last frame took,
+        # and play sounds for what happened, each effect at most once per frame
+        step = self.recorder.step if self.recorder else game.step
+        audio, server, rival = context.audio, context.server, context.rival
+        next_level = False
+        for _ in range(self.timestep.advance(elapsed)):
+            for name in step():
+                effect = EVENT_SOUNDS.get(name)
+                if effect is not None:
+                    audio.queue(effect, PRIORITIES.get(name, 0))
+                if name == "level":
+                    next_level = True
+            if server is not None:
+                server.publish(game, 0)
+                if rival is not None and not rival.over:
+                    rival.step(server.direction(1))
+                    server.publish(rival, 1)
+            if game.over or next_level:
+                break
+        audio.flush()
+
+        if game.over:
+            if self.recorder:
+                self.save_replay()
+            return GameOverScene(context)
+        if next_level:
+            return LevelTransitionScene(context, self)
+        return self
+
+    def save_replay(self):
+        """
+        Save the finished game's replay into the record directory.
+        """
+        record_dir = self.context.record_dir
+        os.makedirs(record_dir, exist_ok=True)
+        path = os.path.join(record_dir, f"{time.strftime('%Y%m%d-%H%M%S')}-{self.recorder.seed}.bkr")
+        self.recorder.finish().save(path)
+
+    def draw(self):
+        context, pacer, renderer = self.context, self.context.pacer, self.context.renderer
+        # Draw moving things part way through the step when frames and steps
+        # don't line up, so motion stays smooth above the simulation rate
+        alpha = self.timestep.alpha if pacer.interpolate else 1.0
+        renderer.hud_interval = pacer.hud_interval
+        # Only push the parts of the screen that changed
+        with context.profiler.section("draw"):
+            rects = renderer.draw(context.game, alpha)
+        if context.show_profiler:
+            overlay = context.profiler.draw_overlay(context.screen, context.text)
+            bottom = overlay[-1].bottom if overlay else 10
+            line = context.text.render(pacer.overlay_line(), False, (255, 255, 0))
+            overlay.append(context.screen.blit(line, (10, bottom)))
+            renderer.mark(overlay)
+            rects += overlay
+        return rects
+
+# Class for LevelTransitionScene
+class LevelTransitionScene(Scene):
+    """
+    Show the new level's field with a "Level N" banner for a moment, then
+    resume play. Any key skips the wait.
+
+    Parameters:
+    context (Context): The shared state.
+    play (PlayScene): The game to go back to.
+    duration (float): Seconds to show the banner for.
+    """
+    def __init__(self, context, play, duration=LEVEL_BANNER_SECONDS):
+        super().__init__(context)
+        self.play = play
+        self.remaining = duration
+
+    def update(self, events, elapsed):
+        if any(event.type == pygame.KEYDOWN for event in events):
+            return self.play
+        self.remaining -= elapsed
+        return self.play if self.remaining <= 0 else self
+
+    def draw(self):
+        context, game = self.context, self.context.game
+        rects = context.renderer.draw(game)
+        banner = [context.blit_centered(f"Level {game.level}", (WIDTH // 2, HEIGHT // 2 + 40))]
+        name = game.levels[game.level].name if game.levels else ""
+        if name:
+            banner.append(context.blit_centered(name, (WIDTH // 2, HEIGHT // 2 + 70)))
+        # Erased from the background on the next frame, like the profiler overlay
+        context.renderer.mark(banner)
+        return rects + banner
+
+# Class for GameOverScene
+class GameOverScene(Scene):
+    """
+    Ask for the player's initials, save the score and show the high scores.
+    SPACE then plays again and ESC quits.
+
+    Parameters:
+    context (Context): The shared state.
+    play_again (callable): Makes the scene to go to on SPACE, given the context.
+    """
+    def __init__(self, context, play_again=PlayScene):
+        super().__init__(context)
+        self.play_again = play_again
+        self.initials = ""
+        self.initials_entered = False
+        self.again = False
+
+    def update(self, events, elapsed):
+        for event in events:
+            if event.type != pygame.KEYDOWN:
+                continue
+            if event.key == pygame.K_ESCAPE:
+                return None
+            if not self.initials_entered:
+                if event.key == pygame.K_RETURN:
+                    self.context.write_score(self.context.game.score, self.initials.upper())
+                    self.initials_entered = True
+                elif event.key == pygame.K_BACKSPACE:
+                    self.initials = self.initials[:-1]
+                else:
+                    self.initials = (self.initials + event.unicode.upper())[:3]
+            elif event.key == pygame.K_SPACE:
+                self.again = True
+                return self.play_again(self.context)
+        return self
+
+    def draw(self):
+        context, screen = self.context, self.context.screen
+        screen.fill(BLACK)
+        if not self.initials_entered:
+            context.blit_centered("Enter your initials:", (WIDTH // 2, HEIGHT // 2))
+            context.blit_centered(self.initials, (WIDTH // 2, HEIGHT // 2 + 50))
+        else:
+            context.blit_centered("High Scores", (WIDTH // 2, 50))
+            y_position = 100
+            for i, (score, initials) in enumerate(context.read_scores(), start=1):
+                context.blit_centered(f"{i}. {initials}: {score}", (WIDTH // 2, y_position))
+                y_position += 30
+            context.blit_centered("Game Over!", (WIDTH // 2, HEIGHT // 2 + 180))
+            context.blit_centered("Press SPACE to Play Again", (WIDTH // 2, HEIGHT // 2 + 225))
+        return [screen.get_rect()]
+
+# Class for SceneDriver
+class SceneDriver:
+    """
+    Run scenes with a single event pump and frame clock, at the frame rate
+    of the first scene's context pacer.
+
+    Parameters:
+    scene (Scene): The first scene.
+    clock (pygame.time.Clock): Optional frame clock; one is made if not given.
+    profiler (profiler.FrameProfiler): Optional profiler to time event handling and display updates with;
+    the first scene's context profiler by default.
+    """
+    def __init__(self, scene, clock=None, profiler=None):
+        self.clock = clock or pygame.time.Clock()
+        self.pacer = scene.context.pacer
+        self.profiler = profiler or scene.context.profiler
+        self.scene = scene
+        scene.enter()
+
+    def step(self, events, elapsed, draw=True):
+        """
+        Run one frame of the current scene: handle the events, switch scenes
+        if it asks to, and draw whichever scene is current.
+
+        Parameters:
+        events (list): pygame events since the last frame.
+        elapsed (float): Seconds since the last frame.
+        draw (bool): Whether to draw the frame. A new scene is drawn regardless.
+
+        Returns:
+        list: The areas of the screen that changed; empty if nothing was
+        drawn or the driver has stopped.
+        """
+        if self.scene is None:
+            return []
+        if any(event.type == pygame.QUIT for event in events):
+            self.scene = None
+            return []
+        scene = self.scene.update(events, elapsed)
+        if scene is not self.scene:
+            self.scene = scene
+            if scene is None:
+                return []
+            scene.enter()
+        elif not draw:
+            return []
+        return scene.draw()
+
+    def run(self, on_frame=None):
+        """
+        Pump events, step and show frames until a scene quits.
+
+        Parameters:
+        on_frame (callable): Optional function called after each frame is on screen.
+        """
+        profiler, clock, pacer = self.profiler, self.clock, self.pacer
+        # Elapsed time comes from perf_counter rather than the clock, whose
+        # whole milliseconds would lose time every frame at high frame rates
+        timer = time.perf_counter
+        start = timer()
+        elapsed = 0.0
+        while self.scene is not None:
+            profiler.begin_frame()
+            with profiler.section("events"):
+                events = pygame.event.get()
+            rects = self.step(events, elapsed, pacer.should_draw())
+            if self.scene is None:
+                break
+            if rects:
+                with profiler.section("display.update"):
+                    pygame.display.update(rects)
+            if on_frame:
+                on_frame()
+            profiler.end_frame()
+            work = timer() - start
+            clock.tick(pacer.fps)
+            now = timer()
+            elapsed, start = now - start, now
+            pacer.record(work, elapsed)
@@ -0,0 +1,221 @@
+import os
+import tempfile
+import unittest
+
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import pygame
+
+from assets import Assets
+from audio import MixerBackend
+from assets_test import write_wav
+from netplay import SnapshotServer
+from profiler import NULL_PROFILER
+from scenes import AttractScene, Context, GameOverScene, LevelTransitionScene, MenuScene, PlayScene, SceneDriver
+from simulation import WIDTH, HEIGHT, Game
+
+FRAME = 1 / 30
+
+
+def key(kind, code, unicode=""):
+    """Make a key event."""
+    return pygame.event.Event(kind, key=code, unicode=unicode)
+
+
+class TestScenes(unittest.TestCase):
+    """Unit test case for the scene state machine, stepped headless."""
+
+    def setUp(self):
+        """Create a context on an offscreen surface."""
+        pygame.font.init()
+        self.scores = []
+        self.context = Context(pygame.Surface((WIDTH, HEIGHT)), pygame.font.Font(None, 15), Game(seed=4),
+                               lambda: sorted(self.scores, reverse=True),
+                               lambda score, initials: self.scores.append((score, initials)))
+
+    def test_menu(self):
+        """Test that SPACE starts a game and ESC quits from the menu."""
+        driver = SceneDriver(MenuScene(self.context))
+        self.assertEqual(driver.step([], FRAME), [self.context.screen.get_rect()])
+        driver.step([key(pygame.KEYDOWN, pygame.K_SPACE)], FRAME)
+        self.assertIsInstance(driver.scene, PlayScene)
+
+        driver = SceneDriver(MenuScene(self.context))
+        self.assertEqual(driver.step([key(pygame.KEYDOWN, pygame.K_ESCAPE)], FRAME), [])
+        self.assertIsNone(driver.scene)
+
+    def test_attract_mode(self):
+        """Test that an idle menu starts a demo game, which a key ends."""
+        self.context.attract_delay = 1.0
+        driver = SceneDriver(MenuScene(self.context))
+        driver.step([], 0.6)
+        driver.step([key(pygame.KEYDOWN, pygame.K_LEFT)], 0.6)
+        self.assertIsInstance(driver.scene, MenuScene)  # A key press restarts the wait
+        driver.step([], 0.6)
+        self.assertIsInstance(driver.scene, AttractScene)
+
+        game = self.context.game
+        for _ in range(60):
+            driver.step([], FRAME)
+        self.assertEqual(game.frame, 60)
+        self.assertEqual(game.lives, 3)
+        driver.step([key(pygame.KEYDOWN, pygame.K_LEFT)], FRAME)
+        self.assertIsInstance(driver.scene, MenuScene)
+
+        driver = SceneDriver(AttractScene(self.context))
+        driver.step([key(pygame.KEYDOWN, pygame.K_SPACE)], FRAME)
+        self.assertIsInstance(driver.scene, PlayScene)
+        self.assertEqual(game.frame, 0)
+
+        self.context.attract_delay = None
+        driver = SceneDriver(MenuScene(self.context))
+        driver.step([], 1000.0)
+        self.assertIsInstance(driver.scene, MenuScene)
+
+    def test_quit_event(self):
+        """Test that closing the window stops the driver from any scene."""
+        driver = SceneDriver(PlayScene(self.context))
+        driver.step([pygame.event.Event(pygame.QUIT)], FRAME)
+        self.assertIsNone(driver.scene)
+        self.assertEqual(driver.step([], FRAME), [])
+
+    def test_play_steps_the_game(self):
+        """Test that play advances the simulation at its fixed rate and steers the paddle."""
+        game = self.context.game
+        driver = SceneDriver(PlayScene(self.context))
+        driver.step([key(pygame.KEYDOWN, pygame.K_LEFT)], FRAME * 3)
+        self.assertEqual(game.frame, 3)
+        self.assertEqual(game.paddle.paddle_x_fac, -1)
+        driver.step([key(pygame.KEYUP, pygame.K_LEFT)], 0)
+        self.assertEqual(game.frame, 3)
+        self.assertEqual(game.paddle.paddle_x_fac, 0)
+
+    def test_profiler_toggle(self):
+        """Test that F3 turns on a default context's own profiler, never the shared null one."""
+        driver = SceneDriver(PlayScene(self.context))
+        self.assertIs(driver.profiler, self.context.profiler)
+        driver.step([key(pygame.KEYDOWN, pygame.K_F3)], FRAME)
+        self.assertTrue(self.context.profiler.enabled)
+        self.assertFalse(NULL_PROFILER.enabled)
+        driver.step([key(pygame.KEYDOWN, pygame.K_F3)], FRAME)
+        self.assertFalse(self.context.profiler.enabled)
+
+    def test_sounds_once_per_frame(self):
+        """Test that play sends each frame's sound effects to the dispatcher once, at the end of the frame."""
+        game, audio = self.context.game, self.context.audio
+        driver = SceneDriver(PlayScene(self.context))
+        game.ball.posx, game.ball.posy, game.ball.x_fac, game.ball.y_fac = 3, 350, -1, -1  # Below the bricks
+        driver.step([], FRAME * 3)  # Into the wall, then two more steps
+        self.assertEqual(audio.backend.plays, {"wall": 1})
+        self.assertEqual(audio.pending, {})
+
+    def test_same_game_at_any_frame_rate(self):
+        """Test that the simulation advances by real time whatever the frame rate."""
+        for fps in (30, 60, 120, 47):
+            self.context.game = Game(seed=4)
+            driver = SceneDriver(PlayScene(self.context))
+            for _ in range(fps * 2):
+                driver.step([], 1 / fps)
+            self.assertAlmostEqual(self.context.game.frame, 60, delta=1)
+
+    def test_audio_joins_in(self):
+        """Test that play starts without waiting for the sounds and picks them up once loaded."""
+        with tempfile.TemporaryDirectory() as directory:
+            sounds = {}
+            for name in ("paddle", "brick", "wall", "lose_life"):
+                sounds[name] = os.path.join(directory, name + ".wav")
+                write_wav(sounds[name])
+            music = os.path.join(directory, "music.wav")
+            write_wav(music)
+            assets = self.context.assets = Assets(sounds, music)
+            try:
+                driver = SceneDriver(PlayScene(self.context))
+                self.assertFalse(self.context.audio_started)  # Entering play started the load, not waited for it
+                self.assertIsNotNone(assets.thread)
+
+                assets.thread.join()
+                driver.step([], FRAME)
+                self.assertTrue(self.context.audio_started)
+                self.assertIsInstance(self.context.audio.backend, MixerBackend)
+                self.assertEqual(set(self.context.audio.backend.sounds), {"wall", "paddle", "brick", "lose_life"})
+            finally:
+                pygame.mixer.quit()
+
+    def test_skipped_draw(self):
+        """Test that a frame can be stepped without drawing it, except when the scene changes."""
+        driver = SceneDriver(MenuScene(self.context))
+        self.assertEqual(driver.step([], FRAME, draw=False), [])
+        rects = driver.step([key(pygame.KEYDOWN, pygame.K_SPACE)], FRAME, draw=False)
+        self.assertEqual(rects, [self.context.screen.get_rect()])
+        self.assertEqual(driver.step([], FRAME, draw=False), [])
+        self.assertEqual(self.context.game.frame, 1)
+
+    def test_hosting(self):
+        """Test that play publishes every step, and steps a versus game from the same seed."""
+        server = SnapshotServer(port=0)
+        try:
+            self.context.server, self.context.rival = server, Game()
+            driver = SceneDriver(PlayScene(self.context))
+            driver.step([], FRAME * 4)
+            game, rival = self.context.game, self.context.rival
+            self.assertEqual(rival.seed, game.seed)
+            self.assertEqual((game.frame, rival.frame), (4, 4))
+            self.assertEqual(sorted(server.encoders), [0, 1])
+        finally:
+            server.close()
+
+    def test_level_transition(self):
+        """Test that clearing a level shows the banner, then play resumes on the next level."""
+        game = self.context.game
+        play = PlayScene(self.context)
+        driver = SceneDriver(play)
+        for block in list(game.blocks):
+            game.blocks.remove(block)
+        driver.step([], FRAME)
+        self.assertIsInstance(driver.scene, LevelTransitionScene)
+        self.assertEqual(game.level, 2)
+
+        frame = game.frame
+        driver.step([], 1.0)
+        self.assertIsInstance(driver.scene, LevelTransitionScene)
+        driver.step([], 1.0)
+        self.assertIs(driver.scene, play)
+        self.assertEqual(game.frame, frame)  # The simulation waited during the banner
+        driver.step([], FRAME)
+        self.assertEqual(game.frame, frame + 1)
+
+    def test_game_over_and_restart(self):
+        """Test entering initials, saving the score and starting a new game, all in one driver."""
+        game = self.context.game
+        driver = SceneDriver(PlayScene(self.context))
+        game.lives = 1
+        game.score = 120
+        game.ball.posy = HEIGHT + 50
+        driver.step([], FRAME)
+        self.assertIsInstance(driver.scene, GameOverScene)
+
+        typed = [key(pygame.KEYDOWN, ord(char), char) for char in "abcd"]
+        driver.step(typed + [key(pygame.KEYDOWN, pygame.K_BACKSPACE)], FRAME)
+        self.assertEqual(driver.scene.initials, "AB")
+        driver.step([key(pygame.KEYDOWN, pygame.K_RETURN)], FRAME)
+        self.assertEqual(self.scores, [(120, "AB")])
+
+        driver.step([key(pygame.KEYDOWN, pygame.K_SPACE)], FRAME)
+        self.assertIsInstance(driver.scene, PlayScene)
+        self.assertEqual((game.score, game.lives, game.over), (0, 3, False))
+
+    def test_game_over_quit(self):
+        """Test that ESC on the game over screen quits."""
+        scene = GameOverScene(self.context)
+        driver = SceneDriver(scene)
+        driver.step([key(pygame.KEYDOWN, pygame.K_ESCAPE)], FRAME)
+        self.assertIsNone(driver.scene)
+        self.assertFalse(scene.again)
+
+    def tearDown(self):
+        """Quit the font module."""
+        pygame.font.quit()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,174 @@
+"""
+High-score store backed by an append-only log.
+
+Scores are kept in memory in sorted order, so leaderboard queries never touch
+the disk. Each submission appends one line to the log, which uses the same
+"score initials" line format as high_scores.txt. Every so often the log is
+compacted: the best entries are written to a temporary file that then
+atomically replaces the log.
+"""
+
+import bisect
+import os
+import stat
+import tempfile
+
+# Class for ScoreStore
+class ScoreStore:
+    """
+    Initialize a high-score store.
+
+    Several processes may share one file: each picks up lines the others
+    appended when it next calls refresh() or submit(). Compaction replaces the
+    file, so a line appended by another process at the same moment can be lost;
+    give one cabinet the job of compacting if that matters.
+
+    Parameters:
+    path (str): Log file.
+    max_entries (int): Entries kept when the log is compacted.
+    compact_every (int): Submissions between automatic compactions, 0 to never compact.
+    """
+    def __init__(self, path, max_entries=1000, compact_every=100):
+        self.path = path
+        self.max_entries = max_entries
+        self.compact_every = compact_every
+        self.load()
+
+    def load(self):
+        """
+        Read the whole log into memory.
+        """
+        self.entries = []  # sorted (-score, sequence, initials)
+        self.players = {}  # initials -> sorted (-score, sequence)
+        self.sequence = 0
+        self.offset = 0
+        self.identity = None  # (device, inode) of the file last read
+        self.pending = 0
+        self.refresh()
+
+    def refresh(self):
+        """
+        Read any lines appended to the log since it was last read.
+        """
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return
+        identity = (stat.st_dev, stat.st_ino)
+        if self.identity is None:
+            self.identity = identity
+        elif identity != self.identity or stat.st_size < self.offset:
+            # Compacted by someone else; start over
+            self.load()
+            return
+        size = stat.st_size
+        if size == self.offset:
+            return
+        with open(self.path, 'rb') as file:
+            file.seek(self.offset)
+            data = file.read(size - self.offset)
+        # Leave a partly written last line for next time
+        end = data.rfind(b'\n') + 1
+        self.offset += end
+        for line in data[:end].decode('utf-8', 'replace').splitlines():
+            parts = line.split(None, 1)
+            if not parts:
+                continue
+            try:
+                score = int(parts[0])
+            except ValueError:
+                continue
+            self._insert(score, parts[1].strip() if len(parts) > 1 else "")
+
+    def _insert(self, score, initials):
+        """
+        Add an entry to the in-memory leaderboards.
+        """
+        key = (-score, self.sequence)
+        self.sequence += 1
+        bisect.insort(self.entries, key + (initials,))
+        bisect.insort(self.players.setdefault(initials, []), key)
+
+    def submit(self, score, initials):
+        """
+        Record a score.
+
+        Parameters:
+        score (int): The score.
+        initials (str): Player initials.
+        """
+        self.refresh()
+        with open(self.path, 'ab') as file:
+            file.write(f"{score} {initials}\n".encode('utf-8'))
+            file.flush()
+            os.fsync(file.fileno())
+        # Read our line back along with anything another process appended first
+        self.refresh()
+        self.pending += 1
+        if self.compact_every and self.pending >= self.compact_every:
+            self.compact()
+
+    def compact(self):
+        """
+        Rewrite the log with only the best max_entries entries, atomically.
+        """
+        self.refresh()
+        kept = self.entries[:self.max_entries]
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".scores-")
+        try:
+            with os.fdopen(fd, 'wb') as file:
+                for negative_score, _, initials in kept:
+                    file.write(f"{-negative_score} {initials}\n".encode('utf-8'))
+                file.flush()
+                os.fsync(file.fileno())
+            # mkstemp makes the file private to this user; keep the shared file's permissions instead
+            try:
+                os.chmod(temp_path, stat.S_IMODE(os.stat(self.path).st_mode))
+            except FileNotFoundError:
+                pass
+            os.replace(temp_path, self.path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+        self.load()
+
+    def top(self, n=10):
+        """
+        Get the all-time leaderboard.
+
+        Parameters:
+        n (int): Number of entries.
+
+        Returns:
+        list: (score, initials) tuples, best first; ties in submission order.
+        """
+        return [(-negative_score, initials) for negative_score, _, initials in self.entries[:n]]
+
+    def top_for(self, initials, n=10):
+        """
+        Get one player's best scores.
+
+        Parameters:
+        initials (str): Player initials.
+        n (int): Number of entries.
+
+        Returns:
+        list: Scores, best first.
+        """
+        return [-negative_score for negative_score, _ in self.players.get(initials, [])[:n]]
+
+    def rank(self, score):
+        """
+        Get the leaderboard position a score would take.
+
+        Parameters:
+        score (int): The score.
+
+        Returns:
+        int: 1-based position, after existing equal scores.
+        """
+        return bisect.bisect_right(self.entries, (-score, self.sequence)) + 1
+
+    def __len__(self):
+        return len(self.entries)
@@ -0,0 +1,91 @@
+import os
+import tempfile
+import unittest
+
+from score_store import ScoreStore
+
+
+class TestScoreStore(unittest.TestCase):
+    """Unit test case for the append-only high-score store."""
+
+    def setUp(self):
+        """Create a score file in the old high_scores.txt format."""
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "high_scores.txt")
+        with open(self.path, 'w') as file:
+            file.write("1235 JT\n50 AB\n")
+
+    def test_reads_existing_file(self):
+        """Test that the existing score file format loads."""
+        store = ScoreStore(self.path)
+        self.assertEqual(store.top(), [(1235, "JT"), (50, "AB")])
+
+    def test_submit_appends(self):
+        """Test that a submission appends one line instead of rewriting the file."""
+        store = ScoreStore(self.path)
+        store.submit(700, "ZZ")
+        store.submit(50, "")
+        with open(self.path) as file:
+            self.assertEqual(file.read(), "1235 JT\n50 AB\n700 ZZ\n50 \n")
+        self.assertEqual(store.top(3), [(1235, "JT"), (700, "ZZ"), (50, "AB")])
+        self.assertEqual(ScoreStore(self.path).top(), store.top())
+
+    def test_more_than_ten_and_per_player(self):
+        """Test long leaderboards and per-player queries."""
+        store = ScoreStore(self.path, compact_every=0)
+        for score in range(100):
+            store.submit(score, "P" + str(score % 3))
+        self.assertEqual(len(store), 102)
+        self.assertEqual(len(store.top(50)), 50)
+        self.assertEqual(store.top_for("P0", 3), [99, 96, 93])
+        self.assertEqual(store.rank(2000), 1)
+        self.assertEqual(store.rank(1235), 2)
+
+    def test_shared_file(self):
+        """Test that two stores on one file see each other's scores."""
+        first, second = ScoreStore(self.path), ScoreStore(self.path)
+        first.submit(900, "AA")
+        second.refresh()
+        self.assertEqual(second.top(2), [(1235, "JT"), (900, "AA")])
+
+    def test_compaction(self):
+        """Test that compaction keeps the best entries and other readers reload."""
+        reader = ScoreStore(self.path)
+        store = ScoreStore(self.path, max_entries=5, compact_every=10)
+        for score in range(10):
+            if score == 1:
+                reader.refresh()
+            store.submit(score, "CC")
+        with open(self.path) as file:
+            lines = file.read().splitlines()
+        self.assertEqual(lines, ["1235 JT", "50 AB", "9 CC", "8 CC", "7 CC"])
+        self.assertEqual(store.top(), [(1235, "JT"), (50, "AB"), (9, "CC"), (8, "CC"), (7, "CC")])
+        reader.refresh()
+        self.assertEqual(reader.top(), store.top())
+
+    def test_compaction_keeps_permissions(self):
+        """Test that compacting a shared file leaves it readable by everyone it was readable by."""
+        os.chmod(self.path, 0o644)
+        ScoreStore(self.path, max_entries=2).compact()
+        self.assertEqual(os.stat(self.path).st_mode & 0o777, 0o644)
+
+    def test_partial_line_ignored(self):
+        """Test that a line still being written is picked up once complete."""
+        store = ScoreStore(self.path)
+        with open(self.path, 'a') as file:
+            file.write("99")
+        store.refresh()
+        self.assertEqual(len(store), 2)
+        with open(self.path, 'a') as file:
+            file.write("9 XY\n")
+        store.refresh()
+        self.assertEqual(store.top(1), [(1235, "JT")])
+        self.assertEqual(store.top_for("XY"), [999])
+
+    def tearDown(self):
+        """Remove the score file."""
+        self.directory.cleanup()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,750 @@
+"""
+Headless Breakout simulation.
+
+Pure-Python game state for Breakout: paddle, ball, block field, scoring,
+lives and level progression. Nothing in here imports pygame, so games can
+be stepped on machines with no display, font or mixer available.
+"""
+
+import random
+
+from entities import EntityPool
+from physics import sweep_circle_rect
+from profiler import NULL_PROFILER
+from spatial import BlockGrid
+
+# Constants
+WIDTH, HEIGHT = 600, 500
+BLACK = (0, 0, 0)
+WHITE = (255, 255, 255)
+GREEN = (0, 255, 0)
+RED = (255, 0, 0)
+BLUE = (0, 0, 255)
+YELLOW = (255, 255, 0)
+
+BLOCK_COLORS = [WHITE, GREEN, RED, BLUE, YELLOW]
+BLOCK_POINTS = [10, 5, 15, 20, 25]
+BLOCK_WIDTH, BLOCK_HEIGHT = 40, 15
+HORIZONTAL_GAP, VERTICAL_GAP = 20, 20
+
+START_LIVES = 3
+MAX_LEVEL = 3
+BALL_RADIUS = 7
+BALL_SPEED = 5
+PADDLE_WIDTH, PADDLE_HEIGHT = 100, 5
+PADDLE_SPEED = 10
+MAX_SWEEP_HITS = 4  # Most collisions resolved for one ball in one step
+
+# Power-ups
+MULTIBALL, WIDE, PIERCE = "multiball", "wide", "pierce"
+POWERUP_KINDS = [MULTIBALL, WIDE, PIERCE]
+POWERUP_COLORS = {MULTIBALL: GREEN, WIDE: BLUE, PIERCE: RED}
+POWERUP_CHANCE = 0.15  # Chance a destroyed block drops a power-up
+POWERUP_WIDTH, POWERUP_HEIGHT = 20, 10
+POWERUP_SPEED = 3
+MAX_BALLS = 512
+MAX_POWERUPS = 32
+WIDE_PADDLE_WIDTH = 160
+WIDE_STEPS = 600  # How long a power-up lasts, in steps
+PIERCE_STEPS = 300
+
+# Class for Rect
+class Rect:
+    """
+    Axis-aligned rectangle with the subset of the pygame.Rect API the game uses.
+
+    Parameters:
+    left (float): Left edge.
+    top (float): Top edge.
+    width (float): Width of the rectangle.
+    height (float): Height of the rectangle.
+    """
+    __slots__ = ("left", "top", "width", "height")
+
+    def __init__(self, left, top, width, height):
+        self.left, self.top = left, top
+        self.width, self.height = width, height
+
+    @property
+    def right(self):
+        return self.left + self.width
+
+    @property
+    def bottom(self):
+        return self.top + self.height
+
+    def colliderect(self, other):
+        """
+        Check if two rectangles overlap, with the same edge rules as pygame.
+
+        Parameters:
+        other (Rect): The rectangle to test against.
+
+        Returns:
+        bool: True if the rectangles overlap, False otherwise.
+        """
+        if not (self.width and self.height and other.width and other.height):
+            return False
+        return (self.left < other.left + other.width and other.left < self.left + self.width
+                and self.top < other.top + other.height and other.top < self.top + self.height)
+
+    def __repr__(self):
+        return f"Rect({self.left}, {self.top}, {self.width}, {self.height})"
+
+# Collision check
+def collision_checker(rect, ball):
+    """
+    Check if the ball collides with a given rectangle.
+
+    Parameters:
+    rect (Rect): The rectangle to check collision with.
+    ball (Rect): The ball's rectangle.
+
+    Returns:
+    bool: True if collision occurs, False otherwise.
+    """
+    return rect.colliderect(ball)
+
+# Create blocks with different colors and point values
+def create_blocks(block_width, block_height, horizontal_gap, vertical_gap, rng=random):
+    """
+    Create a list of blocks with random colors and point values.
+
+    Parameters:
+    block_width (int): Width of each block.
+    block_height (int): Height of each block.
+    horizontal_gap (int): Horizontal gap between blocks.
+    vertical_gap (int): Vertical gap between blocks.
+    rng (random.Random): Source of randomness for block colors.
+
+    Returns:
+    list: List of block objects.
+    """
+    block_list = []
+
+    for i in range(0, WIDTH, block_width + horizontal_gap):
+        for j in range(0, HEIGHT // 2, block_height + vertical_gap):
+            kind = rng.randrange(len(BLOCK_COLORS))
+            block_list.append(Block(i, j, block_width, block_height, BLOCK_COLORS[kind], BLOCK_POINTS[kind]))
+
+    return block_list
+
+# Class for Paddle
+class Paddle:
+    """
+    Initialize a Paddle Object.
+
+    Parameters:
+    posx (int): Initial x position.
+    posy (int): Initial y position.
+    width (int): Width of the paddle.
+    height (int): Height of the paddle.
+    speed (int): Speed of the paddle.
+    color (tuple): Color of the paddle.
+    """
+    def __init__(self, posx, posy, width, height, speed, color):
+        self.posx, self.posy = posx, posy
+        self.width, self.height = width, height
+        self.speed = speed
+        self.color = color
+        self.paddle_rect = Rect(self.posx, self.posy, self.width, self.height)
+        self.paddle_x_fac = 0  # To store movement direction
+        self.last_x = posx  # Position before the last update, for drawing between steps
+
+    def update(self):
+        """
+        Update the paddle's position based on its movement direction.
+        """
+        self.last_x = self.posx
+        self.posx += self.speed * self.paddle_x_fac
+
+        if self.posx <= 0:
+            self.posx = 0
+        elif self.posx + self.width >= WIDTH:
+            self.posx = WIDTH - self.width
+
+        self.paddle_rect = Rect(self.posx, self.posy, self.width, self.height)
+
+    def set_movement(self, x_fac):
+        """
+        Set the movement direction of the paddle.
+
+        Parameters:
+        x_fac (int): Direction factor (-1 for left, 1 for right, 0 for stop)
+        """
+        self.paddle_x_fac = x_fac
+
+    def resize(self, width):
+        """
+        Change the paddle's width, keeping it centred where it is.
+
+        Parameters:
+        width (int): The new width.
+        """
+        self.posx = self.last_x = min(max(self.posx + (self.width - width) / 2, 0), WIDTH - width)
+        self.width = width
+        self.paddle_rect = Rect(self.posx, self.posy, self.width, self.height)
+
+    def get_rect(self):
+        """
+        Get the rectangle representation of the paddle.
+
+        Returns:
+        Rect: The paddle's rectangle
+        """
+        return self.paddle_rect
+
+# Class for Block
+class Block:
+    """
+    Initialize a block object.
+
+    Parameters:
+    posx (int): Initial x position.
+    posy (int): Initial y position.
+    width (int): Width of the block.
+    height (int): Height of the block.
+    color (tuple): Color of the block.
+    points (int): Point value of the block.
+    health (int): Hits the block takes to destroy.
+    """
+    def __init__(self, posx, posy, width, height, color, points, health=1):
+        self.posx, self.posy = posx, posy
+        self.width, self.height = width, height
+        self.color = color
+        self.health = health
+        self.points = points
+        self.block_rect = Rect(self.posx, self.posy, self.width, self.height)
+
+    def hit(self):
+        """
+        Handle the block being hit by the ball.
+        """
+        self.health -= 1
+
+    def get_rect(self):
+        """
+        Get the rectangle representation of the block.
+
+        Returns:
+        Rect: The block's rectangle.
+        """
+        return self.block_rect
+
+    def get_health(self):
+        """
+        Get the health of the block.
+
+        Returns:
+        int: The blocks health.
+        """
+        return self.health
+
+    def get_points(self):
+        """
+        Get the point value of the block.
+
+        Returns:
+        int: The block's point value.
+        """
+        return self.points
+
+# Class for Ball
+class Ball:
+    """
+    Initialize a Ball object.
+
+    Parameters:
+    posx (int): Initial x position.
+    posy (int): Initial y position.
+    radius (int): Radius of the ball.
+    speed (int): Speed of the ball.
+    color (tuple): Color of the ball.
+    rng (random.Random): Source of randomness for the launch angle.
+    """
+    __slots__ = ("posx", "posy", "radius", "speed", "color", "rng", "x_fac", "y_fac",
+                 "piercing", "pool_index", "ball_rect", "last_x", "last_y")
+
+    def __init__(self, posx, posy, radius, speed, color, rng=random):
+        self.posx, self.posy = posx, posy
+        self.radius = radius
+        self.speed = speed
+        self.color = color
+        self.rng = rng
+        self.x_fac, self.y_fac = rng.uniform(-1, 1), 1
+        self.piercing = 0  # Steps left passing through blocks
+        self.pool_index = -1
+        self.last_x, self.last_y = posx, posy  # Position before the last step, for drawing between steps
+        self.ball_rect = Rect(self.posx - self.radius, self.posy - self.radius, self.radius * 2, self.radius * 2)
+
+    def update(self, events=None):
+        """
+        Update the ball's position and handle screen edge collisions.
+
+        Parameters:
+        events (list): Optional list that "wall" and "lost" events are appended to.
+
+        Returns:
+        bool: True if the ball dropped below the screen, False otherwise.
+        """
+        self.posx += self.x_fac * self.speed
+        self.posy += self.y_fac * self.speed
+        return self.check_edges(events)
+
+    def check_edges(self, events=None):
+        """
+        Bounce the ball off the screen edges at its current position.
+
+        Parameters:
+        events (list): Optional list that "wall" and "lost" events are appended to.
+
+        Returns:
+        bool: True if the ball dropped below the screen, False otherwise.
+        """
+        if self.posx <= 0 or self.posx >= WIDTH:
+            self.x_fac *= -1
+            if self.posx <= 0:
+                self.posx += 2
+            elif self.posx >= WIDTH:
+                self.posx -= 2
+            if events is not None:
+                events.append("wall")
+
+        if self.posy <= 0:
+            self.y_fac *= -1
+            if events is not None:
+                events.append("wall")
+
+        self.ball_rect = Rect(self.posx - self.radius, self.posy - self.radius, self.radius * 2, self.radius * 2)
+
+        # Check if ball goes below the screen
+        if self.posy >= HEIGHT:
+            if events is not None:
+                events.append("lost")
+            return True
+        return False
+
+    def reset(self):
+        """
+        Put the ball back at its serving position with a new launch angle.
+        """
+        self.launch(WIDTH // 2, HEIGHT - 150, self.rng.uniform(-1, 1), 1)
+
+    def launch(self, posx, posy, x_fac, y_fac, piercing=0):
+        """
+        Place the ball and set it moving, for serving or reusing a pooled ball.
+
+        Parameters:
+        posx (float): x position.
+        posy (float): y position.
+        x_fac (float): Horizontal direction factor.
+        y_fac (float): Vertical direction factor.
+        piercing (int): Steps the ball passes through blocks for.
+        """
+        self.posx, self.posy = self.last_x, self.last_y = posx, posy
+        self.x_fac, self.y_fac = x_fac, y_fac
+        self.piercing = piercing
+        self.ball_rect = Rect(self.posx - self.radius, self.posy - self.radius, self.radius * 2, self.radius * 2)
+
+    def hit_paddle(self, paddle_rect):
+        """
+        Handle the ball hitting the paddle depending on where on the paddle the ball hits.
+        A paddle end against a wall has no side to hit, so a ball past it bounces off the top.
+        """
+        if self.posx < paddle_rect.left and paddle_rect.left > 0:
+            self.x_fac = -1
+        elif self.posx > paddle_rect.right and paddle_rect.right < WIDTH:
+            self.x_fac = 1
+        else:
+            collision_point = min(max(self.posx - paddle_rect.left, 0), paddle_rect.width)
+            relative_collision = (collision_point / paddle_rect.width) - 0.5
+            self.x_fac = relative_collision * 2
+            self.y_fac = -1
+
+    def hit_block(self, block_rect):
+        """
+        Handle the ball hitting a block depending on where on the block the ball hits.
+        """
+        if self.posx < block_rect.left:
+            self.x_fac = -1
+        elif self.posx > block_rect.right:
+            self.x_fac = 1
+        else:
+            self.y_fac *= -1
+
+    def bounce(self, normal_x, normal_y):
+        """
+        Reflect the ball's direction off a surface with the given unit normal.
+        """
+        dot = self.x_fac * normal_x + self.y_fac * normal_y
+        if dot < 0:
+            self.x_fac -= 2 * dot * normal_x
+            self.y_fac -= 2 * dot * normal_y
+
+    def get_rect(self):
+        """
+        Get the rectangle position of the ball.
+
+        Returns:
+        Rect: The ball's rectangle
+        """
+        return self.ball_rect
+
+# Class for PowerUp
+class PowerUp:
+    """
+    Initialize a power-up capsule falling from a destroyed block.
+
+    Parameters:
+    posx (float): Initial x position of the capsule's centre.
+    posy (float): Initial y position of the capsule's centre.
+    kind (str): One of POWERUP_KINDS.
+    """
+    __slots__ = ("posx", "posy", "last_y", "kind", "color", "pool_index", "powerup_rect")
+
+    def __init__(self, posx, posy, kind):
+        self.pool_index = -1
+        self.spawn(posx, posy, kind)
+
+    def spawn(self, posx, posy, kind):
+        """
+        Place the capsule, for creating or reusing a pooled power-up.
+        """
+        self.posx, self.posy = posx, posy
+        self.last_y = posy
+        self.kind = kind
+        self.color = POWERUP_COLORS[kind]
+        self.powerup_rect = Rect(posx - POWERUP_WIDTH // 2, posy - POWERUP_HEIGHT // 2, POWERUP_WIDTH, POWERUP_HEIGHT)
+
+    def update(self):
+        """
+        Fall one step.
+
+        Returns:
+        bool: True if the capsule fell below the screen, False otherwise.
+        """
+        self.last_y = self.posy
+        self.posy += POWERUP_SPEED
+        self.powerup_rect = Rect(self.posx - POWERUP_WIDTH // 2, self.posy - POWERUP_HEIGHT // 2,
+                                 POWERUP_WIDTH, POWERUP_HEIGHT)
+        return self.posy - POWERUP_HEIGHT // 2 >= HEIGHT
+
+    def get_rect(self):
+        """
+        Get the rectangle representation of the power-up.
+
+        Returns:
+        Rect: The power-up's rectangle.
+        """
+        return self.powerup_rect
+
+# Class for Game
+class Game:
+    """
+    Initialize a headless game of Breakout.
+
+    Balls and power-ups are kept in preallocated pools, so multi-ball does
+    not create garbage however many balls are in play.
+
+    Parameters:
+    seed (int): Optional seed for the game's private random number generator.
+    profiler (profiler.FrameProfiler): Optional profiler to time each part of a step with.
+    powerups (bool): Whether destroyed blocks can drop power-ups.
+    levels (levels.LevelSet): Optional level layouts; without them every
+    level is the classic grid of random blocks.
+    """
+    def __init__(self, seed=None, profiler=NULL_PROFILER, powerups=False, levels=None):
+        self.profiler = profiler
+        self.powerups = powerups
+        self.levels = levels
+        self.max_level = len(levels) if levels else MAX_LEVEL
+        self.events = []
+        self.broken = []
+        self.ball_pool = EntityPool(lambda: Ball(0, 0, BALL_RADIUS, BALL_SPEED, WHITE),
+                                    MAX_BALLS if powerups else 1)
+        self.powerup_pool = EntityPool(lambda: PowerUp(0, 0, MULTIBALL), MAX_POWERUPS if powerups else 0)
+        self.reset(seed)
+
+    @property
+    def balls(self):
+        """
+        list: The balls in play. Do not modify; use the pool.
+        """
+        return self.ball_pool.active
+
+    @property
+    def ball(self):
+        """
+        Ball: The first ball in play, or None if there is none.
+        """
+        balls = self.ball_pool.active
+        return balls[0] if balls else None
+
+    @ball.setter
+    def ball(self, ball):
+        self.ball_pool.release_all()
+        self.ball_pool.adopt(ball)
+
+    @property
+    def falling_powerups(self):
+        """
+        list: The power-ups falling towards the paddle.
+        """
+        return self.powerup_pool.active
+
+    def reset(self, seed=None):
+        """
+        Start a new game from level 1 with full lives and no score.
+
+        Parameters:
+        seed (int): Optional seed for the new game. A random one is picked if
+        not given; either way it is kept in self.seed so the game can be replayed.
+        """
+        if seed is None:
+            seed = random.getrandbits(63)
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.lives = START_LIVES
+        self.score = 0
+        self.frame = 0
+        self.over = False
+        self.start_level(1)
+
+    def start_level(self, level):
+        """
+        Create fresh paddle, ball and block field for the given level.
+
+        Parameters:
+        level (int): The level to start.
+        """
+        self.level = level
+        self.paddle = Paddle(WIDTH // 2 - PADDLE_WIDTH // 2, HEIGHT - 50, PADDLE_WIDTH, PADDLE_HEIGHT, PADDLE_SPEED, WHITE)
+        self.wide_steps = 0
+        self.ball_pool.release_all()
+        self.powerup_pool.release_all()
+        self.serve()
+        if self.levels:
+            layout = self.levels[level]
+            self.blocks = BlockGrid(layout.cell_width, layout.cell_height, layout.build(self.rng))
+        else:
+            self.blocks = BlockGrid(BLOCK_WIDTH + HORIZONTAL_GAP, BLOCK_HEIGHT + VERTICAL_GAP,
+                                    create_blocks(BLOCK_WIDTH, BLOCK_HEIGHT, HORIZONTAL_GAP, VERTICAL_GAP, self.rng))
+
+    def serve(self):
+        """
+        Put a new ball into play at the serving position.
+        """
+        ball = self.ball_pool.acquire()
+        ball.rng = self.rng
+        ball.reset()
+
+    def step(self, movement=None):
+        """
+        Advance the game by one frame.
+
+        Parameters:
+        movement (int): Optional paddle direction (-1, 0 or 1) to apply before moving.
+
+        Returns:
+        list: Names of the events that happened this frame ("wall", "paddle",
+        "brick", "hit", "powerup", "lost", "lose_life", "level", "game_over").
+        "hit" is a block that was hit but not destroyed. The blocks destroyed
+        this frame are left in self.broken.
+        """
+        events = self.events = []
+        self.broken = []
+        if self.over:
+            return events
+        self.frame += 1
+
+        profiler = self.profiler
+        if movement is not None:
+            self.paddle.set_movement(movement)
+        with profiler.section("paddle.update"):
+            if self.wide_steps:
+                self.wide_steps -= 1
+                if not self.wide_steps:
+                    self.paddle.resize(PADDLE_WIDTH)
+            self.paddle.update()
+
+        # Walk backwards so releasing a lost ball, which moves the last ball
+        # into its slot, never skips one. The last ball in play is kept and
+        # served again, so there is always a ball to show.
+        balls = self.ball_pool.active
+        last_lost = None
+        for index in range(len(balls) - 1, -1, -1):
+            ball = balls[index]
+            if self.move_ball(ball, events):
+                if len(balls) > 1:
+                    self.ball_pool.release(ball)
+                else:
+                    last_lost = ball
+
+        if last_lost is not None:
+            self.lives -= 1
+            if self.lives > 0:
+                last_lost.reset()
+                events.append("lose_life")
+            else:
+                self.over = True
+                events.append("game_over")
+                return events
+
+        if self.powerup_pool.active:
+            self.update_powerups(events)
+
+        # Check if all blocks are destroyed
+        if not self.blocks:
+            if self.level >= self.max_level:
+                self.over = True
+                events.append("game_over")
+            else:
+                self.start_level(self.level + 1)
+                events.append("level")
+
+        return events
+
+    def move_ball(self, ball, events):
+        """
+        Move one ball a step and resolve its collisions.
+
+        Parameters:
+        ball (Ball): The ball to move.
+        events (list): List that events are appended to.
+
+        Returns:
+        bool: True if the ball dropped below the screen, False otherwise.
+        """
+        profiler = self.profiler
+        ball.last_x, ball.last_y = ball.posx, ball.posy
+        # A ball covering more than its radius per step could jump over the
+        # thin paddle or a brick, so move it with swept collision instead
+        swept = ball.speed * max(abs(ball.x_fac), abs(ball.y_fac)) > ball.radius
+        with profiler.section("ball.update"):
+            if swept:
+                self.sweep_ball(ball, events)
+                lost = ball.check_edges(events)
+            else:
+                lost = ball.update(events)
+        if lost:
+            return True
+
+        # Check collisions with paddle and blocks
+        if not swept:
+            with profiler.section("collisions"):
+                if collision_checker(self.paddle.get_rect(), ball.get_rect()):
+                    ball.hit_paddle(self.paddle.get_rect())
+                    events.append("paddle")
+
+                for block in self.blocks.query(ball.get_rect()):
+                    if not ball.piercing:
+                        ball.hit_block(block.get_rect())
+                    self.damage_block(block, events)
+
+        if ball.piercing:
+            ball.piercing -= 1
+        return False
+
+    def damage_block(self, block, events):
+        """
+        Hit a block, removing it and scoring its points once it has no health
+        left. With power-ups on, a destroyed block may drop one.
+        """
+        block.hit()
+        if block.get_health() <= 0:
+            self.blocks.remove(block)
+            self.broken.append(block)
+            self.score += block.get_points()
+            events.append("brick")
+            if self.powerups and self.rng.random() < POWERUP_CHANCE:
+                powerup = self.powerup_pool.acquire()
+                if powerup is not None:
+                    powerup.spawn(block.posx + block.width / 2, block.posy + block.height / 2,
+                                  self.rng.choice(POWERUP_KINDS))
+        else:
+            events.append("hit")
+
+    def update_powerups(self, events):
+        """
+        Move the falling power-ups, applying any the paddle catches.
+
+        Parameters:
+        events (list): List that "powerup" events are appended to.
+        """
+        paddle_rect = self.paddle.get_rect()
+        powerups = self.powerup_pool.active
+        for index in range(len(powerups) - 1, -1, -1):
+            powerup = powerups[index]
+            if powerup.update():
+                self.powerup_pool.release(powerup)
+            elif collision_checker(paddle_rect, powerup.get_rect()):
+                self.apply_powerup(powerup.kind)
+                self.powerup_pool.release(powerup)
+                events.append("powerup")
+
+    def apply_powerup(self, kind):
+        """
+        Apply a caught power-up.
+
+        Parameters:
+        kind (str): One of POWERUP_KINDS.
+        """
+        if kind == MULTIBALL:
+            # Every ball splits in three, as far as the pool allows
+            for ball in list(self.ball_pool.active):
+                for x_fac in (-0.75, 0.75):
+                    extra = self.ball_pool.acquire()
+                    if extra is None:
+                        return
+                    extra.rng = self.rng
+                    extra.launch(ball.posx, ball.posy, ball.x_fac + x_fac, ball.y_fac, ball.piercing)
+        elif kind == WIDE:
+            if not self.wide_steps:
+                self.paddle.resize(WIDE_PADDLE_WIDTH)
+            self.wide_steps = WIDE_STEPS
+        elif kind == PIERCE:
+            for ball in self.ball_pool.active:
+                ball.piercing = PIERCE_STEPS
+
+    def sweep_ball(self, ball, events):
+        """
+        Move a ball one step, stopping at the first surface it touches on the
+        way, bouncing, and carrying on with the rest of the move.
+
+        Parameters:
+        ball (Ball): The ball to move.
+        events (list): List that "paddle" and "brick" events are appended to.
+        """
+        paddle = self.paddle
+        radius = ball.radius
+        remaining = 1.0
+        last = None
+        for _ in range(MAX_SWEEP_HITS):
+            dx = ball.x_fac * ball.speed * remaining
+            dy = ball.y_fac * ball.speed * remaining
+            path = Rect(min(ball.posx, ball.posx + dx) - radius, min(ball.posy, ball.posy + dy) - radius,
+                        abs(dx) + 2 * radius, abs(dy) + 2 * radius)
+            first = None
+            for target in self.blocks.query(path) + [paddle]:
+                if target is last:
+                    continue
+                hit = sweep_circle_rect(ball.posx, ball.posy, dx, dy, radius, target.get_rect())
+                if hit and (first is None or hit[0] < first[0]):
+                    first = hit + (target,)
+            if first is None:
+                ball.posx += dx
+                ball.posy += dy
+                return
+
+            toi, normal_x, normal_y, target = first
+            ball.posx += dx * toi
+            ball.posy += dy * toi
+            remaining *= 1 - toi
+            last = target
+            if target is paddle:
+                ball.hit_paddle(paddle.get_rect())
+                events.append("paddle")
+            else:
+                if not ball.piercing:
+                    ball.bounce(normal_x, normal_y)
+                self.damage_block(target, events)
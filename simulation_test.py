@@ -0,0 +1,211 @@
+import subprocess
+import sys
+import unittest
+
+from simulation import (WIDTH, HEIGHT, RED, WHITE, START_LIVES, MAX_BALLS, MULTIBALL, PADDLE_WIDTH, PIERCE,
+                        WIDE, WIDE_PADDLE_WIDTH, Ball, Block, Game, PowerUp, Rect,
+                        collision_checker, create_blocks)
+from spatial import BlockGrid
+
+
+class TestSimulation(unittest.TestCase):
+    """Unit test case for the headless Breakout simulation."""
+
+    def setUp(self):
+        """Create a seeded game for testing."""
+        self.game = Game(seed=1)
+
+    def test_no_pygame_import(self):
+        """Test that the simulation can be used without pygame."""
+        code = "import sys, simulation; sys.exit('pygame' in sys.modules)"
+        self.assertEqual(subprocess.run([sys.executable, '-c', code]).returncode, 0)
+
+    def test_rect_collision(self):
+        """Test rectangle overlap matches pygame's edge rules."""
+        self.assertTrue(collision_checker(Rect(100, 100, 50, 50), Rect(120, 120, 50, 50)))
+        self.assertFalse(collision_checker(Rect(100, 100, 50, 50), Rect(150, 100, 50, 50)))
+        self.assertFalse(collision_checker(Rect(100, 100, 0, 50), Rect(90, 90, 50, 50)))
+
+    def test_create_blocks_grid(self):
+        """Test that blocks are laid out on the top half of the screen."""
+        blocks = create_blocks(40, 15, 20, 20)
+        self.assertEqual(len(blocks), 10 * 8)
+        self.assertTrue(all(block.posy < HEIGHT // 2 for block in blocks))
+
+    def test_seeded_games_match(self):
+        """Test that two games with the same seed play out identically."""
+        other = Game(seed=1)
+        for _ in range(500):
+            self.game.step()
+            other.step()
+        self.assertEqual((self.game.ball.posx, self.game.ball.posy), (other.ball.posx, other.ball.posy))
+        self.assertEqual(self.game.score, other.score)
+
+    def test_lose_life(self):
+        """Test that dropping the ball costs a life and resets the ball."""
+        self.game.ball.posy = HEIGHT - 1
+        self.game.ball.y_fac = 1
+        events = self.game.step()
+        self.assertIn("lose_life", events)
+        self.assertEqual(self.game.lives, START_LIVES - 1)
+        self.assertEqual(self.game.ball.posy, HEIGHT - 150)
+
+    def test_game_over(self):
+        """Test that losing the last life ends the game."""
+        self.game.lives = 1
+        self.game.ball.posy = HEIGHT - 1
+        self.game.ball.y_fac = 1
+        self.assertIn("game_over", self.game.step())
+        self.assertTrue(self.game.over)
+        self.assertEqual(self.game.step(), [])
+
+    def test_scoring(self):
+        """Test that hitting a block removes it and adds its points."""
+        block = Block(100, 300, 40, 15, RED, 10)
+        self.game.blocks = BlockGrid(60, 35, [block, Block(0, 0, 40, 15, RED, 5)])
+        self.game.ball = Ball(120, 310, 7, 0, WHITE)
+        events = self.game.step()
+        self.assertIn("brick", events)
+        self.assertEqual(self.game.score, 10)
+        self.assertNotIn(block, self.game.blocks)
+
+    def test_hit_without_breaking(self):
+        """Test that a block with health left reports a hit instead of breaking."""
+        block = Block(100, 300, 40, 15, RED, 10, health=2)
+        self.game.blocks = BlockGrid(60, 35, [block])
+        self.game.ball = Ball(120, 310, 7, 0, WHITE)
+        events = self.game.step()
+        self.assertIn("hit", events)
+        self.assertNotIn("brick", events)
+        self.assertIn(block, self.game.blocks)
+
+    def test_level_progression(self):
+        """Test that clearing the field moves on to the next level."""
+        self.game.blocks = BlockGrid(60, 35, [Block(100, 300, 40, 15, RED, 10)])
+        self.game.ball = Ball(120, 310, 7, 0, WHITE)
+        self.assertIn("level", self.game.step())
+        self.assertEqual(self.game.level, 2)
+        self.assertTrue(self.game.blocks)
+
+    def test_fast_ball_does_not_tunnel(self):
+        """Test that a ball moving several paddle heights per step still bounces."""
+        paddle = self.game.paddle
+        self.game.blocks = BlockGrid(60, 35, [Block(0, 0, 40, 15, RED, 5)])
+        self.game.ball = Ball(paddle.posx + 50, paddle.posy - 30, 7, 60, WHITE)
+        self.game.ball.x_fac, self.game.ball.y_fac = 0, 1
+        self.assertIn("paddle", self.game.step())
+        self.assertEqual(self.game.ball.y_fac, -1)
+        self.assertLess(self.game.ball.posy, paddle.posy)
+
+    def test_fast_ball_hits_first_block(self):
+        """Test that a fast ball stops at the nearest block instead of skipping it."""
+        near, far = Block(100, 200, 40, 15, RED, 10), Block(100, 100, 40, 15, RED, 20)
+        self.game.blocks = BlockGrid(60, 35, [far, near])
+        self.game.ball = Ball(120, 300, 7, 150, WHITE)
+        self.game.ball.x_fac, self.game.ball.y_fac = 0, -1
+        self.game.step()
+        self.assertEqual(list(self.game.blocks), [far])
+        self.assertEqual(self.game.ball.y_fac, 1)
+
+    def test_paddle_bounds(self):
+        """Test that the paddle stays on screen."""
+        paddle = self.game.paddle
+        for _ in range(100):
+            self.game.step(1)
+        self.assertEqual(paddle.posx + paddle.width, WIDTH)
+
+    def test_paddle_end_against_a_wall(self):
+        """Test that a ball coming down past a paddle flush with a wall bounces up, not out through the wall."""
+        paddle = self.game.paddle
+        self.game.blocks = BlockGrid(60, 35, [Block(280, 0, 40, 15, RED, 5)])
+        for direction, edge, x_fac in ((-1, 0.8, -0.69), (1, WIDTH - 0.8, 0.69)):
+            for _ in range(100):
+                paddle.set_movement(direction)
+                paddle.update()
+            self.game.ball = ball = Ball(edge, paddle.posy - 10, 7, 5, WHITE)
+            ball.x_fac, ball.y_fac = x_fac, 1
+            events = []
+            for _ in range(10):
+                events += self.game.step()
+                self.assertTrue(-7 <= ball.posx <= WIDTH + 7, ball.posx)
+            self.assertIn("paddle", events)
+            self.assertEqual(ball.y_fac, -1)
+
+
+class TestPowerUps(unittest.TestCase):
+    """Unit test case for multi-ball and the other power-ups."""
+
+    def setUp(self):
+        """Create a seeded game with power-ups on."""
+        self.game = Game(seed=1, powerups=True)
+
+    def test_catching_a_power_up(self):
+        """Test that a power-up falling onto the paddle is applied."""
+        paddle = self.game.paddle
+        self.game.powerup_pool.acquire().spawn(paddle.posx + 50, paddle.posy - 5, WIDE)
+        self.assertIn("powerup", self.game.step())
+        self.assertEqual(paddle.width, WIDE_PADDLE_WIDTH)
+        self.assertEqual(len(self.game.falling_powerups), 0)
+
+    def test_missed_power_up_is_released(self):
+        """Test that a power-up falling off the screen goes back to the pool."""
+        self.game.powerup_pool.acquire().spawn(5, HEIGHT + 3, PIERCE)
+        self.game.step()
+        self.assertEqual(len(self.game.falling_powerups), 0)
+
+    def test_wide_paddle_wears_off(self):
+        """Test that the paddle shrinks back when the power-up runs out."""
+        self.game.apply_powerup(WIDE)
+        self.game.wide_steps = 1
+        self.game.step()
+        self.assertEqual(self.game.paddle.width, PADDLE_WIDTH)
+
+    def test_multiball_splits_balls(self):
+        """Test that multi-ball triples the balls in play, up to the pool size."""
+        self.game.apply_powerup(MULTIBALL)
+        self.assertEqual(len(self.game.balls), 3)
+        for _ in range(10):
+            self.game.apply_powerup(MULTIBALL)
+        self.assertEqual(len(self.game.balls), MAX_BALLS)
+        self.assertIsNone(self.game.ball_pool.acquire())
+
+    def test_losing_one_of_several_balls(self):
+        """Test that a life is only lost when the last ball drops."""
+        self.game.apply_powerup(MULTIBALL)
+        self.game.balls[0].posy = HEIGHT - 1
+        self.game.balls[0].y_fac = 1
+        events = self.game.step()
+        self.assertIn("lost", events)
+        self.assertNotIn("lose_life", events)
+        self.assertEqual((self.game.lives, len(self.game.balls)), (START_LIVES, 2))
+
+    def test_piercing_ball_keeps_going(self):
+        """Test that a piercing ball destroys blocks without bouncing."""
+        block = Block(100, 300, 40, 15, RED, 10)
+        self.game.blocks = BlockGrid(60, 35, [block, Block(300, 0, 40, 15, RED, 10)])
+        self.game.ball = Ball(120, 310, 7, 0, WHITE)
+        self.game.apply_powerup(PIERCE)
+        self.game.step()
+        self.assertNotIn(block, self.game.blocks)
+        self.assertEqual(self.game.ball.y_fac, 1)
+
+    def test_power_ups_are_deterministic(self):
+        """Test that drops and their effects replay the same from a seed."""
+        games = [Game(seed=8, powerups=True) for _ in range(2)]
+        for game in games:
+            for _ in range(3000):
+                balls = game.balls
+                if balls:
+                    target = max(balls, key=lambda ball: ball.posy).posx
+                    game.step(1 if target > game.paddle.posx + game.paddle.width / 2 else -1)
+        self.assertEqual(*((game.score, game.lives, len(game.balls), [b.posx for b in game.balls])
+                           for game in games))
+
+    def test_slots(self):
+        """Test that pooled objects carry no per-instance dict."""
+        self.assertFalse(hasattr(Ball(0, 0, 7, 5, WHITE), '__dict__'))
+        self.assertFalse(hasattr(PowerUp(0, 0, WIDE), '__dict__'))
+
+
+if __name__ == '__main__':
+    unittest.main()
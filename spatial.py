@@ -0,0 +1,90 @@
+"""
+Uniform-grid spatial index for the block field.
+"""
+
+# Class for BlockGrid
+class BlockGrid:
+    """
+    Bucket blocks into uniform grid cells so collision queries only look at
+    the cells a rectangle overlaps. Blocks are kept in insertion order and can
+    be removed in O(1).
+
+    Parameters:
+    cell_width (int): Width of a grid cell, normally one block plus its gap.
+    cell_height (int): Height of a grid cell, normally one block plus its gap.
+    blocks (iterable): Initial blocks to index.
+    """
+    def __init__(self, cell_width, cell_height, blocks=()):
+        self.cell_width, self.cell_height = cell_width, cell_height
+        self.cells = {}
+        self.order = {}  # block -> insertion index, doubles as an ordered set
+        self.counter = 0
+        for block in blocks:
+            self.add(block)
+
+    def _cells_for(self, rect):
+        """
+        Yield the keys of every cell a rectangle overlaps.
+        """
+        first_col, last_col = int(rect.left // self.cell_width), int(rect.right // self.cell_width)
+        first_row, last_row = int(rect.top // self.cell_height), int(rect.bottom // self.cell_height)
+        for col in range(first_col, last_col + 1):
+            for row in range(first_row, last_row + 1):
+                yield col, row
+
+    def add(self, block):
+        """
+        Add a block to the index.
+
+        Parameters:
+        block (Block): The block to add.
+        """
+        self.order[block] = self.counter
+        self.counter += 1
+        for key in self._cells_for(block.get_rect()):
+            self.cells.setdefault(key, {})[block] = None
+
+    def remove(self, block):
+        """
+        Remove a block from the index.
+
+        Parameters:
+        block (Block): The block to remove.
+        """
+        del self.order[block]
+        for key in self._cells_for(block.get_rect()):
+            cell = self.cells[key]
+            del cell[block]
+            if not cell:
+                del self.cells[key]
+
+    def query(self, rect):
+        """
+        Find the blocks colliding with a rectangle.
+
+        Parameters:
+        rect (Rect): The rectangle to test, usually the ball's.
+
+        Returns:
+        list: Colliding blocks in insertion order.
+        """
+        found = {}
+        cells = self.cells
+        for key in self._cells_for(rect):
+            cell = cells.get(key)
+            if cell:
+                for block in cell:
+                    if block not in found and block.get_rect().colliderect(rect):
+                        found[block] = None
+        if len(found) > 1:
+            return sorted(found, key=self.order.__getitem__)
+        return list(found)
+
+    def __len__(self):
+        return len(self.order)
+
+    def __iter__(self):
+        return iter(list(self.order))
+
+    def __contains__(self, block):
+        return block in self.order
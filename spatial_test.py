@@ -0,0 +1,50 @@
+import random
+import unittest
+
+from simulation import RED, Block, Rect, create_blocks
+from spatial import BlockGrid
+
+
+class TestBlockGrid(unittest.TestCase):
+    """Unit test case for the block field spatial index."""
+
+    def setUp(self):
+        """Index a standard block field."""
+        self.blocks = create_blocks(40, 15, 20, 20, random.Random(3))
+        self.grid = BlockGrid(60, 35, self.blocks)
+
+    def test_query_matches_linear_scan(self):
+        """Test that grid queries find exactly the blocks a full scan would."""
+        rng = random.Random(5)
+        for _ in range(500):
+            rect = Rect(rng.uniform(-20, 600), rng.uniform(-20, 300), 14, 14)
+            expected = [block for block in self.blocks if block.get_rect().colliderect(rect)]
+            self.assertEqual(self.grid.query(rect), expected)
+
+    def test_remove(self):
+        """Test that removed blocks are no longer found."""
+        block = self.blocks[0]
+        self.grid.remove(block)
+        self.assertNotIn(block, self.grid)
+        self.assertEqual(len(self.grid), len(self.blocks) - 1)
+        self.assertEqual(self.grid.query(block.get_rect()), [])
+
+    def test_block_spanning_cells(self):
+        """Test that a block larger than a cell is found once from every cell it covers."""
+        wide = Block(10, 400, 200, 15, RED, 10)
+        self.grid.add(wide)
+        self.assertEqual(self.grid.query(Rect(150, 405, 14, 14)), [wide])
+        self.assertEqual(self.grid.query(Rect(0, 395, 300, 30)), [wide])
+        self.grid.remove(wide)
+        self.assertEqual(self.grid.query(Rect(150, 405, 14, 14)), [])
+
+    def test_iteration_order(self):
+        """Test that iteration keeps insertion order and tolerates removal."""
+        for block in self.grid:
+            if block.posx == 0:
+                self.grid.remove(block)
+        self.assertEqual(list(self.grid), [block for block in self.blocks if block.posx != 0])
+
+
+if __name__ == '__main__':
+    unittest.main()
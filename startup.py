@@ -0,0 +1,73 @@
+"""
+Startup phase timing.
+
+Importing this module first thing starts the clock, so a StartupTimer made
+later still counts the time spent importing pygame and the game's modules.
+Each call to mark() closes a phase, and report() and dump() show where the
+time between launch and the first frame on screen went.
+"""
+
+import json
+import sys
+import time
+
+IMPORTED = time.perf_counter()  # When the first module of the game was imported
+
+# Class for StartupTimer
+class StartupTimer:
+    """
+    Initialize a startup timer.
+
+    Parameters:
+    start (float): perf_counter() time the first phase began; when this module was imported by default.
+    """
+    def __init__(self, start=None):
+        self.start = IMPORTED if start is None else start
+        self.last = self.start
+        self.phases = []
+
+    def mark(self, name):
+        """
+        End the current phase.
+
+        Parameters:
+        name (str): What the phase was spent on.
+
+        Returns:
+        float: Seconds the phase took.
+        """
+        now = time.perf_counter()
+        seconds, self.last = now - self.last, now
+        self.phases.append((name, seconds))
+        return seconds
+
+    @property
+    def total(self):
+        """
+        Seconds from the start to the end of the last phase.
+        """
+        return self.last - self.start
+
+    def report(self):
+        """
+        Format the phases as one line.
+
+        Returns:
+        str: Each phase and the total in milliseconds.
+        """
+        phases = "  ".join(f"{name} {seconds * 1000:.1f}" for name, seconds in self.phases)
+        return f"startup ms: {phases}  total {self.total * 1000:.1f}"
+
+    def dump(self, path):
+        """
+        Write the phases out.
+
+        Parameters:
+        path (str): A .json file, or "-" to print the report to stderr.
+        """
+        if path == "-":
+            print(self.report(), file=sys.stderr)
+            return
+        with open(path, 'w') as file:
+            json.dump({"phases_ms": {name: seconds * 1000 for name, seconds in self.phases},
+                       "total_ms": self.total * 1000}, file, indent=2)
@@ -0,0 +1,54 @@
+import io
+import json
+import os
+import tempfile
+import time
+import unittest
+from contextlib import redirect_stderr
+
+from startup import IMPORTED, StartupTimer
+
+
+class TestStartupTimer(unittest.TestCase):
+    """Unit test case for startup phase timing."""
+
+    def test_phases(self):
+        """Test that each phase runs from the end of the one before."""
+        timer = StartupTimer(time.perf_counter())
+        time.sleep(0.01)
+        first = timer.mark("init")
+        time.sleep(0.02)
+        second = timer.mark("first frame")
+        self.assertGreaterEqual(first, 0.01)
+        self.assertGreaterEqual(second, 0.02)
+        self.assertEqual([name for name, _ in timer.phases], ["init", "first frame"])
+        self.assertAlmostEqual(timer.total, first + second)
+
+    def test_starts_at_import(self):
+        """Test that the default start is when the module was imported."""
+        timer = StartupTimer()
+        self.assertEqual(timer.start, IMPORTED)
+        self.assertGreater(timer.mark("import"), 0)
+
+    def test_report_and_dump(self):
+        """Test the printed report and the JSON file."""
+        timer = StartupTimer(time.perf_counter())
+        timer.mark("import")
+        timer.mark("init")
+        stderr = io.StringIO()
+        with redirect_stderr(stderr):
+            timer.dump("-")
+        self.assertIn("import", stderr.getvalue())
+        self.assertIn("total", stderr.getvalue())
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "startup.json")
+            timer.dump(path)
+            with open(path) as file:
+                data = json.load(file)
+        self.assertEqual(list(data["phases_ms"]), ["import", "init"])
+        self.assertAlmostEqual(data["total_ms"], sum(data["phases_ms"].values()))
+
+
+if __name__ == '__main__':
+    unittest.main()
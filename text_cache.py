@@ -0,0 +1,97 @@
+"""
+Cached text rendering for the HUD and menus.
+
+Rasterizing text with pygame.font is one of the more expensive things a
+frame does, and most of what the game prints never changes. TextCache keeps
+recently rendered strings, and GlyphAtlas builds changing numbers out of
+glyphs rendered once.
+"""
+
+from collections import OrderedDict
+
+import pygame
+
+# Class for TextCache
+class TextCache:
+    """
+    Least-recently-used cache of rendered text surfaces.
+
+    Parameters:
+    font (pygame.font.Font): Font to render with.
+    max_size (int): Most surfaces to keep.
+    """
+    def __init__(self, font, max_size=128):
+        self.font = font
+        self.max_size = max_size
+        self.surfaces = OrderedDict()
+
+    def render(self, text, antialias, color):
+        """
+        Render text, reusing the surface from an earlier identical call.
+        Takes the same arguments as pygame.font.Font.render.
+
+        Returns:
+        pygame.Surface: The rendered text. Callers must not draw on it.
+        """
+        key = (text, antialias, color)
+        surface = self.surfaces.get(key)
+        if surface is None:
+            surface = self.font.render(text, antialias, color)
+            self.surfaces[key] = surface
+            if len(self.surfaces) > self.max_size:
+                self.surfaces.popitem(last=False)
+        else:
+            self.surfaces.move_to_end(key)
+        return surface
+
+    def clear(self):
+        """
+        Drop every cached surface.
+        """
+        self.surfaces.clear()
+
+# Class for GlyphAtlas
+class GlyphAtlas:
+    """
+    Pre-rendered glyphs for a small character set, such as the digits of the
+    score, so changing text can be assembled with blits instead of rasterized.
+
+    Parameters:
+    font (pygame.font.Font): Font to render with.
+    characters (str): Characters to pre-render.
+    antialias (bool): Whether to antialias the glyphs.
+    color (tuple): Glyph color.
+    """
+    def __init__(self, font, characters, antialias, color):
+        self.glyphs = {char: font.render(char, antialias, color) for char in characters}
+        self.height = font.get_height()
+
+    def size(self, text):
+        """
+        Get the size text will take up.
+
+        Returns:
+        tuple: (width, height)
+        """
+        return sum(self.glyphs[char].get_width() for char in text), self.height
+
+    def blit(self, surface, text, position):
+        """
+        Draw text onto a surface from the pre-rendered glyphs.
+
+        Parameters:
+        surface (pygame.Surface): Surface to draw on.
+        text (str): Text made only of the atlas's characters.
+        position (tuple): Top-left corner to draw at.
+
+        Returns:
+        pygame.Rect: The area drawn.
+        """
+        x, y = position
+        rect = pygame.Rect(x, y, 0, self.height)
+        for char in text:
+            glyph = self.glyphs[char]
+            surface.blit(glyph, (x, y))
+            x += glyph.get_width()
+        rect.width = x - rect.x
+        return rect
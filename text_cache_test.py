@@ -0,0 +1,52 @@
+import unittest
+
+import pygame
+
+from text_cache import GlyphAtlas, TextCache
+
+WHITE = (255, 255, 255)
+
+
+class TestTextCache(unittest.TestCase):
+    """Unit test case for cached text rendering."""
+
+    def setUp(self):
+        """Load the game font."""
+        pygame.font.init()
+        self.font = pygame.font.Font(None, 15)
+
+    def test_reuses_surfaces(self):
+        """Test that identical requests return the same surface."""
+        cache = TextCache(self.font)
+        first = cache.render("Game Over!", True, WHITE)
+        self.assertIs(cache.render("Game Over!", True, WHITE), first)
+        self.assertIsNot(cache.render("Game Over!", False, WHITE), first)
+        self.assertIsNot(cache.render("Game Over!", True, (255, 0, 0)), first)
+
+    def test_least_recently_used_eviction(self):
+        """Test that the oldest unused entry is dropped when full."""
+        cache = TextCache(self.font, max_size=2)
+        a = cache.render("a", True, WHITE)
+        cache.render("b", True, WHITE)
+        cache.render("a", True, WHITE)
+        cache.render("c", True, WHITE)
+        self.assertEqual([key[0] for key in cache.surfaces], ["a", "c"])
+        self.assertIs(cache.render("a", True, WHITE), a)
+
+    def test_glyph_atlas(self):
+        """Test that numbers are assembled from the pre-rendered glyphs."""
+        atlas = GlyphAtlas(self.font, "0123456789", True, WHITE)
+        surface = pygame.Surface((200, 50))
+        rect = atlas.blit(surface, "1235", (10, 5))
+        self.assertEqual((rect.x, rect.y), (10, 5))
+        self.assertEqual(rect.size, atlas.size("1235"))
+        self.assertEqual(rect.width, sum(atlas.glyphs[char].get_width() for char in "1235"))
+        self.assertNotEqual(surface.get_bounding_rect().width, 0)
+
+    def tearDown(self):
+        """Quit the font module."""
+        pygame.font.quit()
+
+
+if __name__ == '__main__':
+    unittest.main()